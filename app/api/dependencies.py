@@ -1,14 +1,71 @@
-from app.services import FlowEngine, TaskRegistry
-from app.services.tasks import task1_fetch_data, task2_process_data, task3_store_data
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.config import settings
+from app.services import BlobStore, FlowEngine, MemoryProfiler, TaskRegistry
+from app.services.archive import ExecutionArchive
+from app.services.compaction import ArchiveCompactor
+from app.services.execution_profiler import ExecutionProfiler
+from app.services.idempotency import IdempotencyTable
+from app.services.readiness import LoopLagMonitor, ReadinessProbe
+from app.services.resources import ResourceManager
+from app.services.scheduler import Scheduler
 
 # Global instances
 task_registry = TaskRegistry()
-flow_engine = FlowEngine(task_registry)
+# Pools are registered and closed by the application lifespan
+resource_manager = ResourceManager()
+blob_store = BlobStore(settings.BLOB_STORE_DIR, settings.BLOB_THRESHOLD_BYTES)
+memory_profiler = (
+    MemoryProfiler(settings.MEMORY_SAMPLE_RATE) if settings.MEMORY_PROFILING else None
+)
+flow_engine = FlowEngine(
+    task_registry,
+    blob_store,
+    settings.TASK_POOL_SIZE,
+    settings.MAP_POOL_SIZE,
+    settings.MAP_PROCESS_POOL_SIZE,
+    memory_profiler,
+    IdempotencyTable(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_KEYS),
+    ExecutionArchive(settings.ARCHIVE_DIR) if settings.ARCHIVE_ENABLED else None,
+    resource_manager,
+    ExecutionProfiler(settings.PROFILE_SAMPLE_INTERVAL_SECONDS),
+)
+archive_compactor = (
+    ArchiveCompactor(
+        flow_engine,
+        settings.ARCHIVE_INTERVAL_SECONDS,
+        settings.ARCHIVE_AFTER_SECONDS,
+        settings.ARCHIVE_RETENTION_SECONDS,
+    )
+    if settings.ARCHIVE_ENABLED
+    else None
+)
+scheduler = Scheduler(
+    flow_engine, settings.SCHEDULER_TICK_SECONDS, settings.SCHEDULER_POOL_SIZE
+)
+
+loop_lag_monitor = LoopLagMonitor()
+readiness_probe = ReadinessProbe(
+    flow_engine,
+    loop_lag_monitor,
+    max_utilization=settings.READY_MAX_UTILIZATION,
+    max_queue_depth=settings.READY_MAX_QUEUE_DEPTH,
+    max_loop_lag=settings.READY_MAX_LOOP_LAG_SECONDS,
+    max_executions=settings.READY_MAX_EXECUTIONS,
+    max_rss_bytes=settings.READY_MAX_RSS_BYTES,
+    max_open_breakers=settings.READY_MAX_OPEN_BREAKERS,
+)
+
+# Register default tasks, imported on first use
+task_registry.register("task1", "app.services.tasks:task1_fetch_data")
+task_registry.register("task2", "app.services.tasks:task2_process_data")
+task_registry.register("task3", "app.services.tasks:task3_store_data")
 
-# Register default tasks
-task_registry.register("task1", task1_fetch_data)
-task_registry.register("task2", task2_process_data)
-task_registry.register("task3", task3_store_data)
+# Register plugin tasks from installed packages
+task_registry.register_entry_points(settings.TASK_ENTRY_POINT_GROUP)
 
 
 def get_flow_engine() -> FlowEngine:
@@ -19,3 +76,18 @@ def get_flow_engine() -> FlowEngine:
 def get_task_registry() -> TaskRegistry:
     """Dependency to get task registry instance"""
     return task_registry
+
+
+def get_scheduler() -> Scheduler:
+    """Dependency to get scheduler instance"""
+    return scheduler
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)):
+    """Dependency admitting only requests carrying the configured debug token"""
+    if not settings.DEBUG_TOKEN:
+        raise HTTPException(status_code=403, detail="DEBUG_TOKEN is not configured")
+    if x_debug_token is None or not secrets.compare_digest(
+        x_debug_token.encode(), settings.DEBUG_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
@@ -0,0 +1,181 @@
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, List, Optional, Set, Union
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from app.core.config import settings
+from app.models import FlowExecutionStatus
+from app.services.execution_record import ExecutionRecord
+
+EXECUTION_STATUS_FIELDS = frozenset(FlowExecutionStatus.model_fields)
+
+# Versions restart with the process, the boot id keeps old ETags from matching
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class RenderCache:
+    """Size-bounded LRU of serialized executions
+
+    Keys carry the execution revision, so a stale body is never served, and
+    the total size of the cached bodies stays under `max_bytes` however many
+    executions are retained.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._bodies: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+            return body
+
+    def put(self, key: Hashable, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._bodies[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._bodies.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._bodies.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+
+# Serialized bytes of finished executions, shared by all endpoints
+render_cache = RenderCache(settings.RESPONSE_CACHE_BYTES)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, skipping the default encoder pass"""
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    """Parse a comma separated `fields=` projection into a set of field names"""
+    if not fields:
+        return None
+    return select_fields(fields.split(","))
+
+
+def select_fields(names: Iterable[str]) -> Optional[Set[str]]:
+    """Validate a projection given as field names, None or empty selects all"""
+    selected = {name.strip() for name in names if name.strip()}
+    if not selected:
+        return None
+    unknown = selected - EXECUTION_STATUS_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def make_etag(version: int) -> str:
+    """Weak ETag for a version number, weak because gzip may re-encode"""
+    return f'W/"{BOOT_ID}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the current ETag"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    if "*" in tags:
+        return True
+    # Weak comparison, W/ prefixes are ignored on both sides
+    opaque = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == opaque for tag in tags)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def render_json(content: Any) -> bytes:
+    return orjson.dumps(
+        content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS
+    )
+
+
+def render_execution(
+    execution: ExecutionRecord, fields: Optional[Set[str]], include_data: bool
+) -> bytes:
+    """Serialize an execution, caching the bytes once it has finished"""
+    if execution.status == "running":
+        return render_json(execution.to_dict(fields, include_data))
+
+    key = (
+        execution.execution_id,
+        execution.revision,
+        frozenset(fields) if fields is not None else None,
+        include_data,
+    )
+    body = render_cache.get(key)
+    if body is None:
+        body = render_json(execution.to_dict(fields, include_data))
+        render_cache.put(key, body)
+    return body
+
+
+def render_archived(
+    document: dict, fields: Optional[Set[str]], include_data: bool
+) -> bytes:
+    """Serialize an archived execution with the same projection as live ones"""
+    if fields is not None:
+        document = {name: value for name, value in document.items() if name in fields}
+    if not include_data and "task_results" in document:
+        document = {
+            **document,
+            "task_results": {
+                task: {key: value for key, value in result.items() if key != "data"}
+                for task, result in document["task_results"].items()
+            },
+        }
+    return render_json(document)
+
+
+def render_executions(
+    executions: List[Union[ExecutionRecord, dict]],
+    missing: List[str],
+    fields: Optional[Set[str]],
+    include_data: bool,
+) -> bytes:
+    """Serialize a batch lookup, reusing the cached bytes of each execution"""
+    body = b",".join(
+        (
+            render_archived(execution, fields, include_data)
+            if isinstance(execution, dict)
+            else render_execution(execution, fields, include_data)
+        )
+        for execution in executions
+    )
+    return b"".join(
+        (
+            b'{"executions":[',
+            body,
+            b'],"missing":',
+            render_json(missing),
+            b',"count":',
+            render_json(len(executions)),
+            b"}",
+        )
+    )
@@ -1,3 +1,5 @@
+from .debug import router as debug_router
 from .flows import router as flows_router
+from .schedules import router as schedules_router
 
-__all__ = ["flows_router"]
+__all__ = ["flows_router", "debug_router", "schedules_router"]
@@ -0,0 +1,106 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from app.api.dependencies import get_flow_engine, get_task_registry, require_debug_token
+from app.core.config import settings
+from app.services import FlowEngine, TaskRegistry
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/memory/{flow_id}")
+async def get_memory_top(
+    flow_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    engine: FlowEngine = Depends(get_flow_engine),
+):
+    """Get the tasks of a flow with the largest sampled allocations"""
+    try:
+        return engine.get_memory_top(flow_id, limit)
+    except Exception as e:
+        logger.error(f"Flow not found: {flow_id}")
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/resources")
+async def get_resource_stats(engine: FlowEngine = Depends(get_flow_engine)):
+    """Get the size, usage and wait counters of every resource pool"""
+    return engine.resources.stats()
+
+
+@router.get("/imports")
+async def get_import_report(registry: TaskRegistry = Depends(get_task_registry)):
+    """Get the import cost of each task module loaded so far, slowest first"""
+    return registry.import_report()
+
+
+@router.post(
+    "/profile/{flow_id}",
+    status_code=202,
+    dependencies=[Depends(require_debug_token)],
+)
+async def start_profile(
+    flow_id: str,
+    executions: int = Query(1, ge=1, le=settings.PROFILE_MAX_EXECUTIONS),
+    interval: Optional[float] = Query(None, gt=0, le=1),
+    engine: FlowEngine = Depends(get_flow_engine),
+):
+    """Profile the next executions of a flow"""
+    try:
+        return engine.start_profile(flow_id, executions, interval).to_dict()
+    except ValueError as e:
+        logger.error(f"Flow not found: {flow_id}")
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/profile/{flow_id}", dependencies=[Depends(require_debug_token)])
+async def get_profile(
+    flow_id: str,
+    format: str = Query("json", pattern="^(json|collapsed|text|pstats)$"),
+    limit: int = Query(30, ge=1, le=1000),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|name)$"),
+    engine: FlowEngine = Depends(get_flow_engine),
+):
+    """Get the merged profile of a flow's profiled executions
+
+    `collapsed` returns stacks for flamegraph tools, `text` the pstats table
+    and `pstats` a stats file for pstats or snakeviz.
+    """
+    try:
+        session = engine.get_profile(flow_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if format == "collapsed":
+        return PlainTextResponse(session.collapsed())
+    if format == "text":
+        return PlainTextResponse(session.pstats_text(limit, sort))
+    if format == "pstats":
+        return Response(
+            session.pstats_dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{flow_id}.pstats"'},
+        )
+    return {
+        **session.to_dict(),
+        "functions": session.top_functions(limit, sort),
+        "collapsed": session.collapsed(),
+    }
+
+
+@router.delete(
+    "/profile/{flow_id}",
+    status_code=204,
+    dependencies=[Depends(require_debug_token)],
+)
+async def discard_profile(flow_id: str, engine: FlowEngine = Depends(get_flow_engine)):
+    """Stop profiling a flow and drop its results"""
+    try:
+        engine.discard_profile(flow_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(status_code=204)
@@ -1,15 +1,37 @@
 import logging
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
 
 from app.api.dependencies import get_flow_engine
-from app.models import FlowDefinition, FlowExecutionStatus
+from app.api.responses import (
+    ORJSONResponse,
+    etag_matches,
+    make_etag,
+    not_modified,
+    parse_fields,
+    render_archived,
+    render_execution,
+    render_executions,
+    select_fields,
+)
+from app.models import ExecutionLookup, FlowDefinition, FlowExecutionStatus
 from app.services import FlowEngine
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/flows", tags=["flows"])
 
+EXECUTION_SUMMARY_FIELDS = (
+    "execution_id",
+    "flow_id",
+    "status",
+    "started_at",
+    "ended_at",
+)
+
 
 @router.post("/register", status_code=201)
 async def register_flow(
@@ -17,12 +39,13 @@ async def register_flow(
 ):
     """Register a new flow definition"""
     try:
-        engine.register_flow(flow_def)
-        logger.info(f"Flow registered: {flow_def.flow.id}")
+        version = engine.register_flow(flow_def)
+        logger.info(f"Flow registered: {flow_def.flow.id} (v{version})")
         return {
             "message": "Flow registered successfully",
             "flow_id": flow_def.flow.id,
             "flow_name": flow_def.flow.name,
+            "version": version,
         }
     except Exception as e:
         logger.error(f"Failed to register flow: {str(e)}")
@@ -30,11 +53,35 @@ async def register_flow(
 
 
 @router.post("/{flow_id}/execute")
-async def execute_flow(flow_id: str, engine: FlowEngine = Depends(get_flow_engine)):
-    """Execute a registered flow"""
+async def execute_flow(
+    flow_id: str,
+    idempotency_key: Optional[str] = Header(None),
+    engine: FlowEngine = Depends(get_flow_engine),
+):
+    """Execute a registered flow
+
+    Repeating an `Idempotency-Key` returns the first execution instead of
+    running the flow again, read from the archive once it was compacted.
+    """
     try:
-        execution_id = engine.execute_flow(flow_id)
-        execution = engine.get_execution_status(execution_id)
+        # Run off the event loop so status polls and cancels are served meanwhile
+        execution_id = await run_in_threadpool(
+            engine.execute_flow, flow_id, idempotency_key
+        )
+        try:
+            execution = engine.get_execution_status(execution_id)
+        except ValueError:
+            archived = engine.get_archived([execution_id]).get(execution_id)
+            if archived is None:
+                raise
+            logger.info(f"Replayed archived execution: {execution_id}")
+            return ORJSONResponse(
+                {
+                    "message": "Flow execution completed",
+                    "execution_id": execution_id,
+                    "status": archived,
+                }
+            )
         logger.info(f"Flow execution started: {execution_id}")
         return {
             "message": "Flow execution completed",
@@ -46,21 +93,170 @@ async def execute_flow(flow_id: str, engine: FlowEngine = Depends(get_flow_engin
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/{flow_id}/stats")
+async def get_flow_stats(flow_id: str, engine: FlowEngine = Depends(get_flow_engine)):
+    """Get execution counts, task success rates and duration quantiles"""
+    try:
+        return engine.get_flow_stats(flow_id)
+    except Exception as e:
+        logger.error(f"Flow not found: {flow_id}")
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/execution/{execution_id}/cancel", status_code=202)
+async def cancel_execution(
+    execution_id: str, engine: FlowEngine = Depends(get_flow_engine)
+):
+    """Cancel a running flow execution"""
+    try:
+        cancelled = engine.cancel_execution(execution_id)
+    except Exception as e:
+        logger.error(f"Execution not found: {execution_id}")
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if not cancelled:
+        raise HTTPException(
+            status_code=409, detail=f"Execution '{execution_id}' already finished"
+        )
+    return {"message": "Cancellation requested", "execution_id": execution_id}
+
+
 @router.get("/execution/{execution_id}", response_model=FlowExecutionStatus)
 async def get_execution_status(
-    execution_id: str, engine: FlowEngine = Depends(get_flow_engine)
+    execution_id: str,
+    fields: Optional[str] = Query(
+        None, description="Comma separated list of fields to return"
+    ),
+    include_data: bool = Query(True, description="Include task result payloads"),
+    if_none_match: Optional[str] = Header(None),
+    engine: FlowEngine = Depends(get_flow_engine),
 ):
-    """Get the status of a flow execution"""
+    """Get the status of a flow execution
+
+    Answers `If-None-Match` with 304 while the execution is unchanged.
+    """
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        status = engine.get_execution_status(execution_id)
-        return status
+        execution = engine.get_execution(execution_id)
     except Exception as e:
+        archived = engine.get_archived([execution_id]).get(execution_id)
+        if archived is not None:
+            return Response(
+                render_archived(archived, selected, include_data),
+                media_type="application/json",
+            )
         logger.error(f"Execution not found: {execution_id}")
         raise HTTPException(status_code=404, detail=str(e))
 
+    # Read the revision before rendering so the ETag never runs ahead
+    etag = make_etag(execution.revision)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    return Response(
+        render_execution(execution, selected, include_data),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/executions")
+async def list_executions(
+    flow_id: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    engine: FlowEngine = Depends(get_flow_engine),
+):
+    """List executions, newest first, filtered by flow, status and start time"""
+    try:
+        position = int(cursor) if cursor is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+    executions, next_cursor = engine.list_executions(
+        flow_id=flow_id, status=status, since=since, cursor=position, limit=limit
+    )
+    return {
+        "executions": [
+            execution.to_dict(EXECUTION_SUMMARY_FIELDS) for execution in executions
+        ],
+        "count": len(executions),
+        "next_cursor": str(next_cursor) if next_cursor is not None else None,
+    }
+
+
+@router.get("/executions/archived")
+async def list_archived_executions(
+    flow_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=500),
+    engine: FlowEngine = Depends(get_flow_engine),
+):
+    """List archived executions, oldest first, within a start time range"""
+    executions = await run_in_threadpool(
+        engine.list_archived, flow_id, since, until, limit
+    )
+    return {
+        "executions": [
+            {field: execution.get(field) for field in EXECUTION_SUMMARY_FIELDS}
+            for execution in executions
+        ],
+        "count": len(executions),
+    }
+
+
+@router.post("/executions:lookup")
+async def lookup_executions(
+    lookup: ExecutionLookup, engine: FlowEngine = Depends(get_flow_engine)
+):
+    """Get the status of many executions at once
+
+    Unknown IDs are listed under `missing` instead of failing the request.
+    """
+    try:
+        selected = select_fields(lookup.fields or ())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Repeated IDs are returned once
+    execution_ids = list(dict.fromkeys(lookup.execution_ids))
+    executions, missing = engine.get_executions(execution_ids)
+    return Response(
+        render_executions(executions, missing, selected, lookup.include_data),
+        media_type="application/json",
+    )
+
+
+@router.get("/blobs/{blob_id}")
+async def get_blob(blob_id: str, engine: FlowEngine = Depends(get_flow_engine)):
+    """Download a task payload that was spilled to the blob store"""
+    try:
+        ref = engine.get_blob(blob_id)
+    except Exception as e:
+        logger.error(f"Blob not found: {blob_id}")
+        raise HTTPException(status_code=404, detail=str(e))
+    return FileResponse(ref.path, media_type=ref.media_type)
+
 
 @router.get("")
-async def list_flows(engine: FlowEngine = Depends(get_flow_engine)):
-    """List all registered flows"""
+async def list_flows(
+    if_none_match: Optional[str] = Header(None),
+    engine: FlowEngine = Depends(get_flow_engine),
+):
+    """List all registered flows
+
+    Answers `If-None-Match` with 304 while the catalogue is unchanged.
+    """
+    etag = make_etag(engine.catalogue_version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     flows = engine.list_flows()
-    return {"flows": flows, "count": len(flows)}
+    return ORJSONResponse({"flows": flows, "count": len(flows)}, headers={"ETag": etag})
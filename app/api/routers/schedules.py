@@ -0,0 +1,51 @@
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from app.api.dependencies import get_scheduler
+from app.models import ScheduleDefinition, ScheduleStatus
+from app.services.scheduler import Scheduler
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/schedules", tags=["schedules"])
+
+
+@router.post("", status_code=201, response_model=ScheduleStatus)
+async def create_schedule(
+    definition: ScheduleDefinition, scheduler: Scheduler = Depends(get_scheduler)
+):
+    """Attach a cron or interval schedule to a registered flow"""
+    try:
+        return scheduler.add(definition).to_model()
+    except ValueError as e:
+        logger.error(f"Failed to create schedule: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("", response_model=List[ScheduleStatus])
+async def list_schedules(
+    flow_id: Optional[str] = Query(None),
+    scheduler: Scheduler = Depends(get_scheduler),
+):
+    """List schedules, optionally of one flow"""
+    return [schedule.to_model() for schedule in scheduler.list_schedules(flow_id)]
+
+
+@router.get("/{schedule_id}", response_model=ScheduleStatus)
+async def get_schedule(schedule_id: str, scheduler: Scheduler = Depends(get_scheduler)):
+    """Get a schedule with its run counters"""
+    schedule = scheduler.get(schedule_id)
+    if schedule is None:
+        raise HTTPException(status_code=404, detail=f"Schedule {schedule_id} not found")
+    return schedule.to_model()
+
+
+@router.delete("/{schedule_id}", status_code=204)
+async def delete_schedule(
+    schedule_id: str, scheduler: Scheduler = Depends(get_scheduler)
+):
+    """Detach a schedule; runs already started are not cancelled"""
+    if not scheduler.remove(schedule_id):
+        raise HTTPException(status_code=404, detail=f"Schedule {schedule_id} not found")
+    return Response(status_code=204)
@@ -14,6 +14,70 @@ class Settings(BaseSettings):
     # API Settings
     API_V1_PREFIX: str = "/api/v1"
 
+    # Responses larger than this many bytes are gzip compressed
+    GZIP_MINIMUM_SIZE: int = 1024
+
+    # Total bytes of serialized finished executions kept for repeated reads
+    RESPONSE_CACHE_BYTES: int = 64 * 1024 * 1024
+
+    # Task payloads larger than this many bytes are spilled to the blob store
+    BLOB_STORE_DIR: str = "data/blobs"
+    BLOB_THRESHOLD_BYTES: int = 1024 * 1024
+
+    # Task loading
+    TASK_ENTRY_POINT_GROUP: str = "flow_manager.tasks"
+    TASK_PREWARM: bool = False
+    # Worker threads for task attempts with timeouts, deadlines or hedging
+    TASK_POOL_SIZE: int = 32
+    # Workers running map chunks; process workers default to the CPU count
+    MAP_POOL_SIZE: int = 8
+    MAP_PROCESS_POOL_SIZE: Optional[int] = None
+
+    # Pooled SQLite connections offered to tasks as the "sqlite" resource
+    SQLITE_DATABASE_PATH: Optional[str] = None
+    SQLITE_POOL_SIZE: int = 4
+
+    # Opt-in tracemalloc sampling of task memory; tracing slows allocations
+    MEMORY_PROFILING: bool = False
+    MEMORY_SAMPLE_RATE: float = 0.01
+
+    # On-demand profiling of the next executions of a flow; the endpoints
+    # answer 403 unless requests carry this token in X-Debug-Token
+    DEBUG_TOKEN: Optional[str] = None
+    PROFILE_SAMPLE_INTERVAL_SECONDS: float = 0.005
+    PROFILE_MAX_EXECUTIONS: int = 100
+
+    # Repeated Idempotency-Key headers return the first execution for this long
+    IDEMPOTENCY_TTL_SECONDS: float = 86400
+    IDEMPOTENCY_MAX_KEYS: int = 100_000
+
+    # Finished executions older than ARCHIVE_AFTER_SECONDS are compacted into
+    # compressed segments every ARCHIVE_INTERVAL_SECONDS; segments older than
+    # the retention are deleted
+    ARCHIVE_ENABLED: bool = False
+    ARCHIVE_DIR: str = "data/archive"
+    ARCHIVE_AFTER_SECONDS: float = 3600
+    ARCHIVE_INTERVAL_SECONDS: float = 300
+    ARCHIVE_RETENTION_SECONDS: Optional[float] = None
+
+    # In-process scheduler for recurring executions
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_TICK_SECONDS: float = 0.1
+    SCHEDULER_POOL_SIZE: int = 8
+
+    # Trace spans are batched to a JSONL file when enabled
+    TRACING_ENABLED: bool = False
+    TRACE_EXPORT_PATH: str = "data/traces.jsonl"
+
+    # Readiness limits, set below the point where latency collapses; unset
+    # limits are reported without failing readiness
+    READY_MAX_UTILIZATION: Optional[float] = 0.9
+    READY_MAX_QUEUE_DEPTH: Optional[int] = 8
+    READY_MAX_LOOP_LAG_SECONDS: Optional[float] = 0.25
+    READY_MAX_EXECUTIONS: Optional[int] = None
+    READY_MAX_RSS_BYTES: Optional[int] = None
+    READY_MAX_OPEN_BREAKERS: Optional[int] = None
+
     # Logging
     LOG_LEVEL: str = "INFO"
 
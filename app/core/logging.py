@@ -2,15 +2,25 @@ import logging
 import sys
 
 from app.core.config import settings
+from app.services.tracing import TraceContextFilter
 
 
 def setup_logging():
     """Configure application logging"""
+    handler = logging.StreamHandler(sys.stdout)
+    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    if settings.TRACING_ENABLED:
+        # Correlate log lines with the spans they were written in
+        handler.addFilter(TraceContextFilter())
+        log_format = (
+            "%(asctime)s - %(name)s - %(levelname)s - "
+            "[trace=%(trace_id)s span=%(span_id)s] %(message)s"
+        )
 
     logging.basicConfig(
         level=getattr(logging, settings.LOG_LEVEL),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[logging.StreamHandler(sys.stdout)],
+        format=log_format,
+        handlers=[handler],
     )
 
     # Set third-party loggers to WARNING
@@ -1,46 +1,34 @@
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+import anyio
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-
-from app.api.dependencies import flow_engine
-from app.api.routers import flows_router
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+
+from app.api.dependencies import (
+    archive_compactor,
+    flow_engine,
+    loop_lag_monitor,
+    readiness_probe,
+    resource_manager,
+    scheduler,
+    task_registry,
+)
+from app.api.routers import debug_router, flows_router, schedules_router
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.models import FlowDefinition
+from app.services import tracing
+from app.services.resources import sqlite_pool
+from app.services.tracing import SERVER, STATUS_ERROR, tracer
 
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
 
-# Create FastAPI app
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    description="A generic flow execution engine for sequential task processing",
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-@app.get("/health")
-async def health() -> dict:
-    return {"status": "ok"}
-
-
-# Include routers
-app.include_router(flows_router, prefix=settings.API_V1_PREFIX)
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # initialization code
@@ -81,10 +69,112 @@ async def lifespan(app: FastAPI):
     flow_def = FlowDefinition(**sample_flow)
     flow_engine.register_flow(flow_def)
     logger.info("Default flow loaded successfully")
+
+    if settings.SQLITE_DATABASE_PATH:
+        resource_manager.register(
+            sqlite_pool(
+                "sqlite", settings.SQLITE_DATABASE_PATH, settings.SQLITE_POOL_SIZE
+            )
+        )
+
+    if settings.TASK_PREWARM:
+        task_registry.prewarm(background=True)
+    loop_lag_monitor.start()
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    if archive_compactor is not None:
+        archive_compactor.start()
+    if settings.TRACING_ENABLED:
+        tracing.configure(
+            tracing.BatchSpanExporter(
+                tracing.JsonlFileExporter(settings.TRACE_EXPORT_PATH)
+            )
+        )
     yield  # App runs here
 
     # Shutdown
     logger.info("Shutting down...")
+    await loop_lag_monitor.stop()
+    scheduler.shutdown()
+    if archive_compactor is not None:
+        archive_compactor.stop()
+    flow_engine.shutdown()
+    resource_manager.close()
+    # Flushes queued spans
+    tracing.configure(None)
+
+
+# Create FastAPI app
+app = FastAPI(
+    title=settings.APP_NAME,
+    version=settings.APP_VERSION,
+    description="A generic flow execution engine for sequential task processing",
+    lifespan=lifespan,
+)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Run each request in a server span, continuing an incoming traceparent"""
+    if not tracer.enabled:
+        return await call_next(request)
+
+    parent = tracing.parse_traceparent(request.headers.get("traceparent"))
+    attributes = {"http.method": request.method, "http.target": request.url.path}
+    with tracer.span(
+        f"{request.method} {request.url.path}", attributes, SERVER, parent
+    ) as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            span.name = f"{request.method} {route.path}"
+            span.set_attribute("http.route", route.path)
+        span.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.set_status(STATUS_ERROR)
+    response.headers["traceparent"] = tracing.format_traceparent(span.context)
+    return response
+
+
+@app.get("/health")
+async def health() -> dict:
+    # Health checks borrow a resource, which may block
+    resources = await anyio.to_thread.run_sync(resource_manager.health)
+    return {
+        "status": "ok",
+        "circuit_breakers": flow_engine.circuit_breaker_states(),
+        "resources": resources,
+    }
+
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Report whether this instance should receive traffic, 503 when saturated"""
+    # Executions run on the default worker thread limiter
+    slots = anyio.to_thread.current_default_thread_limiter().statistics()
+    is_ready, checks = readiness_probe.check(
+        slots.borrowed_tokens, slots.total_tokens, slots.tasks_waiting
+    )
+    return JSONResponse(
+        {"status": "ready" if is_ready else "not_ready", "checks": checks},
+        status_code=200 if is_ready else 503,
+    )
+
+
+# Include routers
+app.include_router(flows_router, prefix=settings.API_V1_PREFIX)
+app.include_router(schedules_router, prefix=settings.API_V1_PREFIX)
+app.include_router(debug_router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/")
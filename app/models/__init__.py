@@ -1,9 +1,15 @@
 from .flow import (
+    CircuitBreakerConfig,
     Condition,
+    ExecutionLookup,
     Flow,
     FlowDefinition,
     FlowExecutionStatus,
+    MapConfig,
+    ScheduleDefinition,
+    ScheduleStatus,
     Task,
+    TaskMemoryUsage,
     TaskResult,
     TaskStatus,
 )
@@ -12,8 +18,14 @@ __all__ = [
     "TaskStatus",
     "TaskResult",
     "Task",
+    "CircuitBreakerConfig",
+    "MapConfig",
     "Condition",
     "Flow",
     "FlowDefinition",
     "FlowExecutionStatus",
+    "ExecutionLookup",
+    "TaskMemoryUsage",
+    "ScheduleDefinition",
+    "ScheduleStatus",
 ]
@@ -1,8 +1,8 @@
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class TaskStatus(str, Enum):
@@ -20,20 +20,56 @@ class TaskResult(BaseModel):
     message: Optional[str] = None
 
 
+class CircuitBreakerConfig(BaseModel):
+    """Circuit breaker settings for a task"""
+
+    error_rate_threshold: float = Field(default=0.5, gt=0, le=1)
+    latency_threshold_seconds: Optional[float] = Field(default=None, gt=0)
+    window_size: int = Field(default=20, ge=1)
+    min_calls: int = Field(default=10, ge=1)
+    open_seconds: float = Field(default=30.0, gt=0)
+
+
+class MapConfig(BaseModel):
+    """Fan a registered task out over chunks of a list from the context
+
+    `items` is a dotted path into the context such as `task1.data.records`.
+    """
+
+    task: str
+    items: str
+    chunk_size: int = Field(default=100, gt=0)
+    concurrency: int = Field(default=4, gt=0)
+    executor: Literal["thread", "process"] = "thread"
+
+
 class Task(BaseModel):
     """Task definition"""
 
     name: str
     description: str
+    # Id of a registered flow to run in place of a registered task
+    flow: Optional[str] = None
+    timeout_seconds: Optional[float] = Field(default=None, gt=0)
+    retries: int = Field(default=0, ge=0)
+    retry_backoff_seconds: float = Field(default=0.1, ge=0)
+    hedge_percentile: Optional[float] = Field(default=None, gt=0, lt=100)
+    circuit_breaker: Optional[CircuitBreakerConfig] = None
+    map: Optional[MapConfig] = None
 
 
 class Condition(BaseModel):
-    """Condition that routes flow based on task outcome"""
+    """Condition that routes flow based on task outcome
+
+    When `expression` is set it is evaluated over the task result and context
+    instead of comparing the status to `outcome`.
+    """
 
     name: str
     description: str
     source_task: str
-    outcome: str
+    outcome: str = "success"
+    expression: Optional[str] = None
     target_task_success: str
     target_task_failure: str
 
@@ -46,6 +82,7 @@ class Flow(BaseModel):
     start_task: str
     tasks: List[Task]
     conditions: List[Condition]
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
 
 
 class FlowDefinition(BaseModel):
@@ -54,11 +91,19 @@ class FlowDefinition(BaseModel):
     flow: Flow
 
 
+class TaskMemoryUsage(BaseModel):
+    """Sampled memory usage of a task call"""
+
+    peak_bytes: int
+    retained_bytes: int
+
+
 class FlowExecutionStatus(BaseModel):
     """Status of a flow execution"""
 
     execution_id: str
     flow_id: str
+    flow_version: Optional[int] = None
     status: str
     current_task: Optional[str] = None
     completed_tasks: List[str] = Field(default_factory=list)
@@ -66,3 +111,52 @@ class FlowExecutionStatus(BaseModel):
     started_at: str
     ended_at: Optional[str] = None
     message: Optional[str] = None
+    parent_execution_id: Optional[str] = None
+    # Only present for executions with memory sampled tasks
+    task_memory: Optional[Dict[str, TaskMemoryUsage]] = None
+
+
+class ExecutionLookup(BaseModel):
+    """Batch of execution IDs to fetch in one request"""
+
+    execution_ids: List[str] = Field(min_length=1, max_length=1000)
+    fields: Optional[List[str]] = None
+    include_data: bool = True
+
+
+class ScheduleDefinition(BaseModel):
+    """Recurring execution of a registered flow
+
+    Exactly one of `cron` (five fields, UTC) or `interval_seconds` is set.
+    A run due more than `misfire_grace_seconds` ago is a misfire: `run_once`
+    runs it once late and `skip` drops it; either way missed runs are not
+    replayed. `overlap_policy` decides whether a run starts while the
+    previous one of the same schedule is still going.
+    """
+
+    flow_id: str
+    cron: Optional[str] = None
+    interval_seconds: Optional[float] = Field(default=None, gt=0)
+    misfire_policy: Literal["run_once", "skip"] = "run_once"
+    misfire_grace_seconds: float = Field(default=1.0, ge=0)
+    overlap_policy: Literal["skip", "allow"] = "skip"
+
+    @model_validator(mode="after")
+    def _one_trigger(self) -> "ScheduleDefinition":
+        if (self.cron is None) == (self.interval_seconds is None):
+            raise ValueError("Set exactly one of cron or interval_seconds")
+        return self
+
+
+class ScheduleStatus(BaseModel):
+    """State of a schedule"""
+
+    schedule_id: str
+    definition: ScheduleDefinition
+    next_run_at: Optional[str] = None
+    running: int = 0
+    runs: int = 0
+    skipped_overlaps: int = 0
+    misfires: int = 0
+    last_execution_id: Optional[str] = None
+    last_error: Optional[str] = None
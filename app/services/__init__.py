@@ -1,11 +1,26 @@
+from .blob_store import BlobStore
 from .flow_engine import FlowEngine
+from .memory_profiler import MemoryProfiler
 from .task_registry import TaskRegistry
-from .tasks import task1_fetch_data, task2_process_data, task3_store_data
 
 __all__ = [
+    "BlobStore",
     "TaskRegistry",
     "FlowEngine",
+    "MemoryProfiler",
     "task1_fetch_data",
     "task2_process_data",
     "task3_store_data",
 ]
+
+# The default tasks are registered by dotted path; importing them here would
+# load the module at startup anyway
+_LAZY_TASKS = ("task1_fetch_data", "task2_process_data", "task3_store_data")
+
+
+def __getattr__(name: str):
+    if name in _LAZY_TASKS:
+        from . import tasks
+
+        return getattr(tasks, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
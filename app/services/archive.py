@@ -0,0 +1,210 @@
+import logging
+import os
+import threading
+import zlib
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import orjson
+
+from app.services.blob_store import BlobRef
+from app.services.execution_record import ExecutionRecord
+
+logger = logging.getLogger(__name__)
+
+DATA_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+
+class Segment:
+    """Immutable file of compressed executions and its in-memory index
+
+    Every execution is compressed on its own and stored back to back in ID
+    order, so reading one is a single seek and read. The index file holds
+    the ID range, start time range and (id, started_at, offset, length) of
+    every entry, plus the blobs its executions reference.
+    """
+
+    __slots__ = (
+        "path",
+        "min_id",
+        "max_id",
+        "min_started_at",
+        "max_started_at",
+        "ids",
+        "entries",
+        "blob_ids",
+        "size",
+    )
+
+    def __init__(self, path: Path, meta: dict):
+        self.path = path
+        self.min_id: str = meta["min_id"]
+        self.max_id: str = meta["max_id"]
+        self.min_started_at: float = meta["min_started_at"]
+        self.max_started_at: float = meta["max_started_at"]
+        self.entries: List[Tuple[str, float, int, int]] = [
+            tuple(entry) for entry in meta["entries"]
+        ]
+        self.ids = [entry[0] for entry in self.entries]
+        self.blob_ids: List[str] = meta["blob_ids"]
+        self.size: int = meta["size"]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def find(self, execution_id: str) -> Optional[Tuple[str, float, int, int]]:
+        position = bisect_left(self.ids, execution_id)
+        if position < len(self.ids) and self.ids[position] == execution_id:
+            return self.entries[position]
+        return None
+
+    def read(self, entries: Iterable[Tuple[str, float, int, int]]) -> Iterator[dict]:
+        """Decode the given entries with one open of the data file"""
+        with open(self.path, "rb") as f:
+            for _, _, offset, length in entries:
+                f.seek(offset)
+                yield orjson.loads(zlib.decompress(f.read(length)))
+
+
+class ExecutionArchive:
+    """Append-only archive of finished executions in compressed segments
+
+    Each compaction writes one segment named after its lowest execution ID.
+    Execution IDs sort by start time, so segments cover narrow ID and time
+    ranges: a lookup checks the ranges in memory and reads from one segment,
+    a time range query only opens overlapping segments, and retention deletes
+    whole segments.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        segments = []
+        for index_path in self.root.glob(f"*{INDEX_SUFFIX}"):
+            # Segments without an index were interrupted while being written
+            meta = orjson.loads(index_path.read_bytes())
+            segments.append(Segment(index_path.with_suffix(DATA_SUFFIX), meta))
+        self._publish(segments)
+
+    def _publish(self, segments: List[Segment]):
+        # Readers take the tuple without locking, so it is replaced whole.
+        # reach[i] is the highest ID in segments[:i + 1], which bounds how
+        # far back a lookup has to walk when ID ranges overlap.
+        segments = sorted(segments, key=lambda segment: segment.min_id)
+        reach = []
+        for segment in segments:
+            reach.append(max(reach[-1], segment.max_id) if reach else segment.max_id)
+        self._view = (segments, [segment.min_id for segment in segments], reach)
+
+    @property
+    def segments(self) -> List[Segment]:
+        return self._view[0]
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments)
+
+    def append(self, executions: List[ExecutionRecord]) -> Optional[Segment]:
+        """Write finished executions to a new segment"""
+        if not executions:
+            return None
+        executions = sorted(executions, key=lambda e: e.execution_id)
+        data = bytearray()
+        entries = []
+        blob_ids = []
+        for execution in executions:
+            payload = zlib.compress(orjson.dumps(execution.to_dict()))
+            entries.append(
+                (execution.execution_id, execution.started_at, len(data), len(payload))
+            )
+            data += payload
+            blob_ids.extend(
+                record.data.blob_id
+                for record in execution.results
+                if isinstance(record.data, BlobRef)
+            )
+
+        meta = {
+            "min_id": entries[0][0],
+            "max_id": entries[-1][0],
+            "min_started_at": min(entry[1] for entry in entries),
+            "max_started_at": max(entry[1] for entry in entries),
+            "entries": entries,
+            "blob_ids": blob_ids,
+            "size": len(data),
+        }
+        path = self.root / f"{meta['min_id']}{DATA_SUFFIX}"
+        # The index is written last, a segment only exists once it is there
+        _write_atomic(path, bytes(data))
+        _write_atomic(path.with_suffix(INDEX_SUFFIX), orjson.dumps(meta))
+
+        segment = Segment(path, meta)
+        with self._lock:
+            self._publish(self.segments + [segment])
+        logger.info(f"Archived {len(entries)} executions to {path.name}")
+        return segment
+
+    def get(self, execution_id: str) -> Optional[dict]:
+        """Get an archived execution, reading only the segment holding it"""
+        return self.get_many([execution_id]).get(execution_id)
+
+    def get_many(self, execution_ids: Iterable[str]) -> Dict[str, dict]:
+        """Get archived executions, reading each segment at most once"""
+        segments, min_ids, reach = self._view
+        by_segment: Dict[int, Tuple[Segment, list]] = {}
+        for execution_id in execution_ids:
+            position = bisect_right(min_ids, execution_id) - 1
+            while position >= 0 and reach[position] >= execution_id:
+                segment = segments[position]
+                entry = segment.find(execution_id)
+                if entry is not None:
+                    by_segment.setdefault(position, (segment, []))[1].append(entry)
+                    break
+                position -= 1
+
+        found = {}
+        for segment, entries in by_segment.values():
+            entries.sort(key=lambda entry: entry[2])
+            for entry, document in zip(entries, segment.read(entries)):
+                found[entry[0]] = document
+        return found
+
+    def scan(
+        self, since: Optional[float] = None, until: Optional[float] = None
+    ) -> Iterator[dict]:
+        """Archived executions started in [since, until), oldest segment first"""
+        for segment in self.segments:
+            if since is not None and segment.max_started_at < since:
+                continue
+            if until is not None and segment.min_started_at >= until:
+                continue
+            yield from segment.read(
+                entry
+                for entry in segment.entries
+                if (since is None or entry[1] >= since)
+                and (until is None or entry[1] < until)
+            )
+
+    def drop_before(self, cutoff: float) -> List[Segment]:
+        """Delete and return the segments of executions started before a cutoff"""
+        with self._lock:
+            expired = [s for s in self.segments if s.max_started_at < cutoff]
+            self._publish([s for s in self.segments if s.max_started_at >= cutoff])
+
+        for segment in expired:
+            segment.path.with_suffix(INDEX_SUFFIX).unlink(missing_ok=True)
+            segment.path.unlink(missing_ok=True)
+        if expired:
+            logger.info(f"Dropped {len(expired)} archive segments")
+        return expired
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
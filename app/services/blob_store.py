@@ -0,0 +1,126 @@
+import logging
+import mmap
+import re
+import uuid
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+BYTES_MEDIA_TYPE = "application/octet-stream"
+JSON_MEDIA_TYPE = "application/json"
+
+_SUFFIXES = {BYTES_MEDIA_TYPE: ".bin", JSON_MEDIA_TYPE: ".json"}
+_BLOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class BlobRef:
+    """Lightweight reference to a payload spilled to the blob store"""
+
+    __slots__ = ("blob_id", "size", "media_type", "store")
+
+    def __init__(self, blob_id: str, size: int, media_type: str, store: "BlobStore"):
+        self.blob_id = blob_id
+        self.size = size
+        self.media_type = media_type
+        self.store = store
+
+    @property
+    def path(self) -> Path:
+        return self.store.root / f"{self.blob_id}{_SUFFIXES[self.media_type]}"
+
+    def view(self) -> memoryview:
+        """Zero-copy read-only view of the stored bytes"""
+        with open(self.path, "rb") as f:
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def load(self) -> Any:
+        """Resolve the payload: a memoryview for bytes, the decoded value for JSON"""
+        view = self.view()
+        if self.media_type == JSON_MEDIA_TYPE:
+            return orjson.loads(view)
+        return view
+
+    def to_dict(self) -> dict:
+        return {
+            "blob_id": self.blob_id,
+            "size": self.size,
+            "media_type": self.media_type,
+        }
+
+
+class LazyTaskOutput(Mapping):
+    """Task context entry whose `data` is read from the blob store on access"""
+
+    def __init__(self, status: Any, ref: BlobRef, message: Optional[str]):
+        self._values = {"status": status, "data": ref, "message": message}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._values[key]
+        if isinstance(value, BlobRef):
+            return value.load()
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class BlobStore:
+    """Spills large task payloads to files under a data directory
+
+    Bytes payloads are written as-is; anything else is encoded as JSON. Reads
+    go through a read-only memory map so consumers never copy the file onto
+    the heap unless they decode it.
+    """
+
+    def __init__(self, root: Union[str, Path], threshold: int):
+        self.root = Path(root)
+        self.threshold = threshold
+
+    def maybe_spill(self, data: Any) -> Any:
+        """Return a BlobRef for payloads above the threshold, else the data"""
+        if data is None or self.threshold <= 0:
+            return data
+
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            size = memoryview(data).nbytes
+            if size <= self.threshold:
+                return data
+            return self._write(data, size, BYTES_MEDIA_TYPE)
+
+        try:
+            encoded = orjson.dumps(data)
+        except TypeError:
+            # Not JSON encodable, keep it inline
+            return data
+        if len(encoded) <= self.threshold:
+            return data
+        return self._write(encoded, len(encoded), JSON_MEDIA_TYPE)
+
+    def get(self, blob_id: str) -> BlobRef:
+        """Look up a stored blob by id"""
+        if _BLOB_ID.match(blob_id):
+            for media_type in _SUFFIXES:
+                ref = BlobRef(blob_id, 0, media_type, self)
+                if ref.path.exists():
+                    ref.size = ref.path.stat().st_size
+                    return ref
+        raise ValueError(f"Blob '{blob_id}' not found")
+
+    def delete(self, ref: BlobRef):
+        """Remove a stored blob if present"""
+        ref.path.unlink(missing_ok=True)
+
+    def _write(self, payload: Any, size: int, media_type: str) -> BlobRef:
+        self.root.mkdir(parents=True, exist_ok=True)
+        ref = BlobRef(uuid.uuid4().hex, size, media_type, self)
+        with open(ref.path, "wb") as f:
+            f.write(payload)
+        logger.info(f"Spilled {size} byte payload to blob {ref.blob_id}")
+        return ref
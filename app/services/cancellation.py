@@ -0,0 +1,153 @@
+import logging
+import multiprocessing
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionCancelled(Exception):
+    """Raised when a running execution has been cancelled"""
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag shared by an execution and its tasks
+
+    The engine polls the flag between steps. Work that can be interrupted
+    (async tasks, pending futures) registers a callback with `on_cancel`.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """Request cancellation and interrupt registered work"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {str(e)}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback on cancellation; returns a function that unregisters it"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled or the timeout passes; True if cancelled"""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise ExecutionCancelled()
+
+    def _discard(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+# Set in process pool workers: the shared flags and the slot of the running call
+_worker_flags = None
+_worker_slot: Optional[int] = None
+
+
+def process_cancelled() -> bool:
+    """Whether the execution of the map chunk running in this worker was cancelled
+
+    A process pool worker can't be interrupted from outside, so long chunks
+    should poll this. It is always False outside of a process pool worker.
+    """
+    return (
+        _worker_flags is not None
+        and _worker_slot is not None
+        and bool(_worker_flags[_worker_slot])
+    )
+
+
+def raise_if_process_cancelled():
+    if process_cancelled():
+        raise ExecutionCancelled()
+
+
+def _init_worker(flags):
+    global _worker_flags
+    _worker_flags = flags
+
+
+class InSlot:
+    """Process pool call that `process_cancelled` reports on"""
+
+    def __init__(self, slot: Optional[int], fn: Callable):
+        self.slot = slot
+        self.fn = fn
+        # Traced under the name of the wrapped task
+        self.__name__ = getattr(fn, "__name__", "task")
+
+    def __call__(self, *args: Any) -> Any:
+        global _worker_slot
+        _worker_slot = self.slot
+        try:
+            return self.fn(*args)
+        finally:
+            _worker_slot = None
+
+
+class ProcessCancellation:
+    """Cancellation flags shared with the workers of a process pool
+
+    The workers inherit the flag array when the pool starts them (pass
+    `initializer` and `initargs` to the pool). A run leases a slot whose flag
+    is set when its token is cancelled. Slots are reused oldest first and
+    cleared when leased, so a cancelled chunk still running keeps seeing its
+    flag long after the run ended.
+    """
+
+    def __init__(self, slots: int = 1024):
+        self.flags = multiprocessing.RawArray("b", slots)
+        self._free = deque(range(slots))
+        self._lock = threading.Lock()
+
+    @property
+    def initializer(self) -> Callable:
+        return _init_worker
+
+    @property
+    def initargs(self) -> Tuple:
+        return (self.flags,)
+
+    @contextmanager
+    def lease(self, token: CancellationToken) -> Iterator[Optional[int]]:
+        """Take a slot tied to the token; None if every slot is in use"""
+        with self._lock:
+            slot = self._free.popleft() if self._free else None
+        if slot is None:
+            yield None
+            return
+
+        self.flags[slot] = 0
+        unregister = token.on_cancel(lambda: self.flags.__setitem__(slot, 1))
+        try:
+            yield slot
+        finally:
+            unregister()
+            with self._lock:
+                self._free.append(slot)
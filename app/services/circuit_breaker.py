@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import deque
+from typing import Deque
+
+from app.models import CircuitBreakerConfig
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Count-based circuit breaker guarding one task
+
+    Outcomes of the last `window_size` calls are kept; a call counts as an
+    error when it fails, raises or is slower than the latency threshold. Once
+    at least `min_calls` are recorded and the error rate reaches the
+    threshold the breaker opens and calls fail fast. After `open_seconds` a
+    single probe is let through: success closes the breaker, failure opens
+    it again.
+    """
+
+    def __init__(self, name: str, config: CircuitBreakerConfig):
+        self.name = name
+        self.config = config
+        self.state = CLOSED
+        self._window: Deque[bool] = deque(maxlen=config.window_size)
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, config: CircuitBreakerConfig):
+        """Apply new settings, keeping the current state"""
+        with self._lock:
+            self.config = config
+            self._window = deque(self._window, maxlen=config.window_size)
+
+    def allow(self) -> bool:
+        """Whether a call may go through now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now - self._opened_at < self.config.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+            elif now - self._probe_started < self.config.open_seconds:
+                # A probe is already in flight
+                return False
+
+            self._probe_started = now
+            return True
+
+    def record(self, success: bool, duration: float):
+        """Record the outcome of a call that was allowed through"""
+        latency_limit = self.config.latency_threshold_seconds
+        error = not success or (latency_limit is not None and duration > latency_limit)
+
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if error:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._window.clear()
+                return
+
+            self._window.append(error)
+            if len(self._window) >= self.config.min_calls:
+                error_rate = sum(self._window) / len(self._window)
+                if error_rate >= self.config.error_rate_threshold:
+                    self._open()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = len(self._window)
+            return {
+                "state": self.state,
+                "calls": calls,
+                "error_rate": sum(self._window) / calls if calls else 0.0,
+            }
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._window.clear()
@@ -0,0 +1,62 @@
+import logging
+import threading
+from typing import Optional
+
+from app.services.flow_engine import FlowEngine
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveCompactor:
+    """Periodically moves finished executions to the archive
+
+    Every `interval` seconds, executions that finished at least `min_age`
+    seconds ago leave the live store for a new archive segment, and with a
+    `retention` set, segments of executions started longer ago than that are
+    deleted.
+    """
+
+    def __init__(
+        self,
+        engine: FlowEngine,
+        interval: float = 300.0,
+        min_age: float = 3600.0,
+        retention: Optional[float] = None,
+    ):
+        self.engine = engine
+        self.interval = interval
+        self.min_age = min_age
+        self.retention = retention
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="archive-compactor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self) -> int:
+        """Archive due executions and apply retention, returns executions archived"""
+        archived = self.engine.archive_executions(self.min_age)
+        if self.retention is not None:
+            dropped = self.engine.drop_archived(self.retention)
+            if dropped:
+                logger.info(f"Retention dropped {dropped} archived executions")
+        return archived
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Archive compaction failed: {str(e)}")
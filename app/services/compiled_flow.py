@@ -0,0 +1,215 @@
+import logging
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models import Flow, Task
+from app.services.expressions import Predicate, compile_expression
+from app.services.map_runner import MapStep
+from app.services.task_runner import TaskPolicy
+
+logger = logging.getLogger(__name__)
+
+END = -1
+
+# Step kinds
+TASK = 0  # registered task
+ENTER = 1  # start of an inlined sub-flow
+EXIT = 2  # end of an inlined sub-flow, yields the sub-flow task's result
+CALL = 3  # sub-flow run as a child execution
+
+# (outcome, compiled expression, success target index, failure target index)
+Route = Tuple[str, Optional[Predicate], int, int]
+
+
+class FlowSymbols:
+    """Identity and task name table of one flow version
+
+    Execution records keep only this, so a superseded `CompiledFlow` is freed
+    as soon as the last execution running on it finishes.
+    """
+
+    __slots__ = ("id", "name", "version", "task_names")
+
+    def __init__(self, id: str, name: str, version: int, task_names: Tuple[str, ...]):
+        self.id = id
+        self.name = name
+        self.version = version
+        self.task_names = task_names
+
+
+class CompiledFlow:
+    """Immutable, versioned flow plan lowered to integer task indices
+
+    Every task name referenced by the flow is interned once at registration,
+    so executions can store small integers instead of strings and routing is
+    a list lookup instead of a scan over the conditions. A plan is never
+    mutated after construction; re-registering a flow publishes a new one.
+
+    A task that references another flow is inlined when possible: the
+    sub-flow's steps are spliced into this plan between an ENTER and an EXIT
+    step, and the parent's condition on that task applies at the EXIT.
+    Sub-flows that are unknown at compile time, recursive, carry their own
+    deadline or would shadow task names in the shared context become CALL
+    steps that run as child executions. The engine recompiles a plan whenever
+    one of its sub-flows is registered again.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "version",
+        "definition",
+        "symbols",
+        "task_names",
+        "task_index",
+        "kinds",
+        "start",
+        "routes",
+        "policies",
+        "maps",
+        "deadline",
+        "enter_targets",
+        "subflows",
+        "_routes",
+        "_tasks",
+        "_resolve",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        flow: Flow,
+        version: int = 1,
+        resolve: Optional[Callable[[str], Optional[Flow]]] = None,
+    ):
+        self.id = flow.id
+        self.name = flow.name
+        self.version = version
+        self.definition = flow
+        self.task_names: List[str] = []
+        self.task_index: Dict[str, int] = {}
+        self.kinds: List[int] = []
+        self.enter_targets: Dict[int, int] = {}
+        self.subflows: Dict[int, str] = {}
+        self._routes: Dict[int, Route] = {}
+        self._tasks: Dict[int, Task] = {}
+        self._resolve = resolve
+
+        self.start = self._compile(flow, None, (flow.id,))
+
+        size = len(self.task_names)
+        self.routes: List[Optional[Route]] = [
+            self._routes.get(index) for index in range(size)
+        ]
+        tasks = [self._tasks.get(index) for index in range(size)]
+        self.policies: List[Optional[TaskPolicy]] = [
+            TaskPolicy.from_task(task) if task else None for task in tasks
+        ]
+        self.maps: List[Optional[MapStep]] = [
+            MapStep.from_task(task) if task else None for task in tasks
+        ]
+        self.deadline: Optional[float] = flow.deadline_seconds
+        self.task_names = tuple(self.task_names)
+        self.symbols = FlowSymbols(self.id, self.name, version, self.task_names)
+        del self._routes, self._tasks, self._resolve
+
+    def intern(self, task_name: str) -> int:
+        """Return the index for a task name, allocating one if needed"""
+        if task_name == "end":
+            return END
+        index = self.task_index.get(task_name)
+        if index is None:
+            index = self._add_step(task_name, TASK)
+            self.task_index[task_name] = index
+        return index
+
+    def next_task(self, task: int, result: Any, context: Mapping) -> Optional[int]:
+        """Route from a finished task, or None if it has no condition"""
+        route = self.routes[task]
+        if route is None:
+            return None
+        outcome, predicate, success, failure = route
+        if predicate is None:
+            return success if result.status == outcome else failure
+        try:
+            return success if predicate(result, context) else failure
+        except Exception as e:
+            logger.warning(f"Condition on {self.task_names[task]} failed: {str(e)}")
+            return failure
+
+    def _add_step(self, task_name: str, kind: int) -> int:
+        index = len(self.task_names)
+        self.task_names.append(task_name)
+        self.kinds.append(kind)
+        return index
+
+    def _target(self, task_name: str, exit: Optional[int]) -> int:
+        # Inside a sub-flow, "end" leaves to the EXIT step
+        if task_name == "end" and exit is not None:
+            return exit
+        return self.intern(task_name)
+
+    def _compile(self, flow: Flow, exit: Optional[int], ancestors: Tuple) -> int:
+        """Add a flow's steps to the plan and return its start index"""
+        for task in flow.tasks:
+            self._tasks[self.intern(task.name)] = task
+
+        for condition in flow.conditions:
+            source = self.intern(condition.source_task)
+            if source in self._routes:
+                # The first condition for a task wins
+                continue
+            predicate = None
+            if condition.expression is not None:
+                try:
+                    predicate = compile_expression(condition.expression)
+                except ValueError as e:
+                    raise ValueError(f"Condition '{condition.name}': {str(e)}") from e
+            self._routes[source] = (
+                condition.outcome,
+                predicate,
+                self._target(condition.target_task_success, exit),
+                self._target(condition.target_task_failure, exit),
+            )
+
+        if exit is not None:
+            # Inner tasks without a condition leave the sub-flow
+            for task in flow.tasks:
+                self._routes.setdefault(self.task_index[task.name], _goto(exit))
+
+        for task in flow.tasks:
+            if task.flow is not None:
+                self._compile_subflow(self.task_index[task.name], task.flow, ancestors)
+
+        return self._target(flow.start_task, exit)
+
+    def _compile_subflow(self, index: int, flow_id: str, ancestors: Tuple):
+        subflow = self._resolve(flow_id) if self._resolve else None
+        if not self._can_inline(subflow, ancestors):
+            self.kinds[index] = CALL
+            self.subflows[index] = flow_id
+            return
+
+        self.kinds[index] = ENTER
+        exit = self._add_step(self.task_names[index], EXIT)
+        # The parent's condition on the task is evaluated when the sub-flow exits
+        route = self._routes.pop(index, None)
+        if route is not None:
+            self._routes[exit] = route
+        self.enter_targets[index] = self._compile(subflow, exit, ancestors + (flow_id,))
+
+    def _can_inline(self, subflow: Optional[Flow], ancestors: Tuple) -> bool:
+        if subflow is None or subflow.id in ancestors:
+            return False
+        if subflow.deadline_seconds is not None:
+            return False
+        names = {task.name for task in subflow.tasks}
+        for condition in subflow.conditions:
+            names.update((condition.target_task_success, condition.target_task_failure))
+        names.discard("end")
+        return names.isdisjoint(self.task_index)
+
+
+def _goto(target: int) -> Route:
+    # Both branches lead to the same step
+    return ("", None, target, target)
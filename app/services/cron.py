@@ -0,0 +1,94 @@
+from datetime import UTC, datetime, timedelta
+from typing import List, Tuple
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# (low, high) of minute, hour, day of month, month and day of week
+FIELD_RANGES: Tuple[Tuple[int, int], ...] = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_field(field: str, low: int, high: int) -> frozenset:
+    values = set()
+    for part in field.split(","):
+        expr, _, step = part.partition("/")
+        if expr == "*":
+            start, end = low, high
+        elif "-" in expr:
+            start, end = (int(value) for value in expr.split("-", 1))
+        else:
+            start = end = int(expr)
+            if step:
+                end = high
+        step_value = int(step) if step else 1
+        if not low <= start <= end <= high or step_value < 1:
+            raise ValueError(f"Cron field out of range: {field}")
+        values.update(range(start, end + 1, step_value))
+    return frozenset(values)
+
+
+class CronExpression:
+    """Five field cron expression evaluated in UTC
+
+    Supports `*`, values, ranges, lists and steps such as `*/15` or `1-5`,
+    plus the `@hourly` style aliases. As in Vixie cron, a day matches when
+    either the day of month or the day of week matches if both are
+    restricted.
+    """
+
+    __slots__ = ("expression", "minutes", "hours", "days", "months", "weekdays")
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        try:
+            parsed: List[frozenset] = [
+                _parse_field(field, low, high)
+                for field, (low, high) in zip(fields, FIELD_RANGES)
+            ]
+        except ValueError as e:
+            raise ValueError(f"Invalid cron expression {expression!r}: {e}") from None
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # 0 and 7 are both Sunday, datetime counts Monday as 0
+        self.weekdays = frozenset((day - 1) % 7 for day in weekdays)
+        # With one of the two day fields restricted, only that one decides
+        if fields[2] == "*" and fields[4] != "*":
+            self.days = frozenset()
+        elif fields[4] == "*" and fields[2] != "*":
+            self.weekdays = frozenset()
+
+    def _day_matches(self, moment: datetime) -> bool:
+        return moment.day in self.days or moment.weekday() in self.weekdays
+
+    def next_after(self, timestamp: float) -> float:
+        """First matching minute strictly after a UNIX timestamp"""
+        moment = datetime.fromtimestamp(timestamp, UTC).replace(
+            second=0, microsecond=0
+        ) + timedelta(minutes=1)
+        # Skips whole months, days and hours at a time; five years covers
+        # any satisfiable expression including February 29th
+        limit = moment.year + 5
+        while moment.year <= limit:
+            if moment.month not in self.months:
+                year, month = divmod(moment.month, 12)
+                moment = moment.replace(
+                    year=moment.year + year, month=month + 1, day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
@@ -0,0 +1,47 @@
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def new_execution_id(timestamp: Optional[float] = None) -> str:
+    """UUIDv7 style ID whose string form sorts by creation time
+
+    The top 48 bits hold the Unix time in milliseconds. IDs created in the
+    same millisecond use the next 12 bits as a counter, so IDs from this
+    process are strictly increasing; the remaining 62 bits are random.
+    """
+    global _last_ms, _counter
+    ms = int((time.time() if timestamp is None else timestamp) * 1000)
+    with _lock:
+        if ms <= _last_ms:
+            # Same millisecond or the clock stepped back: keep counting
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+            ms = _last_ms
+        else:
+            _last_ms = ms
+            _counter = 0
+        counter = _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b
+    return str(uuid.UUID(int=value))
+
+
+def execution_id_time(execution_id: str) -> Optional[float]:
+    """Creation time of a time-ordered execution ID, None for other IDs"""
+    try:
+        value = uuid.UUID(execution_id)
+    except ValueError:
+        return None
+    if value.version != 7:
+        return None
+    return (value.int >> 80) / 1000
@@ -0,0 +1,152 @@
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import UTC, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ExecutionIndex:
+    """Secondary indexes over executions keyed by insertion sequence
+
+    Every execution gets a monotonically increasing sequence number when it
+    is added. The live, flow, status and (flow, status) indexes keep sorted
+    lists of sequence numbers, so a filtered page is a bisect plus a slice
+    and cursors stay stable while new executions are inserted or removed.
+    The ID and start columns drop their removed prefix, so an index whose
+    oldest executions are archived does not keep growing. All operations are
+    short and run under a single lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def clear(self):
+        """Drop all indexed executions"""
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        # Columns by sequence number minus _base. Removed executions leave a
+        # None until every older one is removed too and the prefix is trimmed
+        self._base = 0
+        self._ids: List[Optional[str]] = []
+        self._started: List[float] = []
+        self._live: List[int] = []
+        self._seq_by_id: Dict[str, int] = {}
+        self._flow_by_seq: Dict[int, str] = {}
+        self._status_by_seq: Dict[int, str] = {}
+        self._by_flow: Dict[str, List[int]] = defaultdict(list)
+        self._by_status: Dict[str, List[int]] = defaultdict(list)
+        self._by_flow_status: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+
+    def add(self, execution_id: str, flow_id: str, status: str, started_at: float):
+        """Index a new execution started at the given epoch timestamp"""
+        with self._lock:
+            seq = self._base + len(self._ids)
+            # Concurrent adders can arrive slightly out of clock order; keep
+            # the start column sorted so it stays bisectable
+            if self._started and started_at < self._started[-1]:
+                started_at = self._started[-1]
+            self._ids.append(execution_id)
+            self._started.append(started_at)
+            self._seq_by_id[execution_id] = seq
+            self._flow_by_seq[seq] = flow_id
+            self._status_by_seq[seq] = status
+            self._live.append(seq)
+            self._by_flow[flow_id].append(seq)
+            self._by_status[status].append(seq)
+            self._by_flow_status[(flow_id, status)].append(seq)
+
+    def update_status(self, execution_id: str, flow_id: str, status: str):
+        """Move an execution between status indexes"""
+        with self._lock:
+            seq = self._seq_by_id.get(execution_id)
+            if seq is None:
+                # Cleared while the execution was still running
+                return
+            previous = self._status_by_seq[seq]
+            if previous == status:
+                return
+
+            self._remove(self._by_status[previous], seq)
+            self._remove(self._by_flow_status[(flow_id, previous)], seq)
+            insort(self._by_status[status], seq)
+            insort(self._by_flow_status[(flow_id, status)], seq)
+            self._status_by_seq[seq] = status
+
+    def remove(self, execution_ids: Iterable[str]):
+        """Drop executions from every index, e.g. once they are archived"""
+        with self._lock:
+            for execution_id in execution_ids:
+                seq = self._seq_by_id.pop(execution_id, None)
+                if seq is None:
+                    continue
+                flow_id = self._flow_by_seq.pop(seq)
+                status = self._status_by_seq.pop(seq)
+                self._ids[seq - self._base] = None
+                self._remove(self._live, seq)
+                self._remove(self._by_flow[flow_id], seq)
+                self._remove(self._by_status[status], seq)
+                self._remove(self._by_flow_status[(flow_id, status)], seq)
+
+            # Archiving removes the oldest executions first, so the removed
+            # slots gather at the front of the columns
+            trimmed = 0
+            while trimmed < len(self._ids) and self._ids[trimmed] is None:
+                trimmed += 1
+            if trimmed:
+                del self._ids[:trimmed]
+                del self._started[:trimmed]
+                self._base += trimmed
+
+    def query(
+        self,
+        flow_id: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        cursor: Optional[int] = None,
+        limit: int = 50,
+    ) -> Tuple[List[str], Optional[int]]:
+        """Return execution IDs newest first, plus the cursor for the next page"""
+        if since is not None and since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+
+        with self._lock:
+            return self._query(flow_id, status, since, cursor, limit)
+
+    def _query(
+        self,
+        flow_id: Optional[str],
+        status: Optional[str],
+        since: Optional[datetime],
+        cursor: Optional[int],
+        limit: int,
+    ) -> Tuple[List[str], Optional[int]]:
+        if flow_id is not None and status is not None:
+            seqs = self._by_flow_status.get((flow_id, status), [])
+        elif flow_id is not None:
+            seqs = self._by_flow.get(flow_id, [])
+        elif status is not None:
+            seqs = self._by_status.get(status, [])
+        else:
+            seqs = self._live
+
+        upper = self._base + len(self._ids) if cursor is None else cursor
+        lower = self._base
+        if since is not None:
+            lower += bisect_left(self._started, since.timestamp())
+
+        hi = bisect_left(seqs, upper)
+        lo = max(bisect_left(seqs, lower), hi - limit)
+        page = seqs[lo:hi][::-1]
+        more = lo > 0 and seqs[lo - 1] >= lower
+
+        next_cursor = page[-1] if page and more else None
+        return [self._ids[seq - self._base] for seq in page], next_cursor
+
+    @staticmethod
+    def _remove(seqs: List[int], seq: int):
+        position = bisect_left(seqs, seq)
+        if position < len(seqs) and seqs[position] == seq:
+            del seqs[position]
@@ -0,0 +1,265 @@
+import cProfile
+import io
+import logging
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def _depth(frame: Optional[FrameType]) -> int:
+    depth = 0
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+class ProfileSession:
+    """Profiles requested for the next executions of one flow
+
+    cProfile statistics of every profiled execution are merged into one
+    pstats table, and the stack samples into collapsed stacks, the
+    `frame;frame;frame count` lines flamegraph tools read.
+    """
+
+    def __init__(self, flow_id: str, executions: int, interval: float):
+        self.flow_id = flow_id
+        self.requested = executions
+        self.interval = interval
+        self.created_at = time.time()
+        self._lock = threading.Lock()
+        self._pending = executions
+        self._running = 0
+        self.profiled = 0
+        self.samples = 0
+        self.stats: Optional[pstats.Stats] = None
+        self.stacks: Counter = Counter()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def done(self) -> bool:
+        return self.profiled >= self.requested
+
+    def claim(self) -> bool:
+        """Take one of the remaining executions, if any"""
+        with self._lock:
+            if self._pending <= 0:
+                return False
+            self._pending -= 1
+            self._running += 1
+            return True
+
+    def unclaim(self):
+        with self._lock:
+            self._pending += 1
+            self._running -= 1
+
+    def add(self, profile: cProfile.Profile, stacks: Counter):
+        """Merge the results of one profiled execution"""
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+            self.stacks.update(stacks)
+            self.samples += sum(stacks.values())
+            self._running -= 1
+            self.profiled += 1
+
+    def top_functions(self, limit: int = 30, sort: str = "cumulative") -> List[dict]:
+        """Functions with the most time, in the order pstats sorts them"""
+        with self._lock:
+            if self.stats is None:
+                return []
+            self.stats.sort_stats(sort)
+            functions = []
+            for func in self.stats.fcn_list[:limit]:
+                primitive, calls, total, cumulative, _ = self.stats.stats[func]
+                functions.append(
+                    {
+                        "function": pstats.func_std_string(func),
+                        "calls": calls,
+                        "primitive_calls": primitive,
+                        "total_seconds": total,
+                        "cumulative_seconds": cumulative,
+                    }
+                )
+            return functions
+
+    def pstats_text(self, limit: int = 30, sort: str = "cumulative") -> str:
+        """The table `pstats` prints, as text"""
+        with self._lock:
+            if self.stats is None:
+                return ""
+            stream = io.StringIO()
+            self.stats.stream = stream
+            self.stats.sort_stats(sort).print_stats(limit)
+            return stream.getvalue()
+
+    def pstats_dump(self) -> bytes:
+        """Merged statistics in the file format `pstats.Stats` and snakeviz load"""
+        with self._lock:
+            return marshal.dumps(self.stats.stats if self.stats is not None else {})
+
+    def collapsed(self) -> str:
+        with self._lock:
+            return "".join(
+                f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+            )
+
+    def to_dict(self) -> dict:
+        return {
+            "flow_id": self.flow_id,
+            "requested": self.requested,
+            "profiled": self.profiled,
+            "running": self._running,
+            "done": self.done,
+            "interval_seconds": self.interval,
+            "samples": self.samples,
+            "created_at": self.created_at,
+        }
+
+
+class ActiveProfile:
+    """cProfile and a stack sampler attached to the thread of one execution"""
+
+    def __init__(self, session: ProfileSession, base_depth: int):
+        self.session = session
+        self.base_depth = base_depth
+        self.thread_id = threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.profile = cProfile.Profile()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._sample, name="profile-sampler", daemon=True
+        )
+
+    def start(self):
+        self._sampler.start()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.session.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            # Drop the frames the execution was started from
+            frames = frames[: len(frames) - self.base_depth]
+            # and samples taken while the profiler itself starts or stops
+            if frames and frames[-1].f_code.co_filename != __file__:
+                labels = map(_frame_label, reversed(frames))
+                self.stacks[";".join(labels)] += 1
+
+
+class ExecutionProfiler:
+    """Profiles the next executions of a flow on request
+
+    Nothing is traced unless a session is waiting for executions: until then
+    the engine only checks that `armed` is empty before running one. A profiled
+    execution runs under cProfile while a sampler thread records the stack of
+    its thread every `interval` seconds. Only the execution's own thread is
+    profiled; task attempts moved to the task pool (timeouts, deadlines,
+    hedging) show up as time spent waiting for them. Python allows one
+    profiler at a time, so executions that start while another one is being
+    profiled run normally and leave their slot to a later one.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        if interval <= 0:
+            raise ValueError("Sampling interval must be positive")
+        self.interval = interval
+        # Sessions by flow, kept for their results once finished
+        self.sessions: Dict[str, ProfileSession] = {}
+        # Sessions still waiting for executions; empty unless profiling
+        self.armed: Dict[str, ProfileSession] = {}
+        self._active = threading.Lock()
+
+    def start(
+        self, flow_id: str, executions: int, interval: Optional[float] = None
+    ) -> ProfileSession:
+        """Profile the next `executions` executions, replacing earlier results"""
+        if executions < 1:
+            raise ValueError("At least one execution must be profiled")
+        session = ProfileSession(flow_id, executions, interval or self.interval)
+        self.sessions[flow_id] = session
+        self.armed[flow_id] = session
+        logger.info(f"Profiling the next {executions} executions of {flow_id}")
+        return session
+
+    def get(self, flow_id: str) -> Optional[ProfileSession]:
+        return self.sessions.get(flow_id)
+
+    def discard(self, flow_id: str) -> Optional[ProfileSession]:
+        """Stop profiling a flow and drop its results"""
+        self.armed.pop(flow_id, None)
+        return self.sessions.pop(flow_id, None)
+
+    def begin(self, flow_id: str) -> Optional[ActiveProfile]:
+        """Start profiling an execution on this thread if a session wants it"""
+        session = self.armed.get(flow_id)
+        if session is None or not session.claim():
+            return None
+        if session.pending == 0:
+            # Executions of the flow stop checking once every slot is taken
+            self._disarm(session)
+        if not self._active.acquire(blocking=False):
+            # Another execution is being profiled
+            self._unclaim(session)
+            return None
+        try:
+            # Samples start below the caller, i.e. inside the execution
+            active = ActiveProfile(session, _depth(sys._getframe(1)))
+            active.start()
+        except Exception as e:
+            # e.g. another profiler is already attached to the interpreter
+            self._active.release()
+            self._unclaim(session)
+            logger.warning(f"Failed to start profiling {flow_id}: {str(e)}")
+            return None
+        return active
+
+    def _disarm(self, session: ProfileSession):
+        if self.armed.get(session.flow_id) is session:
+            self.armed.pop(session.flow_id, None)
+
+    def _unclaim(self, session: ProfileSession):
+        session.unclaim()
+        if self.sessions.get(session.flow_id) is session:
+            self.armed[session.flow_id] = session
+
+    def end(self, active: ActiveProfile):
+        """Stop profiling an execution and merge its results"""
+        try:
+            active.stop()
+        finally:
+            self._active.release()
+        active.session.add(active.profile, active.stacks)
+        if active.session.done:
+            logger.info(f"Profiling of {active.session.flow_id} finished")
@@ -0,0 +1,179 @@
+from datetime import UTC, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models import FlowExecutionStatus, TaskMemoryUsage, TaskResult, TaskStatus
+from app.services.blob_store import BlobRef
+from app.services.compiled_flow import END, CompiledFlow, FlowSymbols
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, UTC).isoformat()
+
+
+class TaskRecord:
+    """Outcome of one task run inside an execution"""
+
+    __slots__ = ("task", "status", "data", "message")
+
+    def __init__(
+        self, task: int, status: TaskStatus, data: Any, message: Optional[str]
+    ):
+        self.task = task
+        self.status = status
+        self.data = data
+        self.message = message
+
+    def public_data(self) -> Any:
+        """Task data as exposed by the API, spilled payloads as references"""
+        if isinstance(self.data, BlobRef):
+            return self.data.to_dict()
+        return self.data
+
+    def to_dict(self, include_data: bool = True) -> dict:
+        result = {"status": self.status.value}
+        if include_data:
+            result["data"] = self.public_data()
+        result["message"] = self.message
+        return result
+
+
+class ExecutionRecord:
+    """Compact internal representation of a flow execution
+
+    Task names are stored as indices into the compiled flow and timestamps as
+    epoch seconds. The pydantic `FlowExecutionStatus` is only built when an
+    execution leaves the engine through the API.
+    """
+
+    __slots__ = (
+        "execution_id",
+        "flow",
+        "status",
+        "current_task",
+        "results",
+        "started_at",
+        "ended_at",
+        "message",
+        "parent_execution_id",
+        "revision",
+        "memory",
+    )
+
+    def __init__(
+        self,
+        execution_id: str,
+        flow: CompiledFlow,
+        started_at: float,
+        parent_execution_id: Optional[str] = None,
+    ):
+        self.execution_id = execution_id
+        self.flow: FlowSymbols = flow.symbols
+        self.status = "running"
+        self.current_task = flow.start
+        self.results: List[TaskRecord] = []
+        self.started_at = started_at
+        self.ended_at: Optional[float] = None
+        self.message: Optional[str] = None
+        self.parent_execution_id = parent_execution_id
+        # Bumped after every change, so it never runs ahead of the state
+        self.revision = 0
+        # (peak, retained) bytes of memory sampled tasks, by task index
+        self.memory: Optional[Dict[int, Tuple[int, int]]] = None
+
+    @property
+    def flow_id(self) -> str:
+        return self.flow.id
+
+    @property
+    def flow_version(self) -> int:
+        return self.flow.version
+
+    @property
+    def completed_tasks(self) -> List[str]:
+        names = self.flow.task_names
+        return [names[record.task] for record in self.results]
+
+    def current_task_name(self) -> Optional[str]:
+        if self.current_task == END:
+            return None
+        return self.flow.task_names[self.current_task]
+
+    def failed_tasks(self) -> List[str]:
+        names = self.flow.task_names
+        failed = {}
+        for record in self.results:
+            failed[names[record.task]] = record.status == TaskStatus.FAILURE
+        return [name for name, is_failed in failed.items() if is_failed]
+
+    def task_memory(self) -> Optional[Dict[str, dict]]:
+        if self.memory is None:
+            return None
+        names = self.flow.task_names
+        return {
+            names[task]: {"peak_bytes": peak, "retained_bytes": retained}
+            for task, (peak, retained) in self.memory.items()
+        }
+
+    def to_model(self) -> FlowExecutionStatus:
+        """Build the API model for this execution"""
+        names = self.flow.task_names
+        task_results = {
+            names[record.task]: TaskResult.model_construct(
+                status=record.status,
+                data=record.public_data(),
+                message=record.message,
+            )
+            for record in self.results
+        }
+        return FlowExecutionStatus.model_construct(
+            execution_id=self.execution_id,
+            flow_id=self.flow.id,
+            flow_version=self.flow.version,
+            status=self.status,
+            current_task=self.current_task_name(),
+            completed_tasks=self.completed_tasks,
+            task_results=task_results,
+            started_at=_isoformat(self.started_at),
+            ended_at=_isoformat(self.ended_at),
+            message=self.message,
+            parent_execution_id=self.parent_execution_id,
+            task_memory=(
+                {
+                    name: TaskMemoryUsage.model_construct(**usage)
+                    for name, usage in self.task_memory().items()
+                }
+                if self.memory is not None
+                else None
+            ),
+        )
+
+    def to_dict(
+        self, fields: Optional[Iterable[str]] = None, include_data: bool = True
+    ) -> dict:
+        """Render the JSON shape of `FlowExecutionStatus` without pydantic"""
+        wanted = FlowExecutionStatus.model_fields if fields is None else fields
+        names = self.flow.task_names
+        result = {}
+        for field in FlowExecutionStatus.model_fields:
+            if field not in wanted:
+                continue
+            if field == "flow_id":
+                result[field] = self.flow.id
+            elif field == "current_task":
+                result[field] = self.current_task_name()
+            elif field == "completed_tasks":
+                result[field] = self.completed_tasks
+            elif field == "task_results":
+                result[field] = {
+                    names[record.task]: record.to_dict(include_data)
+                    for record in self.results
+                }
+            elif field == "task_memory":
+                result[field] = self.task_memory()
+            elif field in ("started_at", "ended_at"):
+                result[field] = _isoformat(getattr(self, field))
+            else:
+                result[field] = getattr(self, field)
+        return result
@@ -0,0 +1,87 @@
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.services.execution_record import ExecutionRecord
+
+
+class ExecutionStore:
+    """Lock-striped map of execution ID to execution record
+
+    Records are spread over a power-of-two number of shards, each guarded by
+    its own lock, so concurrent writers only contend when they hash to the
+    same shard.
+    """
+
+    def __init__(self, shards: int = 64):
+        if shards <= 0 or shards & (shards - 1):
+            raise ValueError("Shard count must be a positive power of two")
+        self._mask = shards - 1
+        self._shards: List[Dict[str, ExecutionRecord]] = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def _shard(self, execution_id: str) -> int:
+        return hash(execution_id) & self._mask
+
+    def add(self, execution: ExecutionRecord):
+        """Store a new execution record"""
+        shard = self._shard(execution.execution_id)
+        with self._locks[shard]:
+            self._shards[shard][execution.execution_id] = execution
+
+    def get(self, execution_id: str) -> Optional[ExecutionRecord]:
+        """Get an execution record, or None if unknown"""
+        return self._shards[self._shard(execution_id)].get(execution_id)
+
+    def get_many(self, execution_ids: Iterable[str]) -> Dict[str, ExecutionRecord]:
+        """Get the known records among many IDs, reading each shard once"""
+        by_shard: Dict[int, List[str]] = {}
+        for execution_id in execution_ids:
+            by_shard.setdefault(self._shard(execution_id), []).append(execution_id)
+
+        found = {}
+        for shard, ids in by_shard.items():
+            records = self._shards[shard]
+            for execution_id in ids:
+                execution = records.get(execution_id)
+                if execution is not None:
+                    found[execution_id] = execution
+        return found
+
+    def __getitem__(self, execution_id: str) -> ExecutionRecord:
+        execution = self.get(execution_id)
+        if execution is None:
+            raise KeyError(execution_id)
+        return execution
+
+    def __contains__(self, execution_id: str) -> bool:
+        return execution_id in self._shards[self._shard(execution_id)]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def values(self) -> Iterator[ExecutionRecord]:
+        """Iterate over a per-shard snapshot of the stored records"""
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                records = list(shard.values())
+            yield from records
+
+    def remove_many(self, execution_ids: Iterable[str]) -> List[ExecutionRecord]:
+        """Remove and return the records of the given IDs"""
+        removed = []
+        for execution_id in execution_ids:
+            shard = self._shard(execution_id)
+            with self._locks[shard]:
+                execution = self._shards[shard].pop(execution_id, None)
+            if execution is not None:
+                removed.append(execution)
+        return removed
+
+    def clear(self) -> List[ExecutionRecord]:
+        """Remove and return every stored record"""
+        removed = []
+        for index, lock in enumerate(self._locks):
+            with lock:
+                removed.extend(self._shards[index].values())
+                self._shards[index] = {}
+        return removed
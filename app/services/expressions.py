@@ -0,0 +1,183 @@
+import ast
+from collections.abc import Mapping
+from typing import Any, Callable
+
+# Names an expression may refer to; bound per evaluation
+VARIABLES = ("result", "status", "data", "message", "context")
+
+FUNCTIONS = {"len": len, "min": min, "max": max, "abs": abs}
+
+# Bounds on what an expression may build, so registering one can't make
+# every evaluation allocate without limit
+MAX_CONSTANT_LENGTH = 1000
+MAX_REPEAT_LENGTH = 10_000
+
+_SEQUENCES = (str, bytes, list, tuple)
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.In,
+    ast.NotIn,
+    ast.Is,
+    ast.IsNot,
+    ast.IfExp,
+    ast.Constant,
+    ast.Name,
+    ast.Load,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Call,
+    ast.List,
+    ast.Tuple,
+)
+
+Predicate = Callable[[Any, Mapping], bool]
+
+
+def _mul(left: Any, right: Any) -> Any:
+    """Multiplication that refuses to repeat a sequence past MAX_REPEAT_LENGTH"""
+    for sequence, count in ((left, right), (right, left)):
+        if isinstance(sequence, _SEQUENCES) and isinstance(count, int):
+            if len(sequence) * count > MAX_REPEAT_LENGTH:
+                raise ValueError("Repeated sequence is too long")
+    return left * right
+
+
+def _field(value: Any, name: str) -> Any:
+    """Attribute access: mapping key or public attribute, None when missing"""
+    if isinstance(value, Mapping):
+        return value.get(name)
+    return getattr(value, name, None)
+
+
+class _Validator(ast.NodeVisitor):
+    def generic_visit(self, node: ast.AST):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+        super().generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant):
+        if isinstance(node.value, _SEQUENCES) and len(node.value) > MAX_CONSTANT_LENGTH:
+            raise ValueError(f"Constants are limited to {MAX_CONSTANT_LENGTH} items")
+
+    def visit_BinOp(self, node: ast.BinOp):
+        if isinstance(node.op, ast.Mult) and any(
+            _is_sequence(operand) for operand in (node.left, node.right)
+        ):
+            raise ValueError("Sequences can't be repeated with '*'")
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name):
+        if node.id not in VARIABLES and node.id not in FUNCTIONS:
+            raise ValueError(f"Unknown name '{node.id}'")
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if node.attr.startswith("_"):
+            raise ValueError(f"Private attribute '{node.attr}' is not allowed")
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise ValueError("Only len, min, max and abs can be called")
+        if node.keywords:
+            raise ValueError("Keyword arguments are not supported")
+        for arg in node.args:
+            self.visit(arg)
+
+
+def _is_sequence(node: ast.AST) -> bool:
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, _SEQUENCES)
+    return isinstance(node, (ast.List, ast.Tuple))
+
+
+class _FieldAccess(ast.NodeTransformer):
+    """Rewrite `a.b` into `_field(a, "b")` so lookups work on dicts and objects
+
+    `a * b` becomes `_mul(a, b)`, which bounds repeating sequences from data.
+    """
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        return ast.Call(
+            func=ast.Name(id="_field", ctx=ast.Load()),
+            args=[self.visit(node.value), ast.Constant(node.attr)],
+            keywords=[],
+        )
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        if not isinstance(node.op, ast.Mult):
+            return node
+        return ast.Call(
+            func=ast.Name(id="_mul", ctx=ast.Load()),
+            args=[node.left, node.right],
+            keywords=[],
+        )
+
+
+def compile_expression(source: str) -> Predicate:
+    """Compile a condition expression into a predicate over (result, context)
+
+    The expression is validated against a small whitelist of Python syntax
+    and compiled once into a plain function, so evaluating it costs a single
+    call. Available names are `result`, `status`, `data`, `message` and
+    `context`; dotted access works on both mappings and objects, e.g.
+    ``len(data.records) > 1000 and context.task1.status == "success"``.
+    """
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression '{source}': {e.msg}") from None
+    _Validator().visit(tree)
+
+    # Only bind the shorthand names the expression actually uses
+    used = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    bindings = [
+        ast.Assign(
+            targets=[ast.Name(id=name, ctx=ast.Store())],
+            value=ast.Attribute(
+                value=ast.Name(id="result", ctx=ast.Load()), attr=name, ctx=ast.Load()
+            ),
+        )
+        for name in ("status", "data", "message")
+        if name in used
+    ]
+    body = _FieldAccess().visit(tree).body
+    function = ast.FunctionDef(
+        name="condition",
+        args=ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(arg="result"), ast.arg(arg="context")],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        ),
+        body=[*bindings, ast.Return(value=body)],
+        decorator_list=[],
+    )
+    module = ast.fix_missing_locations(ast.Module(body=[function], type_ignores=[]))
+
+    namespace = {"__builtins__": {}, "_field": _field, "_mul": _mul, **FUNCTIONS}
+    exec(compile(module, f"<condition {source!r}>", "exec"), namespace)
+    return namespace["condition"]
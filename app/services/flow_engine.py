@@ -1,38 +1,207 @@
 import logging
-import uuid
+import threading
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import UTC, datetime
-from typing import Dict, Optional
-
-from app.models import (
-    Condition,
-    Flow,
-    FlowDefinition,
-    FlowExecutionStatus,
-    TaskResult,
-    TaskStatus,
+from functools import partial
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from app.models import Flow, FlowDefinition, FlowExecutionStatus, TaskResult, TaskStatus
+from app.services.archive import ExecutionArchive
+from app.services.blob_store import BlobRef, BlobStore, LazyTaskOutput
+from app.services.cancellation import (
+    CancellationToken,
+    ExecutionCancelled,
+    ProcessCancellation,
 )
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.compiled_flow import CALL, END, ENTER, EXIT, CompiledFlow
+from app.services.execution_ids import new_execution_id
+from app.services.execution_index import ExecutionIndex
+from app.services.execution_profiler import ExecutionProfiler, ProfileSession
+from app.services.execution_record import ExecutionRecord, TaskRecord
+from app.services.execution_store import ExecutionStore
+from app.services.flow_stats import FlowStats
+from app.services.idempotency import IdempotencyTable
+from app.services.map_runner import MapStep, run_map
+from app.services.memory_profiler import MemoryProfiler
+from app.services.resources import RESOURCES_KEY, ResourceManager
 from app.services.task_registry import TaskRegistry
+from app.services.task_runner import TaskPolicy, run_task, run_task_with_policy
+from app.services.tracing import STATUS_ERROR, tracer
 
 logger = logging.getLogger(__name__)
 
+# Hedging waits for this many duration samples before trusting a percentile
+HEDGE_MIN_SAMPLES = 20
+
+# Nesting limit for sub-flows run as child executions
+MAX_SUBFLOW_DEPTH = 16
+
 
 class FlowEngine:
     """Core flow execution engine"""
 
-    def __init__(self, task_registry: TaskRegistry):
+    def __init__(
+        self,
+        task_registry: TaskRegistry,
+        blob_store: Optional[BlobStore] = None,
+        task_pool_size: int = 32,
+        map_pool_size: int = 8,
+        process_pool_size: Optional[int] = None,
+        memory_profiler: Optional[MemoryProfiler] = None,
+        idempotency: Optional[IdempotencyTable] = None,
+        archive: Optional[ExecutionArchive] = None,
+        resources: Optional[ResourceManager] = None,
+        execution_profiler: Optional[ExecutionProfiler] = None,
+    ):
         self.task_registry = task_registry
+        self.blob_store = blob_store
+        # Opt-in allocation sampling around task calls
+        self.memory_profiler = memory_profiler
+        # Runs task attempts that need a timeout, deadline or hedge
+        self.task_pool = ThreadPoolExecutor(
+            max_workers=task_pool_size, thread_name_prefix="task"
+        )
+        # Runs map chunks; the process pool is only started when first needed
+        self.map_pool = ThreadPoolExecutor(
+            max_workers=map_pool_size, thread_name_prefix="map"
+        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        # Lets map chunks running on the process pool see cancellation
+        self._process_cancellation: Optional[ProcessCancellation] = None
+        self._process_pool_size = process_pool_size
+        self._process_pool_lock = threading.Lock()
         self.flow_definitions: Dict[str, Flow] = {}
-        self.executions: Dict[str, FlowExecutionStatus] = {}
+        self.compiled_flows: Dict[str, CompiledFlow] = {}
+        self.executions = ExecutionStore()
+        self.execution_index = ExecutionIndex()
+        self.flow_stats: Dict[str, FlowStats] = {}
+        # Live plan versions per flow; superseded plans drop out once no
+        # running execution holds them
+        self._flow_versions: Dict[str, weakref.WeakValueDictionary] = {}
+        self._register_lock = threading.Lock()
+        # Ids of the flows referencing each flow as a sub-flow
+        self._subflow_parents: Dict[str, Set[str]] = {}
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        # Cancellation tokens of running executions only
+        self._cancel_tokens: Dict[str, CancellationToken] = {}
+        # Idempotency keys of recent executions
+        self.idempotency = (
+            idempotency if idempotency is not None else IdempotencyTable()
+        )
+        # Finished executions compacted out of the live store
+        self.archive = archive
+        # Pooled resources tasks borrow through the context
+        self.resources = resources if resources is not None else ResourceManager()
+        # On-demand cProfile and stack sampling of the next executions of a flow
+        self.execution_profiler = (
+            execution_profiler
+            if execution_profiler is not None
+            else ExecutionProfiler()
+        )
+        # Bumped whenever the set of published flows changes
+        self.catalogue_version = 0
+
+    def register_flow(self, flow_def: FlowDefinition) -> int:
+        """Register a flow definition and return its published version
 
-    def register_flow(self, flow_def: FlowDefinition):
-        """Register a flow definition"""
-        flow = flow_def.flow
+        Re-registering an existing flow publishes a new immutable version.
+        Executions already running keep the version they started on. Flows
+        using it as a sub-flow inline its steps, so they are recompiled and
+        republished too.
+        """
+        # Private copy so later changes to the caller's model can't leak in
+        flow = flow_def.flow.model_copy(deep=True)
 
         # Validate flow
         self._validate_flow(flow)
 
-        self.flow_definitions[flow.id] = flow
-        logger.info(f"Registered flow: {flow.name} (ID: {flow.id})")
+        with self._register_lock:
+            published = {**self.flow_definitions, flow.id: flow}
+            # Compile everything before publishing anything
+            plans = [
+                self._compile(published[flow_id], published)
+                for flow_id in (flow.id, *self._subflow_users(flow.id))
+            ]
+
+            self._index_subflows(flow.id, self.flow_definitions.get(flow.id), flow)
+            self.flow_stats.setdefault(flow.id, FlowStats())
+            self._configure_breakers(flow)
+            self.flow_definitions[flow.id] = flow
+            for compiled in plans:
+                self._flow_versions.setdefault(
+                    compiled.id, weakref.WeakValueDictionary()
+                )[compiled.version] = compiled
+                # Publishing is a single reference swap, readers never lock
+                self.compiled_flows[compiled.id] = compiled
+            self.catalogue_version += 1
+
+        version = plans[0].version
+        logger.info(f"Registered flow: {flow.name} (ID: {flow.id}, v{version})")
+        for compiled in plans[1:]:
+            logger.info(f"Republished flow {compiled.id} (v{compiled.version})")
+        return version
+
+    def _compile(self, flow: Flow, published: Dict[str, Flow]) -> CompiledFlow:
+        previous = self.compiled_flows.get(flow.id)
+        version = previous.version + 1 if previous else 1
+        return CompiledFlow(flow, version, published.get)
+
+    def _index_subflows(self, flow_id: str, previous: Optional[Flow], flow: Flow):
+        """Track which flows reference each flow as a sub-flow"""
+        for definition, update in ((previous, set.discard), (flow, set.add)):
+            if definition is None:
+                continue
+            for task in definition.tasks:
+                if task.flow is not None:
+                    update(self._subflow_parents.setdefault(task.flow, set()), flow_id)
+
+    def _subflow_users(self, flow_id: str) -> List[str]:
+        """Flows running a flow as a sub-flow, directly or through others"""
+        users: List[str] = []
+        pending = [flow_id]
+        while pending:
+            for parent in sorted(self._subflow_parents.get(pending.pop(), ())):
+                if (
+                    parent != flow_id
+                    and parent not in users
+                    and parent in self.flow_definitions
+                ):
+                    users.append(parent)
+                    pending.append(parent)
+        return users
+
+    def _configure_breakers(self, flow: Flow):
+        """Create or update the circuit breakers declared by a flow's tasks
+
+        Breakers are shared by task name across flows; one that no published
+        flow declares any more is dropped, so its task runs unguarded again.
+        """
+        for task in flow.tasks:
+            if task.circuit_breaker is None:
+                continue
+            breaker = self.circuit_breakers.get(task.name)
+            if breaker is None:
+                self.circuit_breakers[task.name] = CircuitBreaker(
+                    task.name, task.circuit_breaker
+                )
+            else:
+                breaker.configure(task.circuit_breaker)
+
+        published = {**self.flow_definitions, flow.id: flow}
+        declared = {
+            task.name
+            for definition in published.values()
+            for task in definition.tasks
+            if task.circuit_breaker is not None
+        }
+        for name in list(self.circuit_breakers):
+            if name not in declared:
+                logger.info(f"Removed circuit breaker of task {name}")
+                del self.circuit_breakers[name]
 
     def _validate_flow(self, flow: Flow):
         """Validate flow definition"""
@@ -41,6 +210,30 @@ class FlowEngine:
         if flow.start_task not in task_names:
             raise ValueError(f"Start task '{flow.start_task}' not found in tasks")
 
+        # Task outputs share the context with the resource manager
+        if RESOURCES_KEY in task_names:
+            raise ValueError(f"Task name '{RESOURCES_KEY}' is reserved")
+
+        # Sub-flow steps never go through the task runner
+        for task in flow.tasks:
+            if task.flow is None:
+                continue
+            ignored = [
+                field
+                for field, value in (
+                    ("timeout_seconds", task.timeout_seconds),
+                    ("retries", task.retries),
+                    ("hedge_percentile", task.hedge_percentile),
+                    ("circuit_breaker", task.circuit_breaker),
+                    ("map", task.map),
+                )
+                if value
+            ]
+            if ignored:
+                raise ValueError(
+                    f"Sub-flow task '{task.name}' can't set {', '.join(ignored)}"
+                )
+
         # Check all condition source tasks exist
         for condition in flow.conditions:
             if condition.source_task not in task_names:
@@ -50,146 +243,675 @@ class FlowEngine:
 
         logger.debug(f"Flow validation passed: {flow.name}")
 
-    def execute_flow(self, flow_id: str) -> str:
-        """Execute a flow and return execution ID"""
-        if flow_id not in self.flow_definitions:
+    def execute_flow(self, flow_id: str, idempotency_key: Optional[str] = None) -> str:
+        """Execute a flow and return execution ID
+
+        Calls repeating an idempotency key for the same flow do not run it
+        again: they wait for the first call and return its execution ID.
+        """
+        if idempotency_key is None:
+            return self._execute(flow_id)
+
+        key = (flow_id, idempotency_key)
+        entry, owner = self.idempotency.claim(key)
+        if not owner:
+            logger.info(f"Coalesced duplicate execution of {flow_id}")
+            return entry.wait()
+        try:
+            execution_id = self._execute(flow_id)
+        except Exception as e:
+            self.idempotency.fail(key, entry, e)
+            raise
+        self.idempotency.complete(entry, execution_id)
+        return execution_id
+
+    def _execute(self, flow_id: str) -> str:
+        # Pin the current version for the whole execution
+        flow = self.compiled_flows.get(flow_id)
+        if flow is None:
             raise ValueError(f"Flow '{flow_id}' not found")
 
-        flow = self.flow_definitions[flow_id]
-        execution_id = str(uuid.uuid4())
+        # Time-ordered, so IDs sort by start time
+        started_at = time.time()
+        execution_id = new_execution_id(started_at)
 
-        # Initialize execution status
-        execution = FlowExecutionStatus(
-            execution_id=execution_id,
-            flow_id=flow_id,
-            status="running",
-            current_task=flow.start_task,
-            completed_tasks=[],
-            task_results={},
-            started_at=datetime.now(UTC).isoformat(),
-        )
+        # Initialize execution record
+        execution = ExecutionRecord(execution_id, flow, started_at)
 
-        self.executions[execution_id] = execution
+        self.executions.add(execution)
+        self.execution_index.add(
+            execution_id, flow_id, execution.status, execution.started_at
+        )
 
         # Execute flow
-        self._run_flow(execution, flow)
+        token = CancellationToken()
+        self._cancel_tokens[execution_id] = token
+        # Empty unless a profile of some flow was requested
+        profile = (
+            self.execution_profiler.begin(flow_id)
+            if self.execution_profiler.armed
+            else None
+        )
+        try:
+            self._run_flow(execution, flow, token)
+        finally:
+            if profile is not None:
+                self.execution_profiler.end(profile)
+            del self._cancel_tokens[execution_id]
 
         return execution_id
 
-    def _run_flow(self, execution: FlowExecutionStatus, flow: Flow):
+    def cancel_execution(self, execution_id: str) -> bool:
+        """Request cancellation; returns False if the execution already ended"""
+        self.get_execution(execution_id)
+        token = self._cancel_tokens.get(execution_id)
+        if token is None:
+            return False
+        logger.info(f"Cancellation requested: {execution_id}")
+        token.cancel()
+        return True
+
+    def _run_flow(
+        self,
+        execution: ExecutionRecord,
+        flow: CompiledFlow,
+        token: CancellationToken,
+        depth: int = 0,
+        deadline: Optional[float] = None,
+    ):
+        """Run an execution inside its trace span"""
+        attributes = {
+            "execution.id": execution.execution_id,
+            "flow.id": flow.id,
+            "flow.version": flow.version,
+        }
+        if execution.parent_execution_id is not None:
+            attributes["execution.parent_id"] = execution.parent_execution_id
+        with tracer.span("flow.execute", attributes) as span:
+            self._run_steps(execution, flow, token, depth, deadline)
+            span.set_attribute("execution.status", execution.status)
+            if execution.status == "failed":
+                span.set_status(STATUS_ERROR, execution.message)
+
+    def _run_steps(
+        self,
+        execution: ExecutionRecord,
+        flow: CompiledFlow,
+        token: CancellationToken,
+        depth: int,
+        deadline: Optional[float],
+    ):
         """Main flow execution loop with proper failure handling"""
-        current_task = flow.start_task
-        context = {}
+        current_task = flow.start
+        context = {RESOURCES_KEY: self.resources}
+        stats = self.flow_stats[flow.id]
+        flow_started = time.perf_counter()
+        if flow.deadline:
+            own_deadline = time.monotonic() + flow.deadline
+            deadline = own_deadline if deadline is None else min(deadline, own_deadline)
+        # Result offsets of the inlined sub-flows currently entered
+        frames: List[int] = []
 
         logger.info(f"Starting flow execution: {flow.name} ({execution.execution_id})")
 
-        while current_task != "end":
-            logger.info(f"Executing task: {current_task}")
-            execution.current_task = current_task
-
-            try:
-                # Execute task
-                task_func = self.task_registry.get(current_task)
-                result = task_func(context)
+        while current_task != END:
+            task_name = flow.task_names[current_task]
 
-                # Store result
-                context[current_task] = result.model_dump()
-                execution.task_results[current_task] = result
-                execution.completed_tasks.append(current_task)
+            if token.cancelled:
+                self._cancel(execution, stats, flow_started, task_name)
+                return
 
-                logger.info(
-                    f"Task {current_task} completed with status: {result.status}"
-                )
+            kind = flow.kinds[current_task]
+            if kind == ENTER:
+                logger.info(f"Entering sub-flow of task: {task_name}")
+                frames.append(len(execution.results))
+                current_task = flow.enter_targets[current_task]
+                continue
 
-                # Find and evaluate condition
-                condition = self._find_condition(flow, current_task)
+            logger.info(f"Executing task: {task_name}")
+            execution.current_task = current_task
+            execution.revision += 1
 
-                if not condition:
-                    logger.info(f"No condition for task {current_task}, ending flow")
+            task_started = time.perf_counter()
+            try:
+                with tracer.span(
+                    f"task {task_name}",
+                    {"execution.id": execution.execution_id, "task.name": task_name},
+                ) as span:
+                    if kind == EXIT:
+                        result = self._exit_result(execution, frames.pop())
+                    elif kind == CALL:
+                        result = self._run_child(
+                            execution,
+                            flow.subflows[current_task],
+                            token,
+                            depth + 1,
+                            deadline,
+                        )
+                    else:
+                        result = self._run_step(
+                            execution,
+                            flow,
+                            current_task,
+                            context,
+                            token,
+                            deadline,
+                            stats,
+                        )
+                    span.set_attribute("task.status", result.status.value)
+                    if result.status == TaskStatus.FAILURE:
+                        span.set_status(STATUS_ERROR, result.message)
+
+                # Store result, spilling large payloads out of the heap
+                data = result.data
+                if self.blob_store is not None:
+                    data = self.blob_store.maybe_spill(data)
+
+                if isinstance(data, BlobRef):
+                    context[task_name] = LazyTaskOutput(
+                        result.status, data, result.message
+                    )
+                else:
+                    context[task_name] = {
+                        "status": result.status,
+                        "data": data,
+                        "message": result.message,
+                    }
+                execution.results.append(
+                    TaskRecord(current_task, result.status, data, result.message)
+                )
+                execution.revision += 1
+
+                logger.info(f"Task {task_name} completed with status: {result.status}")
+
+                # Evaluate the compiled condition based on task result
+                with tracer.span(
+                    "condition",
+                    {"execution.id": execution.execution_id, "task.name": task_name},
+                ) as span:
+                    next_task = flow.next_task(current_task, result, context)
+                    if next_task is not None:
+                        span.set_attribute(
+                            "condition.next_task",
+                            "end" if next_task == END else flow.task_names[next_task],
+                        )
+
+                # Drop the inline payload so a spilled one is not kept alive
+                del result, data
+
+                if next_task is None:
+                    logger.info(f"No condition for task {task_name}, ending flow")
                     break
 
-                # Evaluate condition based on task result
-                next_task = self._evaluate_condition(condition, result)
-                logger.info(f"Condition evaluated: next task = {next_task}")
-
                 # If next task is "end", we're done
-                if next_task == "end":
+                if next_task == END:
                     logger.info("Flow directed to end")
                     break
 
+                logger.info(
+                    f"Condition evaluated: next task = {flow.task_names[next_task]}"
+                )
                 current_task = next_task
 
+            except ExecutionCancelled:
+                self._cancel(execution, stats, flow_started, task_name)
+                return
+
             except Exception as e:
                 # Handle unexpected errors during task execution
-                logger.error(
-                    f"Unexpected error executing task {current_task}: {str(e)}"
+                logger.error(f"Unexpected error executing task {task_name}: {str(e)}")
+                stats.record_task(
+                    task_name,
+                    TaskStatus.FAILURE.value,
+                    time.perf_counter() - task_started,
+                )
+                stats.record_execution("failed", time.perf_counter() - flow_started)
+                self._finish(
+                    execution, "failed", f"Flow failed at task {task_name}: {str(e)}"
                 )
-                execution.status = "failed"
-                execution.current_task = None
-                execution.ended_at = datetime.now(UTC).isoformat()
-                execution.message = f"Flow failed at task {current_task}: {str(e)}"
                 return
 
         # Determine final status based on completed tasks
         final_status = "completed"
-        final_message = (
-            f"Flow completed. Executed {len(execution.completed_tasks)} tasks."
-        )
+        final_message = f"Flow completed. Executed {len(execution.results)} tasks."
 
         # Check if any task failed
-        failed_tasks = [
-            task_name
-            for task_name, result in execution.task_results.items()
-            if result.status == TaskStatus.FAILURE
-        ]
+        failed_tasks = execution.failed_tasks()
 
         if failed_tasks:
             final_status = "completed_with_failures"
             final_message = (
                 f"Flow completed with failures. "
-                f"Executed {len(execution.completed_tasks)} tasks. "
+                f"Executed {len(execution.results)} tasks. "
                 f"Failed tasks: {', '.join(failed_tasks)}"
             )
 
         # Update execution status
-        execution.status = final_status
-        execution.current_task = None
-        execution.ended_at = datetime.now(UTC).isoformat()
-        execution.message = final_message
+        stats.record_execution(final_status, time.perf_counter() - flow_started)
+        self._finish(execution, final_status, final_message)
 
         logger.info(
             f"Flow execution finished: {execution.execution_id} - {final_status}"
         )
 
-    def _find_condition(self, flow: Flow, task_name: str) -> Optional[Condition]:
-        """Find condition for a given task"""
-        for condition in flow.conditions:
-            if condition.source_task == task_name:
-                return condition
-        return None
-
-    def _evaluate_condition(self, condition: Condition, result: TaskResult) -> str:
-        """Evaluate condition and return next task"""
-        if result.status.value == condition.outcome:
-            return condition.target_task_success
+    def _run_step(
+        self,
+        execution: ExecutionRecord,
+        flow: CompiledFlow,
+        current_task: int,
+        context: Dict,
+        token: CancellationToken,
+        deadline: Optional[float],
+        stats: FlowStats,
+    ) -> TaskResult:
+        """Run one registered task behind its circuit breaker"""
+        task_name = flow.task_names[current_task]
+        task_started = time.perf_counter()
+        # Execute task
+        step = flow.maps[current_task]
+        if step is None:
+            task_func = self.task_registry.get(task_name)
         else:
-            return condition.target_task_failure
+            task_func = partial(
+                run_map,
+                self.task_registry.get(step.task),
+                step,
+                self._map_executor(step),
+                token,
+                cancellation=self._process_cancellation,
+            )
+        breaker = self.circuit_breakers.get(task_name)
+        if breaker is not None and not breaker.allow():
+            # Fail fast and route through the failure path
+            logger.warning(f"Circuit open, skipping task {task_name}")
+            result = TaskResult(
+                status=TaskStatus.FAILURE,
+                message=f"Circuit breaker open for task '{task_name}'",
+            )
+            stats.record_rejected(task_name)
+        else:
+            sample = self._begin_memory_sample()
+            try:
+                result = self._invoke_task(
+                    task_func, context, token, flow, current_task, deadline
+                )
+            except ExecutionCancelled:
+                raise
+            except Exception:
+                if breaker is not None:
+                    breaker.record(False, time.perf_counter() - task_started)
+                raise
+            finally:
+                if sample is not None:
+                    self._end_memory_sample(
+                        execution, stats, flow, current_task, sample
+                    )
+            duration = time.perf_counter() - task_started
+            if breaker is not None:
+                breaker.record(result.status == TaskStatus.SUCCESS, duration)
+            stats.record_task(task_name, result.status.value, duration)
+
+        return result
+
+    def _begin_memory_sample(self) -> Optional[int]:
+        if self.memory_profiler is None:
+            return None
+        return self.memory_profiler.begin()
+
+    def _end_memory_sample(
+        self,
+        execution: ExecutionRecord,
+        stats: FlowStats,
+        flow: CompiledFlow,
+        task: int,
+        baseline: int,
+    ):
+        """Record a task's sampled memory usage on the execution and stats"""
+        peak, retained = self.memory_profiler.end(baseline)
+        stats.record_memory(flow.task_names[task], peak, retained)
+        if execution.memory is None:
+            execution.memory = {}
+        execution.memory[task] = (peak, retained)
+
+    def _exit_result(self, execution: ExecutionRecord, offset: int) -> TaskResult:
+        """Result of an inlined sub-flow from the records it appended"""
+        records = execution.results[offset:]
+        failed = any(record.status == TaskStatus.FAILURE for record in records)
+        return TaskResult(
+            status=TaskStatus.FAILURE if failed else TaskStatus.SUCCESS,
+            data=records[-1].data if records else None,
+            message=f"Sub-flow executed {len(records)} tasks",
+        )
+
+    def _run_child(
+        self,
+        parent: ExecutionRecord,
+        flow_id: str,
+        token: CancellationToken,
+        depth: int,
+        deadline: Optional[float],
+    ) -> TaskResult:
+        """Run a sub-flow as a child execution on the calling thread"""
+        if depth > MAX_SUBFLOW_DEPTH:
+            raise ValueError(f"Sub-flow nesting exceeds {MAX_SUBFLOW_DEPTH} levels")
+        flow = self.compiled_flows.get(flow_id)
+        if flow is None:
+            raise ValueError(f"Flow '{flow_id}' not found")
+
+        started_at = time.time()
+        child = ExecutionRecord(
+            new_execution_id(started_at), flow, started_at, parent.execution_id
+        )
+        self.executions.add(child)
+        self.execution_index.add(
+            child.execution_id, flow_id, child.status, child.started_at
+        )
+
+        # The child shares the parent's token, cancelling either stops both
+        self._cancel_tokens[child.execution_id] = token
+        try:
+            self._run_flow(child, flow, token, depth, deadline)
+        finally:
+            del self._cancel_tokens[child.execution_id]
+
+        if child.status == "cancelled":
+            raise ExecutionCancelled()
+        return TaskResult(
+            status=(
+                TaskStatus.SUCCESS
+                if child.status == "completed"
+                else TaskStatus.FAILURE
+            ),
+            data={"execution_id": child.execution_id},
+            message=child.message,
+        )
+
+    def _map_executor(self, step: MapStep) -> Executor:
+        """Pool that runs the chunks of a map step"""
+        if not step.process:
+            return self.map_pool
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                self._process_cancellation = ProcessCancellation()
+                self._process_pool = ProcessPoolExecutor(
+                    self._process_pool_size,
+                    initializer=self._process_cancellation.initializer,
+                    initargs=self._process_cancellation.initargs,
+                )
+            return self._process_pool
+
+    def shutdown(self):
+        """Stop the worker pools without waiting for running work"""
+        self.task_pool.shutdown(wait=False, cancel_futures=True)
+        self.map_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _invoke_task(
+        self,
+        task_func: Callable,
+        context: Dict,
+        token: CancellationToken,
+        flow: CompiledFlow,
+        task: int,
+        deadline: Optional[float],
+    ) -> TaskResult:
+        """Run one task, applying its timeout, retry and hedging policy"""
+        policy = flow.policies[task]
+        if policy is None and deadline is None:
+            return run_task(task_func, context, token)
+        return run_task_with_policy(
+            task_func,
+            context,
+            token,
+            self.task_pool,
+            policy or TaskPolicy(),
+            deadline,
+            self._hedge_delay(self.flow_stats[flow.id], flow.task_names[task], policy),
+        )
+
+    def _hedge_delay(
+        self, stats: FlowStats, task_name: str, policy: Optional[TaskPolicy]
+    ) -> Optional[float]:
+        """Latency after which a hedged attempt of the task is started"""
+        if policy is None or policy.hedge_percentile is None:
+            return None
+        return stats.task_quantile(
+            task_name, policy.hedge_percentile / 100, HEDGE_MIN_SAMPLES
+        )
+
+    def _cancel(
+        self,
+        execution: ExecutionRecord,
+        stats: FlowStats,
+        flow_started: float,
+        task_name: str,
+    ):
+        """Close a cancelled execution"""
+        logger.info(f"Flow execution cancelled: {execution.execution_id}")
+        stats.record_execution("cancelled", time.perf_counter() - flow_started)
+        self._finish(execution, "cancelled", f"Flow cancelled at task {task_name}")
+
+    def _finish(self, execution: ExecutionRecord, status: str, message: str):
+        """Mark an execution as finished"""
+        # Status goes last so readers that see a terminal status also see
+        # the end time and message
+        execution.current_task = END
+        execution.ended_at = time.time()
+        execution.message = message
+        self._set_status(execution, status)
+
+    def _set_status(self, execution: ExecutionRecord, status: str):
+        """Update execution status and keep the status indexes in sync"""
+        execution.status = status
+        execution.revision += 1
+        self.execution_index.update_status(
+            execution.execution_id, execution.flow_id, status
+        )
+
+    def get_execution(self, execution_id: str) -> ExecutionRecord:
+        """Get the internal execution record"""
+        execution = self.executions.get(execution_id)
+        if execution is None:
+            raise ValueError(f"Execution '{execution_id}' not found")
+        return execution
+
+    def get_executions(
+        self, execution_ids: List[str]
+    ) -> Tuple[List[Union[ExecutionRecord, dict]], List[str]]:
+        """Get many executions in one batched read
+
+        Returns the found executions in request order, archived ones in their
+        API shape, and the unknown IDs.
+        """
+        found: Dict[str, Union[ExecutionRecord, dict]] = dict(
+            self.executions.get_many(execution_ids)
+        )
+        if len(found) < len(execution_ids):
+            found.update(
+                self.get_archived([eid for eid in execution_ids if eid not in found])
+            )
+        executions = [found[eid] for eid in execution_ids if eid in found]
+        missing = [eid for eid in execution_ids if eid not in found]
+        return executions, missing
+
+    def get_archived(self, execution_ids: List[str]) -> Dict[str, dict]:
+        """Get archived executions in their API shape, by ID"""
+        if self.archive is None:
+            return {}
+        return self.archive.get_many(execution_ids)
+
+    def list_archived(
+        self,
+        flow_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 50,
+    ) -> List[dict]:
+        """List archived executions oldest first within a start time range"""
+        if self.archive is None:
+            return []
+        executions = self.archive.scan(_timestamp(since), _timestamp(until))
+        if flow_id is not None:
+            executions = (e for e in executions if e["flow_id"] == flow_id)
+        return list(islice(executions, limit))
+
+    def archive_executions(self, min_age_seconds: float) -> int:
+        """Move executions finished at least `min_age_seconds` ago to the archive"""
+        if self.archive is None:
+            raise ValueError("Execution archive is not configured")
+        cutoff = time.time() - min_age_seconds
+        finished = [
+            execution
+            for execution in self.executions.values()
+            if execution.ended_at is not None and execution.ended_at <= cutoff
+        ]
+        if not finished:
+            return 0
+
+        # Written before removal, so a lookup always finds one copy
+        self.archive.append(finished)
+        execution_ids = [execution.execution_id for execution in finished]
+        self.executions.remove_many(execution_ids)
+        self.execution_index.remove(execution_ids)
+        return len(finished)
+
+    def drop_archived(self, max_age_seconds: float) -> int:
+        """Delete archive segments whose executions all started too long ago"""
+        if self.archive is None:
+            raise ValueError("Execution archive is not configured")
+        dropped = self.archive.drop_before(time.time() - max_age_seconds)
+        if self.blob_store is not None:
+            for segment in dropped:
+                for blob_id in segment.blob_ids:
+                    try:
+                        self.blob_store.delete(self.blob_store.get(blob_id))
+                    except ValueError:
+                        # Already gone
+                        pass
+        return sum(len(segment) for segment in dropped)
 
     def get_execution_status(self, execution_id: str) -> FlowExecutionStatus:
         """Get execution status"""
-        if execution_id not in self.executions:
-            raise ValueError(f"Execution '{execution_id}' not found")
-        return self.executions[execution_id]
+        return self.get_execution(execution_id).to_model()
+
+    def get_blob(self, blob_id: str) -> BlobRef:
+        """Get a spilled task payload by id"""
+        if self.blob_store is None:
+            raise ValueError("Blob store is not configured")
+        return self.blob_store.get(blob_id)
+
+    def list_executions(
+        self,
+        flow_id: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        cursor: Optional[int] = None,
+        limit: int = 50,
+    ) -> Tuple[List[ExecutionRecord], Optional[int]]:
+        """List executions newest first using the secondary indexes"""
+        execution_ids, next_cursor = self.execution_index.query(
+            flow_id=flow_id, status=status, since=since, cursor=cursor, limit=limit
+        )
+        executions = [self.executions.get(eid) for eid in execution_ids]
+        return [e for e in executions if e is not None], next_cursor
+
+    def clear_executions(self):
+        """Drop all stored executions, their indexes and spilled payloads"""
+        removed = self.executions.clear()
+        self.execution_index.clear()
+        self.idempotency.clear()
+        if self.blob_store is not None:
+            for execution in removed:
+                for record in execution.results:
+                    if isinstance(record.data, BlobRef):
+                        self.blob_store.delete(record.data)
+
+    def get_flow_stats(self, flow_id: str) -> dict:
+        """Get streaming execution statistics for a flow"""
+        if flow_id not in self.flow_definitions:
+            raise ValueError(f"Flow '{flow_id}' not found")
+        summary = {"flow_id": flow_id, **self.flow_stats[flow_id].summary()}
+        summary["circuit_breakers"] = {
+            task.name: self.circuit_breakers[task.name].snapshot()
+            for task in self.compiled_flows[flow_id].definition.tasks
+            if task.name in self.circuit_breakers
+        }
+        return summary
+
+    def get_memory_top(self, flow_id: str, limit: int = 10) -> dict:
+        """Get the sampled tasks of a flow with the largest allocations"""
+        if flow_id not in self.flow_definitions:
+            raise ValueError(f"Flow '{flow_id}' not found")
+        profiler = self.memory_profiler
+        return {
+            "flow_id": flow_id,
+            "profiling": profiler is not None and profiler.enabled,
+            "sample_rate": profiler.sample_rate if profiler is not None else 0.0,
+            "tasks": self.flow_stats[flow_id].top_memory(limit),
+        }
+
+    def start_profile(
+        self, flow_id: str, executions: int, interval: Optional[float] = None
+    ) -> ProfileSession:
+        """Profile the next executions of a flow, replacing earlier results"""
+        if flow_id not in self.flow_definitions:
+            raise ValueError(f"Flow '{flow_id}' not found")
+        return self.execution_profiler.start(flow_id, executions, interval)
+
+    def get_profile(self, flow_id: str) -> ProfileSession:
+        """Get the profile requested for a flow"""
+        session = self.execution_profiler.get(flow_id)
+        if session is None:
+            raise ValueError(f"No profile of flow '{flow_id}'")
+        return session
+
+    def discard_profile(self, flow_id: str):
+        """Stop profiling a flow and drop its results"""
+        if self.execution_profiler.discard(flow_id) is None:
+            raise ValueError(f"No profile of flow '{flow_id}'")
+
+    def running_executions(self) -> int:
+        """Number of executions currently running, child executions included"""
+        return len(self._cancel_tokens)
+
+    def task_backlog(self) -> int:
+        """Task attempts and map chunks waiting for a free worker thread"""
+        # ThreadPoolExecutor keeps submitted but unstarted work in _work_queue
+        return self.task_pool._work_queue.qsize() + self.map_pool._work_queue.qsize()
+
+    def circuit_breaker_states(self) -> Dict[str, str]:
+        """Current state of every circuit breaker"""
+        return {
+            name: breaker.state for name, breaker in list(self.circuit_breakers.items())
+        }
+
+    def list_flow_versions(self, flow_id: str) -> List[int]:
+        """Versions of a flow that are current or still held by an execution"""
+        versions = self._flow_versions.get(flow_id)
+        if versions is None:
+            raise ValueError(f"Flow '{flow_id}' not found")
+        return sorted(versions.keys())
 
     def list_flows(self) -> list:
         """List all registered flows"""
         return [
             {
-                "id": flow.id,
-                "name": flow.name,
-                "start_task": flow.start_task,
-                "task_count": len(flow.tasks),
-                "condition_count": len(flow.conditions),
+                "id": compiled.id,
+                "name": compiled.name,
+                "version": compiled.version,
+                "start_task": compiled.definition.start_task,
+                "task_count": len(compiled.definition.tasks),
+                "condition_count": len(compiled.definition.conditions),
             }
-            for flow in self.flow_definitions.values()
+            for compiled in list(self.compiled_flows.values())
         ]
+
+
+def _timestamp(moment: Optional[datetime]) -> Optional[float]:
+    """Epoch seconds of a datetime, naive ones are taken as UTC"""
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return moment.timestamp()
@@ -0,0 +1,186 @@
+import math
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+
+class QuantileSketch:
+    """DDSketch style quantile sketch with bounded relative error
+
+    Values are mapped to logarithmic buckets so that any quantile is returned
+    within ``relative_accuracy`` of the true value. Memory is capped at
+    ``max_buckets``; when exceeded the lowest buckets are merged, which only
+    degrades accuracy for the smallest values.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float):
+        """Add a non-negative value to the sketch"""
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        if value <= 0:
+            self.zero_count += 1
+            return
+
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the value at quantile q (0 <= q <= 1)"""
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                value = 2 * self.gamma**key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def _collapse(self):
+        keys = sorted(self.buckets)
+        lowest, target = keys[0], keys[1]
+        self.buckets[target] += self.buckets.pop(lowest)
+
+
+class MemoryStats:
+    """Running totals of sampled task memory usage"""
+
+    def __init__(self):
+        self.samples = 0
+        self.peak_total = 0
+        self.peak_max = 0
+        self.retained_total = 0
+
+    def record(self, peak_bytes: int, retained_bytes: int):
+        self.samples += 1
+        self.peak_total += peak_bytes
+        self.peak_max = max(self.peak_max, peak_bytes)
+        self.retained_total += retained_bytes
+
+    def summary(self) -> dict:
+        return {
+            "samples": self.samples,
+            "mean_peak_bytes": self.peak_total // self.samples,
+            "max_peak_bytes": self.peak_max,
+            "mean_retained_bytes": self.retained_total // self.samples,
+        }
+
+
+class TaskStats:
+    """Streaming outcome and duration statistics for one task"""
+
+    def __init__(self):
+        self.outcomes: Counter = Counter()
+        self.durations = QuantileSketch()
+        # Only allocated once a call of the task has been memory sampled
+        self.memory: Optional[MemoryStats] = None
+
+    def record(self, status: str, duration: float):
+        self.outcomes[status] += 1
+        self.durations.add(duration)
+
+    def summary(self) -> dict:
+        total = sum(self.outcomes.values())
+        return {
+            "executions": total,
+            "success_rate": self.outcomes["success"] / total if total else None,
+            "rejected": self.outcomes["rejected"],
+            "duration_seconds": _quantiles(self.durations),
+        }
+
+
+class FlowStats:
+    """Streaming execution statistics for one flow"""
+
+    def __init__(self):
+        self.status_counts: Counter = Counter()
+        self.durations = QuantileSketch()
+        self.tasks: Dict[str, TaskStats] = {}
+        self._lock = threading.Lock()
+
+    def record_task(self, task_name: str, status: str, duration: float):
+        """Record a finished task run"""
+        with self._lock:
+            if task_name not in self.tasks:
+                self.tasks[task_name] = TaskStats()
+            self.tasks[task_name].record(status, duration)
+
+    def record_rejected(self, task_name: str):
+        """Record a call an open circuit breaker failed without running it"""
+        with self._lock:
+            if task_name not in self.tasks:
+                self.tasks[task_name] = TaskStats()
+            self.tasks[task_name].outcomes["rejected"] += 1
+
+    def record_memory(self, task_name: str, peak_bytes: int, retained_bytes: int):
+        """Record a memory sample of a task run"""
+        with self._lock:
+            if task_name not in self.tasks:
+                self.tasks[task_name] = TaskStats()
+            stats = self.tasks[task_name]
+            if stats.memory is None:
+                stats.memory = MemoryStats()
+            stats.memory.record(peak_bytes, retained_bytes)
+
+    def top_memory(self, limit: int = 10) -> List[dict]:
+        """Sampled tasks ordered by their largest peak allocation"""
+        with self._lock:
+            sampled = [
+                {"task": name, **stats.memory.summary()}
+                for name, stats in self.tasks.items()
+                if stats.memory is not None
+            ]
+        sampled.sort(key=lambda entry: entry["max_peak_bytes"], reverse=True)
+        return sampled[:limit]
+
+    def record_execution(self, status: str, duration: float):
+        """Record a finished flow execution"""
+        with self._lock:
+            self.status_counts[status] += 1
+            self.durations.add(duration)
+
+    def task_quantile(
+        self, task_name: str, q: float, min_samples: int = 1
+    ) -> Optional[float]:
+        """Duration quantile of a task, or None with too few samples"""
+        with self._lock:
+            stats = self.tasks.get(task_name)
+            if stats is None or stats.durations.count < min_samples:
+                return None
+            return stats.durations.quantile(q)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "executions": sum(self.status_counts.values()),
+                "status_counts": dict(self.status_counts),
+                "duration_seconds": _quantiles(self.durations),
+                "tasks": {name: stats.summary() for name, stats in self.tasks.items()},
+            }
+
+
+def _quantiles(sketch: QuantileSketch) -> dict:
+    return {
+        "p50": sketch.quantile(0.5),
+        "p95": sketch.quantile(0.95),
+        "p99": sketch.quantile(0.99),
+    }
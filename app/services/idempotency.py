@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+class IdempotencyEntry:
+    """Outcome of the first call made with an idempotency key"""
+
+    __slots__ = ("execution_id", "error", "done", "expires_at")
+
+    def __init__(self, expires_at: float):
+        self.execution_id: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+        self.expires_at = expires_at
+
+    def wait(self) -> str:
+        """Block until the first call finished and return its execution id"""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.execution_id
+
+
+class IdempotencyTable:
+    """TTL and size bounded table of idempotency keys
+
+    The first caller of a key owns it and runs the work; concurrent and later
+    callers get the same entry and wait for its outcome (single-flight).
+    Entries expire `ttl` seconds after they were claimed, and the oldest are
+    evicted first once `max_keys` is reached. Only finished entries are ever
+    dropped, so keys still running stay single-flight even past their TTL or
+    the size bound. A failed first call releases the key so a retry can run
+    again.
+    """
+
+    def __init__(self, ttl: float = 86400.0, max_keys: int = 100_000):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[Hashable, IdempotencyEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key: Hashable) -> Tuple[IdempotencyEntry, bool]:
+        """Return the entry for a key and whether the caller owns it"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry, False
+            entry = self._entries[key] = IdempotencyEntry(now + self.ttl)
+            return entry, True
+
+    def complete(self, entry: IdempotencyEntry, execution_id: str):
+        """Record the owner's execution and release the waiters"""
+        entry.execution_id = execution_id
+        entry.done.set()
+
+    def fail(self, key: Hashable, entry: IdempotencyEntry, error: Exception):
+        """Release the key after the owner failed, waiters get the error"""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.error = error
+        entry.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float):
+        # Entries are kept in claim order, which is also expiry order. Entries
+        # still running are skipped: dropping one would let a duplicate call
+        # start the same work again
+        entries = self._entries
+        excess = len(entries) + 1 - self.max_keys
+        evicted = []
+        for key, entry in entries.items():
+            if entry.expires_at > now and len(evicted) >= excess:
+                break
+            if entry.done.is_set():
+                evicted.append(key)
+        for key in evicted:
+            del entries[key]
@@ -0,0 +1,221 @@
+import csv
+import logging
+import re
+import time
+from contextlib import contextmanager, nullcontext
+from itertools import chain, islice
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from app.models import TaskResult, TaskStatus
+from app.services.resources import RESOURCES_KEY
+
+logger = logging.getLogger(__name__)
+
+Task = Callable[[Dict], TaskResult]
+# Leases a pooled resource by name, e.g. `ResourceManager.lease`
+Lease = Callable[[str], ContextManager[Any]]
+# Opens `(columns, rows)` for a with block, rows being read lazily
+RowSource = Callable[[Lease], ContextManager[Tuple[List[str], Iterator[Sequence]]]]
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _quote(identifier: str) -> str:
+    if not _IDENTIFIER.match(identifier):
+        raise ValueError(f"Invalid SQL identifier: {identifier!r}")
+    return f'"{identifier}"'
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    rows = iter(rows)
+    return iter(lambda: list(islice(rows, size)), [])
+
+
+def _lease(context: Dict) -> Lease:
+    return lambda name: context[RESOURCES_KEY].lease(name)
+
+
+def _failure(message: str, e: Exception) -> TaskResult:
+    logger.error(f"{message}: {str(e)}")
+    return TaskResult(status=TaskStatus.FAILURE, message=f"{message}: {str(e)}")
+
+
+def sqlite_rows(
+    query: str,
+    params: Sequence[Any] = (),
+    resource: str = "sqlite",
+    batch_size: int = 1000,
+) -> RowSource:
+    """Row source stepping a query's cursor `batch_size` rows at a time"""
+
+    @contextmanager
+    def open_rows(lease: Lease):
+        with lease(resource) as conn:
+            cursor = conn.execute(query, params)
+            try:
+                columns = [column[0] for column in cursor.description or ()]
+                batches = iter(lambda: cursor.fetchmany(batch_size), [])
+                yield columns, chain.from_iterable(batches)
+            finally:
+                cursor.close()
+
+    return open_rows
+
+
+def csv_rows(
+    path: str, delimiter: str = ",", columns: Optional[List[str]] = None
+) -> RowSource:
+    """Row source reading a CSV file line by line
+
+    The header row names the columns unless `columns` is given. Values are
+    kept as strings.
+    """
+
+    @contextmanager
+    def open_rows(lease: Lease):
+        with open(path, newline="") as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            yield (columns if columns is not None else next(reader, [])), reader
+
+    return open_rows
+
+
+def _fetch(rows: RowSource, source: str, message: str) -> Task:
+    def fetch(context: Dict) -> TaskResult:
+        started = time.perf_counter()
+        try:
+            with rows(_lease(context)) as (columns, batch):
+                records = [list(row) for row in batch]
+        except Exception as e:
+            return _failure(message, e)
+
+        seconds = time.perf_counter() - started
+        logger.info(f"Fetched {len(records)} rows from {source} in {seconds:.3f}s")
+        return TaskResult(
+            status=TaskStatus.SUCCESS,
+            data={"columns": columns, "records": records, "source": source},
+            message=f"Fetched {len(records)} rows",
+        )
+
+    return fetch
+
+
+def sqlite_fetch(
+    query: str,
+    params: Sequence[Any] = (),
+    resource: str = "sqlite",
+    batch_size: int = 1000,
+) -> Task:
+    """Task fetching the rows of a query from a pooled SQLite connection
+
+    The result holds every row, since task results are kept on the
+    execution; to copy rows without loading them all, give `sqlite_rows` as
+    the source of `sqlite_store` instead.
+    """
+    return _fetch(
+        sqlite_rows(query, params, resource, batch_size),
+        resource,
+        "Failed to fetch rows",
+    )
+
+
+def csv_fetch(
+    path: str, delimiter: str = ",", columns: Optional[List[str]] = None
+) -> Task:
+    """Task fetching the rows of a CSV file, see `csv_rows`"""
+    return _fetch(csv_rows(path, delimiter, columns), path, "Failed to read CSV")
+
+
+def _task_rows(
+    context: Dict, source: str, columns: Optional[List[str]]
+) -> Tuple[List[str], Iterator[Sequence]]:
+    data = (context.get(source) or {}).get("data") or {}
+    records = data.get("records")
+    if records is None:
+        raise ValueError(f"No records from task '{source}' to store")
+    names = columns or data.get("columns")
+    if records and isinstance(records[0], dict):
+        names = names or list(records[0])
+        return names, ([record[name] for name in names] for record in records)
+    return names, iter(records)
+
+
+def _sharing(context: Dict, resource: str, conn: Any) -> Lease:
+    # A second SQLite connection reading the same file would keep the writer
+    # from committing, so the source borrows the writer's connection
+    lease = _lease(context)
+    return lambda name: nullcontext(conn) if name == resource else lease(name)
+
+
+def _insert_sql(table: str, names: Optional[List[str]]) -> str:
+    if not names:
+        raise ValueError("Records have no column names")
+    return (
+        f"INSERT INTO {_quote(table)} "
+        f"({', '.join(_quote(name) for name in names)}) "
+        f"VALUES ({', '.join('?' * len(names))})"
+    )
+
+
+def sqlite_store(
+    table: str,
+    source: Union[str, RowSource] = "task1",
+    resource: str = "sqlite",
+    chunk_size: int = 1000,
+    columns: Optional[List[str]] = None,
+) -> Task:
+    """Task inserting rows into a SQLite table
+
+    `source` names an earlier task whose `records` are stored, or is a row
+    source (`sqlite_rows`, `csv_rows`) streamed straight into the table, so
+    no more than a batch and a chunk of rows are in memory at once. A row
+    source on the same resource reads through the connection that writes.
+    Rows are written with `executemany`, one transaction per `chunk_size`
+    rows, so a failure keeps the chunks already committed and a large
+    insert never holds the write lock for long. Returns the stored count.
+    """
+
+    def store(context: Dict) -> TaskResult:
+        started = time.perf_counter()
+        stored = 0
+        chunks = 0
+        try:
+            with context[RESOURCES_KEY].lease(resource) as conn:
+                if callable(source):
+                    opened = source(_sharing(context, resource, conn))
+                else:
+                    opened = nullcontext(_task_rows(context, source, columns))
+                with opened as (names, rows):
+                    sql = None
+                    for chunk in _batches(rows, chunk_size):
+                        if sql is None:
+                            sql = _insert_sql(table, columns or names)
+                        # Commits the chunk, or rolls it back on error
+                        with conn:
+                            conn.executemany(sql, chunk)
+                        stored += len(chunk)
+                        chunks += 1
+        except Exception as e:
+            return _failure("Failed to store rows", e)
+
+        seconds = time.perf_counter() - started
+        logger.info(f"Stored {stored} rows into {table} in {seconds:.3f}s")
+        return TaskResult(
+            status=TaskStatus.SUCCESS,
+            data={"stored_count": stored, "table": table, "chunks": chunks},
+            message=f"Stored {stored} rows",
+        )
+
+    return store
@@ -0,0 +1,183 @@
+import logging
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models import Task, TaskResult, TaskStatus
+from app.services.cancellation import (
+    CancellationToken,
+    ExecutionCancelled,
+    InSlot,
+    ProcessCancellation,
+)
+from app.services.task_runner import run_task
+from app.services.tracing import process_result, submit_in_context, submit_to_process
+
+logger = logging.getLogger(__name__)
+
+
+class MapStep:
+    """Compiled map settings of a task"""
+
+    __slots__ = ("task", "path", "keys", "chunk_size", "concurrency", "process")
+
+    def __init__(
+        self,
+        task: str,
+        path: str,
+        chunk_size: int = 100,
+        concurrency: int = 4,
+        process: bool = False,
+    ):
+        self.task = task
+        self.path = path
+        self.keys: Tuple[str, ...] = tuple(path.split("."))
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.process = process
+
+    @classmethod
+    def from_task(cls, task: Task) -> Optional["MapStep"]:
+        """Map step for a task definition, or None if it is not a map"""
+        if task.map is None:
+            return None
+        return cls(
+            task.map.task,
+            task.map.items,
+            task.map.chunk_size,
+            task.map.concurrency,
+            task.map.executor == "process",
+        )
+
+
+def run_map(
+    task_func: Callable,
+    step: MapStep,
+    pool: Executor,
+    token: CancellationToken,
+    context: Dict,
+    cancellation: Optional[ProcessCancellation] = None,
+) -> TaskResult:
+    """Run a task over chunks of a context list and gather the results
+
+    Each chunk runs with a context in which the list at `step.path` is
+    replaced by the chunk, so a task written for the whole list works per
+    chunk unchanged. Thread pool chunks see a shallow copy of the whole
+    context; process pool chunks only get the entry holding the list, since
+    everything sent must be picklable. At most `step.concurrency` chunks are
+    in flight, and the first failing chunk fails the map without starting
+    the remaining ones. Chunk outputs are returned in list order.
+
+    Cancellation drops the chunks not started yet. Chunks already running on
+    the process pool see it through `process_cancelled()` when the pool was
+    started with the flags of `cancellation`.
+    """
+    try:
+        entry = context[step.keys[0]]
+        # A spilled task output decodes its data on every read; decode once
+        if isinstance(entry, Mapping) and not isinstance(entry, dict):
+            entry = dict(entry)
+        items = _lookup(entry, step.keys[1:])
+    except KeyError:
+        return TaskResult(
+            status=TaskStatus.FAILURE, message=f"Map items '{step.path}' not found"
+        )
+    if not isinstance(items, (list, tuple)):
+        return TaskResult(
+            status=TaskStatus.FAILURE, message=f"Map items '{step.path}' is not a list"
+        )
+
+    size = step.chunk_size
+    chunks = [items[i : i + size] for i in range(0, len(items), size)]
+    results: List[Any] = [None] * len(chunks)
+
+    cancelled: Future = Future()
+    unwatch = token.on_cancel(lambda: cancelled.set_result(None))
+    leased = (
+        cancellation.lease(token)
+        if step.process and cancellation is not None
+        else nullcontext()
+    )
+    pending: Dict[Future, int] = {}
+    submitted = 0
+    try:
+        with leased as slot:
+            while submitted < len(chunks) or pending:
+                while submitted < len(chunks) and len(pending) < step.concurrency:
+                    chunk = chunks[submitted]
+                    future = _submit(
+                        task_func, step, pool, token, context, entry, chunk, slot
+                    )
+                    pending[future] = submitted
+                    submitted += 1
+
+                done, _ = wait(set(pending) | {cancelled}, return_when=FIRST_COMPLETED)
+                if cancelled in done:
+                    raise ExecutionCancelled()
+
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        outcome = future.result()
+                        if step.process:
+                            outcome = process_result(outcome)
+                    except ExecutionCancelled:
+                        raise
+                    except Exception as e:
+                        outcome = TaskResult(status=TaskStatus.FAILURE, message=str(e))
+                    if outcome.status != TaskStatus.SUCCESS:
+                        logger.warning(f"Map chunk {index} of {step.task} failed")
+                        return TaskResult(
+                            status=TaskStatus.FAILURE,
+                            message=f"Chunk {index} failed: {outcome.message}",
+                        )
+                    results[index] = outcome.data
+    finally:
+        unwatch()
+        for future in pending:
+            future.cancel()
+
+    logger.info(f"Mapped {step.task} over {len(items)} items in {len(chunks)} chunks")
+    return TaskResult(
+        status=TaskStatus.SUCCESS,
+        data={"results": results},
+        message=f"Mapped {len(items)} items in {len(chunks)} chunks",
+    )
+
+
+def _submit(
+    task_func: Callable,
+    step: MapStep,
+    pool: Executor,
+    token: CancellationToken,
+    context: Dict,
+    entry: Any,
+    chunk: List[Any],
+    slot: Optional[int] = None,
+) -> Future:
+    # Only the entry holding the list is copied, built from the decoded entry
+    head = step.keys[0]
+    chunk_entry = _replace(entry, step.keys[1:], chunk)
+    if step.process:
+        return submit_to_process(pool, InSlot(slot, task_func), {head: chunk_entry})
+    chunk_context = {**context, head: chunk_entry}
+    return submit_in_context(pool, run_task, task_func, chunk_context, token)
+
+
+def _lookup(context: Mapping, keys: Tuple[str, ...]) -> Any:
+    value = context
+    for key in keys:
+        if not isinstance(value, Mapping):
+            raise KeyError(key)
+        value = value[key]
+    return value
+
+
+def _replace(value: Mapping, keys: Tuple[str, ...], item: Any) -> Any:
+    # Copy each mapping along the path, the shared context stays untouched
+    if not keys:
+        return item
+    copy = dict(value)
+    copy[keys[0]] = _replace(value[keys[0]], keys[1:], item)
+    return copy
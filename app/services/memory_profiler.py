@@ -0,0 +1,61 @@
+import logging
+import random
+import threading
+import tracemalloc
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryProfiler:
+    """Samples tracemalloc around task calls
+
+    tracemalloc only runs while a sampled call does: it is started when the
+    call begins and stopped when it ends, so unsampled calls and the rest of
+    the process allocate at full speed. If something else already traces the
+    process, samples measure against its traced memory and leave it running.
+    tracemalloc is process wide, so only one call is sampled at a time and
+    allocations made meanwhile by other threads are attributed to it; numbers
+    are indicative, not exact.
+    """
+
+    def __init__(self, sample_rate: float = 0.01, frames: int = 1):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.frames = frames
+        self._lock = threading.Lock()
+        self._started = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def begin(self) -> Optional[int]:
+        """Start a sample; returns the baseline, or None if not sampled"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        if not self._lock.acquire(blocking=False):
+            # Another call is being sampled
+            return None
+        try:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+                return tracemalloc.get_traced_memory()[0]
+            tracemalloc.start(self.frames)
+            self._started = True
+            return 0
+        except BaseException:
+            self._lock.release()
+            raise
+
+    def end(self, baseline: int) -> Tuple[int, int]:
+        """Finish a sample and return (peak bytes, retained bytes)"""
+        try:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._started:
+                tracemalloc.stop()
+                self._started = False
+        finally:
+            self._lock.release()
+        return max(peak - baseline, 0), current - baseline
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import os
+from typing import Optional, Tuple
+
+from app.services.circuit_breaker import OPEN
+from app.services.flow_engine import FlowEngine
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a short sleep
+
+    A loop blocked by CPU-bound or synchronous work wakes up late, so the
+    overshoot is a direct measure of how long requests wait to be served.
+    The reported lag halves every interval unless a new sample exceeds it,
+    so a single stall is not forgotten by the next quick wake-up.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start measuring; must be called from the running event loop"""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            sample = max(loop.time() - started - self.interval, 0.0)
+            self.lag = max(sample, self.lag / 2)
+
+
+class ReadinessProbe:
+    """Decides whether an instance should receive more traffic
+
+    Every signal is compared against a limit set below the point where
+    latency collapses: worker slot utilization, requests queued for a slot,
+    event loop lag, stored executions, resident memory and open circuit
+    breakers. A limit of None only reports the value.
+    """
+
+    def __init__(
+        self,
+        engine: FlowEngine,
+        lag_monitor: LoopLagMonitor,
+        max_utilization: Optional[float] = 0.9,
+        max_queue_depth: Optional[int] = 8,
+        max_loop_lag: Optional[float] = 0.25,
+        max_executions: Optional[int] = None,
+        max_rss_bytes: Optional[int] = None,
+        max_open_breakers: Optional[int] = None,
+    ):
+        self.engine = engine
+        self.lag_monitor = lag_monitor
+        self.max_utilization = max_utilization
+        self.max_queue_depth = max_queue_depth
+        self.max_loop_lag = max_loop_lag
+        self.max_executions = max_executions
+        self.max_rss_bytes = max_rss_bytes
+        self.max_open_breakers = max_open_breakers
+
+    def check(
+        self, slots_used: int, slots_total: int, waiting: int
+    ) -> Tuple[bool, dict]:
+        """Evaluate all signals given the worker slot usage of the API"""
+        states = self.engine.circuit_breaker_states()
+        checks = {
+            "in_flight": _check(
+                slots_used / slots_total if slots_total else 0.0,
+                self.max_utilization,
+                running_executions=self.engine.running_executions(),
+                slots_used=slots_used,
+                slots_total=slots_total,
+            ),
+            "queue_depth": _check(
+                waiting + self.engine.task_backlog(), self.max_queue_depth
+            ),
+            "event_loop_lag_seconds": _check(self.lag_monitor.lag, self.max_loop_lag),
+            "stored_executions": _check(
+                len(self.engine.executions), self.max_executions
+            ),
+            "rss_bytes": _check(_rss_bytes(), self.max_rss_bytes),
+            "open_circuit_breakers": _check(
+                sum(1 for state in states.values() if state == OPEN),
+                self.max_open_breakers,
+            ),
+        }
+        ready = all(check["ok"] for check in checks.values())
+        if not ready:
+            failing = [name for name, check in checks.items() if not check["ok"]]
+            logger.warning(f"Instance not ready: {', '.join(failing)}")
+        return ready, checks
+
+
+def _check(value, limit, **details) -> dict:
+    ok = limit is None or value is None or value <= limit
+    return {"value": value, "limit": limit, "ok": ok, **details}
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
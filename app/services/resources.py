@@ -0,0 +1,227 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Context key under which tasks find the resource manager
+RESOURCES_KEY = "resources"
+
+
+def _close(resource: Any):
+    close = getattr(resource, "close", None)
+    if close is not None:
+        close()
+
+
+class ResourcePool:
+    """Bounded, thread-safe pool of one kind of resource
+
+    Resources are created by `factory` on demand up to `max_size` and reused
+    afterwards, so a task borrowing a database connection does not pay for
+    connecting. Borrowers beyond `max_size` wait up to `acquire_timeout`
+    seconds. A resource returned after a failure is discarded, and `check`
+    validates an idle resource for health checks.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        max_size: int = 8,
+        close: Callable[[Any], None] = _close,
+        check: Optional[Callable[[Any], Any]] = None,
+        acquire_timeout: float = 30.0,
+    ):
+        if max_size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.name = name
+        self.factory = factory
+        self.max_size = max_size
+        self._close = close
+        self._check = check
+        self.acquire_timeout = acquire_timeout
+        self._idle: deque = deque()
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._acquired = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_seconds = 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Borrow a resource, creating one if the pool is not full"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise ValueError(f"Resource pool '{self.name}' is closed")
+                if self._idle:
+                    resource = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve the slot, the factory runs outside the lock
+                    self._size += 1
+                    resource = None
+                    break
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise TimeoutError(
+                        f"No '{self.name}' resource free within {timeout}s"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._acquired += 1
+            self._wait_seconds += time.monotonic() - started
+
+        if resource is None:
+            try:
+                resource = self.factory()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        return resource
+
+    def release(self, resource: Any, discard: bool = False):
+        """Return a borrowed resource, or close it when it may be broken"""
+        with self._cond:
+            if not discard and not self._closed:
+                self._idle.append(resource)
+                self._cond.notify()
+                return
+            self._size -= 1
+            self._discarded += discard
+            self._cond.notify()
+        self._close_quietly(resource)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Borrow a resource for a with block, discarding it on errors"""
+        resource = self.acquire(timeout)
+        try:
+            yield resource
+        except BaseException:
+            self.release(resource, discard=True)
+            raise
+        self.release(resource)
+
+    def health_check(self) -> bool:
+        """Whether a resource can be borrowed and passes `check`"""
+        try:
+            with self.lease(timeout=min(self.acquire_timeout, 5.0)) as resource:
+                if self._check is not None:
+                    self._check(resource)
+        except Exception as e:
+            logger.warning(f"Resource pool '{self.name}' unhealthy: {str(e)}")
+            return False
+        return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "waiting": self._waiting,
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "wait_seconds": self._wait_seconds,
+            }
+
+    def close(self):
+        """Close idle resources now and borrowed ones when they come back"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for resource in idle:
+            self._close_quietly(resource)
+
+    def _close_quietly(self, resource: Any):
+        try:
+            self._close(resource)
+        except Exception as e:
+            logger.warning(f"Failed to close '{self.name}' resource: {str(e)}")
+
+
+class ResourceManager:
+    """Named resource pools handed to tasks through the execution context
+
+    Tasks borrow a pooled resource by name from `context["resources"]`:
+
+        with context["resources"].lease("sqlite") as conn:
+            conn.execute(...)
+    """
+
+    def __init__(self):
+        self._pools: Dict[str, ResourcePool] = {}
+        self._lock = threading.Lock()
+
+    def register(self, pool: ResourcePool) -> ResourcePool:
+        """Add a pool, replacing and closing one of the same name"""
+        with self._lock:
+            previous = self._pools.get(pool.name)
+            self._pools[pool.name] = pool
+        if previous is not None:
+            previous.close()
+        logger.info(f"Registered resource pool '{pool.name}' (max {pool.max_size})")
+        return pool
+
+    def get(self, name: str) -> ResourcePool:
+        pool = self._pools.get(name)
+        if pool is None:
+            raise ValueError(f"Resource '{name}' not found")
+        return pool
+
+    def lease(self, name: str, timeout: Optional[float] = None):
+        """Borrow a resource of the named pool for a with block"""
+        return self.get(name).lease(timeout)
+
+    def names(self) -> list:
+        return list(self._pools)
+
+    def health(self) -> Dict[str, bool]:
+        """Run the health check of every pool"""
+        return {name: pool.health_check() for name, pool in list(self._pools.items())}
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: pool.stats() for name, pool in list(self._pools.items())}
+
+    def close(self):
+        """Close every pool, e.g. on shutdown"""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+
+
+def sqlite_pool(
+    name: str, path: str, max_size: int = 4, acquire_timeout: float = 30.0
+) -> ResourcePool:
+    """Pool of SQLite connections that may move between worker threads"""
+    return ResourcePool(
+        name,
+        lambda: sqlite3.connect(path, check_same_thread=False),
+        max_size=max_size,
+        check=lambda conn: conn.execute("SELECT 1").fetchone(),
+        acquire_timeout=acquire_timeout,
+    )
@@ -0,0 +1,280 @@
+import logging
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models import ScheduleDefinition, ScheduleStatus
+from app.services.cron import CronExpression
+from app.services.flow_engine import FlowEngine
+
+logger = logging.getLogger(__name__)
+
+
+class TimingWheel:
+    """Hierarchical timing wheel
+
+    Level 0 has one slot per tick and every higher level one slot per full
+    rotation of the level below. Adding a timer picks the level from its
+    distance and appends to one slot, and a tick empties one level 0 slot,
+    so both are O(1) whatever the number of timers. When a higher level
+    slot comes up its timers move down to finer levels, at most once per
+    level. Timers beyond the top level wait in an overflow list that is
+    re-examined once per top level slot.
+    """
+
+    def __init__(self, slots: int = 256, levels: int = 4):
+        self.slots = slots
+        self.levels = levels
+        self.tick = 0
+        self._spans = [slots**level for level in range(levels + 1)]
+        self._wheels: List[List[List[Tuple[int, Any]]]] = [
+            [[] for _ in range(slots)] for _ in range(levels)
+        ]
+        self._overflow: List[Tuple[int, Any]] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, due_tick: int, item: Any):
+        """Add a timer; ticks already passed fire on the next advance"""
+        self._place(max(due_tick, self.tick + 1), item)
+        self._size += 1
+
+    def advance(self) -> List[Any]:
+        """Move one tick forward and return the items that became due"""
+        self.tick = tick = self.tick + 1
+        for level in range(1, self.levels):
+            span = self._spans[level]
+            if tick % span:
+                break
+            self._cascade(self._wheels[level], (tick // span) % self.slots)
+        else:
+            overflow, self._overflow = self._overflow, []
+            for due_tick, item in overflow:
+                self._place(due_tick, item)
+
+        slot = tick % self.slots
+        expired = self._wheels[0][slot]
+        self._wheels[0][slot] = []
+        self._size -= len(expired)
+        return [item for _, item in expired]
+
+    def _place(self, due_tick: int, item: Any):
+        delta = due_tick - self.tick
+        for level in range(self.levels):
+            if delta < self._spans[level + 1]:
+                slot = (due_tick // self._spans[level]) % self.slots
+                self._wheels[level][slot].append((due_tick, item))
+                return
+        self._overflow.append((due_tick, item))
+
+    def _cascade(self, wheel: List[List[Tuple[int, Any]]], slot: int):
+        timers = wheel[slot]
+        wheel[slot] = []
+        for due_tick, item in timers:
+            self._place(due_tick, item)
+
+
+class ScheduledFlow:
+    """Runtime state of one schedule"""
+
+    __slots__ = (
+        "id",
+        "definition",
+        "cron",
+        "next_run",
+        "running",
+        "runs",
+        "skipped_overlaps",
+        "misfires",
+        "last_execution_id",
+        "last_error",
+        "removed",
+    )
+
+    def __init__(self, schedule_id: str, definition: ScheduleDefinition):
+        self.id = schedule_id
+        self.definition = definition
+        self.cron = CronExpression(definition.cron) if definition.cron else None
+        self.next_run = 0.0
+        self.running = 0
+        self.runs = 0
+        self.skipped_overlaps = 0
+        self.misfires = 0
+        self.last_execution_id: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.removed = False
+
+    def following(self, now: float) -> float:
+        """Next run after `now`; missed interval runs are not replayed"""
+        if self.cron is not None:
+            return self.cron.next_after(now)
+        interval = self.definition.interval_seconds
+        # Stay aligned with the first run instead of drifting by the lateness
+        missed = max(math.floor((now - self.next_run) / interval), 0)
+        return self.next_run + (missed + 1) * interval
+
+    def to_model(self) -> ScheduleStatus:
+        return ScheduleStatus(
+            schedule_id=self.id,
+            definition=self.definition,
+            next_run_at=None
+            if self.removed
+            else datetime.fromtimestamp(self.next_run, UTC).isoformat(),
+            running=self.running,
+            runs=self.runs,
+            skipped_overlaps=self.skipped_overlaps,
+            misfires=self.misfires,
+            last_execution_id=self.last_execution_id,
+            last_error=self.last_error,
+        )
+
+
+class Scheduler:
+    """Runs registered flows on cron or interval schedules
+
+    A background thread advances a timing wheel every `tick_seconds` and
+    hands due schedules to a worker pool that calls the engine, so a slow
+    flow never delays other schedules. Pass `now` to `run_pending` to drive
+    the wheel without the thread.
+    """
+
+    def __init__(
+        self,
+        engine: FlowEngine,
+        tick_seconds: float = 0.1,
+        pool_size: int = 8,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.engine = engine
+        self.tick_seconds = tick_seconds
+        self.clock = clock
+        self.wheel = TimingWheel()
+        self.schedules: Dict[str, ScheduledFlow] = {}
+        self.pool = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="schedule"
+        )
+        self._origin = clock()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, definition: ScheduleDefinition) -> ScheduledFlow:
+        """Attach a schedule to a registered flow"""
+        if definition.flow_id not in self.engine.flow_definitions:
+            raise ValueError(f"Flow {definition.flow_id} not found")
+        schedule = ScheduledFlow(str(uuid.uuid4()), definition)
+        now = self.clock()
+        if schedule.cron is not None:
+            schedule.next_run = schedule.cron.next_after(now)
+        else:
+            schedule.next_run = now + definition.interval_seconds
+        with self._lock:
+            self.schedules[schedule.id] = schedule
+            self.wheel.add(self._tick_of(schedule.next_run), schedule)
+        logger.info(f"Schedule {schedule.id} added for flow {definition.flow_id}")
+        return schedule
+
+    def remove(self, schedule_id: str) -> bool:
+        with self._lock:
+            schedule = self.schedules.pop(schedule_id, None)
+            if schedule is None:
+                return False
+            # Its pending timer is dropped when it comes up
+            schedule.removed = True
+        logger.info(f"Schedule {schedule_id} removed")
+        return True
+
+    def get(self, schedule_id: str) -> Optional[ScheduledFlow]:
+        return self.schedules.get(schedule_id)
+
+    def list_schedules(self, flow_id: Optional[str] = None) -> List[ScheduledFlow]:
+        schedules = list(self.schedules.values())
+        if flow_id is not None:
+            schedules = [s for s in schedules if s.definition.flow_id == flow_id]
+        return schedules
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """Advance the wheel up to `now` and dispatch due schedules"""
+        now = self.clock() if now is None else now
+        target = math.floor((now - self._origin) / self.tick_seconds)
+        due: List[ScheduledFlow] = []
+        with self._lock:
+            while self.wheel.tick < target:
+                due.extend(self.wheel.advance())
+        for schedule in due:
+            if not schedule.removed:
+                self._fire(schedule, now)
+        return len(due)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="scheduler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Scheduler started with {len(self.schedules)} schedules")
+
+    def shutdown(self):
+        """Stop ticking and the worker pool without waiting for running flows"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _loop(self):
+        while not self._stop.wait(self.tick_seconds):
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"Scheduler tick failed: {str(e)}")
+
+    def _tick_of(self, timestamp: float) -> int:
+        return math.ceil((timestamp - self._origin) / self.tick_seconds)
+
+    def _fire(self, schedule: ScheduledFlow, now: float):
+        definition = schedule.definition
+        run = True
+        lateness = now - schedule.next_run
+        if lateness > definition.misfire_grace_seconds:
+            schedule.misfires += 1
+            run = definition.misfire_policy == "run_once"
+            logger.warning(
+                f"Schedule {schedule.id} misfired by {lateness:.1f}s, "
+                f"{'running once' if run else 'skipping'}"
+            )
+
+        with self._lock:
+            if run and schedule.running and definition.overlap_policy == "skip":
+                schedule.skipped_overlaps += 1
+                run = False
+                logger.info(f"Schedule {schedule.id} skipped, previous run active")
+            if run:
+                schedule.running += 1
+            if not schedule.removed:
+                schedule.next_run = schedule.following(now)
+                self.wheel.add(self._tick_of(schedule.next_run), schedule)
+
+        if run:
+            self.pool.submit(self._run, schedule)
+
+    def _run(self, schedule: ScheduledFlow):
+        try:
+            execution_id = self.engine.execute_flow(schedule.definition.flow_id)
+            schedule.last_execution_id = execution_id
+            schedule.last_error = None
+        except Exception as e:
+            schedule.last_error = str(e)
+            logger.error(f"Scheduled run of {schedule.id} failed: {str(e)}")
+        finally:
+            with self._lock:
+                schedule.running -= 1
+                schedule.runs += 1
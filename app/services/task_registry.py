@@ -1,26 +1,155 @@
-from typing import Callable, Dict
+import importlib
+import logging
+import sys
+import threading
+import time
+from importlib.metadata import EntryPoint, entry_points
+from typing import Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+TaskSource = Union[Callable, str, EntryPoint]
 
 
 class TaskRegistry:
-    """Registry to store and retrieve task implementations"""
+    """Registry to store and retrieve task implementations
+
+    Tasks can be registered as callables, as dotted import paths
+    (``package.module:function``) or through an entry-point group. Paths and
+    entry points are only imported the first time the task is requested, or
+    ahead of time by `prewarm`.
+    """
 
     def __init__(self):
         self._tasks: Dict[str, Callable] = {}
+        self._lazy: Dict[str, Union[str, EntryPoint]] = {}
+        self._import_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Held while a task is imported, so slow imports only block their task
+        self._loading: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, func: TaskSource):
+        """Register a task implementation, a dotted path or an entry point"""
+        with self._lock:
+            if callable(func) and not isinstance(func, EntryPoint):
+                self._tasks[name] = func
+                self._lazy.pop(name, None)
+            else:
+                self._lazy[name] = func
+                self._tasks.pop(name, None)
 
-    def register(self, name: str, func: Callable):
-        """Register a task implementation"""
-        self._tasks[name] = func
+    def register_entry_points(self, group: str) -> List[str]:
+        """Register every task advertised under an entry-point group"""
+        names = []
+        for entry_point in entry_points(group=group):
+            self.register(entry_point.name, entry_point)
+            names.append(entry_point.name)
+        if names:
+            logger.info(f"Registered {len(names)} tasks from entry points '{group}'")
+        return names
 
     def get(self, name: str) -> Callable:
-        """Get a task implementation"""
-        if name not in self._tasks:
-            raise ValueError(f"Task '{name}' not found in registry")
-        return self._tasks[name]
+        """Get a task implementation, importing it on first use"""
+        func = self._tasks.get(name)
+        if func is None:
+            func = self._resolve(name)
+        return func
 
     def exists(self, name: str) -> bool:
         """Check if task exists"""
-        return name in self._tasks
+        return name in self._tasks or name in self._lazy
 
     def list_tasks(self) -> list:
         """List all registered task names"""
-        return list(self._tasks.keys())
+        return list(self._tasks.keys()) + [
+            name for name in self._lazy if name not in self._tasks
+        ]
+
+    def prewarm(self, background: bool = False) -> Optional[threading.Thread]:
+        """Import every lazily registered task ahead of first use"""
+        if background:
+            thread = threading.Thread(
+                target=self.prewarm, name="task-prewarm", daemon=True
+            )
+            thread.start()
+            return thread
+
+        for name in list(self._lazy):
+            try:
+                self._resolve(name)
+            except ValueError as e:
+                logger.error(str(e))
+        self.log_import_report()
+        return None
+
+    def import_report(self) -> List[dict]:
+        """Import cost of each task module loaded by the registry, slowest first"""
+        return [
+            {"module": module, "seconds": seconds}
+            for module, seconds in sorted(
+                self._import_times.items(), key=lambda item: item[1], reverse=True
+            )
+        ]
+
+    def log_import_report(self):
+        """Log the import cost of each task module"""
+        for entry in self.import_report():
+            logger.info(
+                f"Task module {entry['module']} imported in {entry['seconds']:.3f}s"
+            )
+
+    def _resolve(self, name: str) -> Callable:
+        with self._lock:
+            if name in self._tasks:
+                return self._tasks[name]
+            if name not in self._lazy:
+                raise ValueError(f"Task '{name}' not found in registry")
+            loading = self._loading.setdefault(name, threading.Lock())
+
+        with loading:
+            with self._lock:
+                # Loaded by another thread while this one waited
+                if name in self._tasks:
+                    return self._tasks[name]
+                source = self._lazy.get(name)
+                if source is None:
+                    raise ValueError(f"Task '{name}' not found in registry")
+
+            try:
+                func = self._load(source)
+            except Exception as e:
+                raise ValueError(f"Failed to load task '{name}': {str(e)}") from e
+            if not callable(func):
+                raise ValueError(f"Task '{name}' resolved to a non-callable")
+
+            with self._lock:
+                self._loading.pop(name, None)
+                # Keep a registration made while the import ran
+                if self._lazy.get(name) is source:
+                    self._tasks[name] = func
+                    del self._lazy[name]
+            return func
+
+    def _load(self, source: Union[str, EntryPoint]) -> Callable:
+        if isinstance(source, EntryPoint):
+            self._import(source.module)
+            return source.load()
+
+        if ":" in source:
+            module_name, _, attr = source.partition(":")
+        else:
+            module_name, _, attr = source.rpartition(".")
+        module = self._import(module_name)
+        for part in attr.split("."):
+            module = getattr(module, part)
+        return module
+
+    def _import(self, module_name: str):
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        seconds = time.perf_counter() - started
+        self._import_times[module_name] = seconds
+        logger.debug(f"Task module {module_name} imported in {seconds:.3f}s")
+        return module
@@ -0,0 +1,227 @@
+import asyncio
+import inspect
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Callable, Dict, Optional
+
+from app.models import Task, TaskResult, TaskStatus
+from app.services.cancellation import CancellationToken, ExecutionCancelled
+from app.services.tracing import submit_in_context
+
+logger = logging.getLogger(__name__)
+
+
+def run_task(
+    task_func: Callable, context: Dict, token: CancellationToken
+) -> TaskResult:
+    """Invoke a task so that cancellation can interrupt it where possible
+
+    Coroutine functions run on a private event loop and are cancelled through
+    the token. A sync task may return a `concurrent.futures.Future` (e.g. work
+    submitted to a process pool); waiting on it stops as soon as the token is
+    cancelled, and a future that has not started is dropped. One already
+    running is abandoned, not stopped. Plain sync tasks run to completion.
+    """
+    if inspect.iscoroutinefunction(task_func):
+        return asyncio.run(_run_async(task_func, context, token))
+
+    result = task_func(context)
+    if isinstance(result, Future):
+        result = _wait_future(result, token)
+    return result
+
+
+async def _run_async(
+    task_func: Callable, context: Dict, token: CancellationToken
+) -> TaskResult:
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(task_func(context))
+    unregister = token.on_cancel(lambda: loop.call_soon_threadsafe(task.cancel))
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if token.cancelled:
+            raise ExecutionCancelled() from None
+        raise
+    finally:
+        unregister()
+
+
+def _wait_future(future: Future, token: CancellationToken) -> TaskResult:
+    settled = threading.Event()
+    future.add_done_callback(lambda _: settled.set())
+    unregister = token.on_cancel(settled.set)
+    try:
+        settled.wait()
+    finally:
+        unregister()
+
+    if not future.done():
+        future.cancel()
+        raise ExecutionCancelled()
+    return future.result()
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a flow runs out of its deadline budget"""
+
+
+class TaskPolicy:
+    """Timeout, retry and hedging settings declared on a task"""
+
+    __slots__ = ("timeout", "retries", "backoff", "hedge_percentile")
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        retries: int = 0,
+        backoff: float = 0.1,
+        hedge_percentile: Optional[float] = None,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_percentile = hedge_percentile
+
+    @classmethod
+    def from_task(cls, task: Task) -> Optional["TaskPolicy"]:
+        """Policy for a task definition, or None if it declares none"""
+        if (
+            task.timeout_seconds is None
+            and task.retries == 0
+            and task.hedge_percentile is None
+        ):
+            return None
+        return cls(
+            task.timeout_seconds,
+            task.retries,
+            task.retry_backoff_seconds,
+            task.hedge_percentile,
+        )
+
+
+def run_task_with_policy(
+    task_func: Callable,
+    context: Dict,
+    token: CancellationToken,
+    pool: Executor,
+    policy: TaskPolicy,
+    deadline: Optional[float] = None,
+    hedge_delay: Optional[float] = None,
+) -> TaskResult:
+    """Run a task with timeouts, retries and hedging
+
+    Each attempt runs on the pool and is bounded by the task timeout and the
+    remaining flow deadline (a `time.monotonic()` value). When `hedge_delay`
+    is given, a duplicate attempt starts if the first has not finished by
+    then, and the first successful result wins. Unsuccessful attempts are
+    retried with full-jitter exponential backoff, and a timed out attempt
+    counts as a failure result. A sync task that overruns is abandoned, not
+    stopped; async tasks are interrupted and queued futures dropped.
+    """
+    for attempt in range(policy.retries + 1):
+        if attempt:
+            logger.info(f"Retrying task, attempt {attempt + 1}")
+            delay = random.uniform(0, policy.backoff * 2 ** (attempt - 1))
+            if deadline is not None:
+                delay = min(delay, max(deadline - time.monotonic(), 0))
+            if token.wait(delay):
+                raise ExecutionCancelled()
+
+        timeout = policy.timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("Flow deadline exceeded")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        try:
+            result = _attempt(task_func, context, token, pool, timeout, hedge_delay)
+        except TimeoutError as e:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DeadlineExceeded("Flow deadline exceeded") from e
+            outcome = TaskResult(status=TaskStatus.FAILURE, message=str(e))
+        except ExecutionCancelled:
+            raise
+        except Exception as e:
+            outcome = e
+        else:
+            if result.status == TaskStatus.SUCCESS:
+                return result
+            outcome = result
+
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
+
+
+def _attempt(
+    task_func: Callable,
+    context: Dict,
+    token: CancellationToken,
+    pool: Executor,
+    timeout: Optional[float],
+    hedge_delay: Optional[float],
+) -> TaskResult:
+    # Attempts get their own token so losing or overrunning attempts can be
+    # interrupted without cancelling the execution
+    attempt_token = CancellationToken()
+    unlink = token.on_cancel(attempt_token.cancel)
+    cancelled: Future = Future()
+    unwatch = token.on_cancel(lambda: cancelled.set_result(None))
+
+    started = time.monotonic()
+    pending = {submit_in_context(pool, run_task, task_func, context, attempt_token)}
+    hedged = hedge_delay is None
+    fallback = None
+
+    try:
+        while True:
+            elapsed = time.monotonic() - started
+            if timeout is not None and elapsed >= timeout:
+                raise TimeoutError(f"Task timed out after {timeout:g}s")
+            if not hedged and elapsed >= hedge_delay:
+                logger.info("Starting hedged task attempt")
+                pending.add(
+                    submit_in_context(pool, run_task, task_func, context, attempt_token)
+                )
+                hedged = True
+
+            waits = []
+            if timeout is not None:
+                waits.append(timeout - elapsed)
+            if not hedged:
+                waits.append(hedge_delay - elapsed)
+            done, _ = wait(
+                pending | {cancelled},
+                timeout=min(waits) if waits else None,
+                return_when=FIRST_COMPLETED,
+            )
+            if cancelled in done:
+                raise ExecutionCancelled()
+
+            for future in done:
+                pending.discard(future)
+                try:
+                    outcome = future.result()
+                except ExecutionCancelled:
+                    raise
+                except Exception as e:
+                    outcome = e
+                else:
+                    if outcome.status == TaskStatus.SUCCESS:
+                        return outcome
+                if fallback is None:
+                    fallback = outcome
+
+            if not pending:
+                if isinstance(fallback, Exception):
+                    raise fallback
+                return fallback
+    finally:
+        unwatch()
+        unlink()
+        attempt_token.cancel()
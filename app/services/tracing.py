@@ -0,0 +1,353 @@
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Span kinds and status codes of the OpenTelemetry data model
+INTERNAL = "SPAN_KIND_INTERNAL"
+SERVER = "SPAN_KIND_SERVER"
+STATUS_UNSET = "STATUS_CODE_UNSET"
+STATUS_OK = "STATUS_CODE_OK"
+STATUS_ERROR = "STATUS_CODE_ERROR"
+
+# (trace id, span id) of the span new spans should be children of
+SpanContext = Tuple[str, str]
+
+_current: contextvars.ContextVar[Optional[SpanContext]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    """A timed operation in a trace, shaped after the OpenTelemetry span
+
+    Used as a context manager: entering makes it the current span, leaving
+    ends it, marks it failed on an exception and hands it to the exporter.
+    """
+
+    __slots__ = (
+        "name",
+        "kind",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "start_time",
+        "end_time",
+        "attributes",
+        "status",
+        "status_message",
+        "_exporter",
+        "_reset",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        attributes: Optional[Dict[str, Any]] = None,
+        exporter: Optional["SpanExporter"] = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.attributes = attributes if attributes is not None else {}
+        self.status = STATUS_UNSET
+        self.status_message: Optional[str] = None
+        self._exporter = exporter
+        self._reset = None
+
+    def __enter__(self) -> "Span":
+        self._reset = _current.set(self.context)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._reset)
+        if exc is not None:
+            self.set_status(STATUS_ERROR, str(exc) or exc_type.__name__)
+        self.end_time = time.time_ns()
+        if self._exporter is not None:
+            self._exporter.export(self.to_dict())
+
+    @property
+    def context(self) -> SpanContext:
+        return self.trace_id, self.span_id
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_status(self, status: str, message: Optional[str] = None):
+        self.status = status
+        self.status_message = message
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": self.end_time,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+class _NoopSpan:
+    """Stand-in handed out while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_status(self, status: str, message: Optional[str] = None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter
+
+    Parent links follow the current span of the calling context, so nested
+    `span()` blocks form a tree. Without an exporter every span is a no-op.
+    """
+
+    def __init__(self, exporter: Optional["SpanExporter"] = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = INTERNAL,
+        parent: Optional[SpanContext] = None,
+    ) -> Union[Span, _NoopSpan]:
+        """New span under `parent`, or under the current span by default"""
+        exporter = self.exporter
+        if exporter is None:
+            return NOOP_SPAN
+
+        if parent is None:
+            parent = _current.get()
+        if parent is None:
+            return Span(name, kind, os.urandom(16).hex(), None, attributes, exporter)
+        return Span(name, kind, parent[0], parent[1], attributes, exporter)
+
+
+class SpanExporter(ABC):
+    """Receives finished spans as OpenTelemetry shaped dicts"""
+
+    @abstractmethod
+    def export(self, span: dict):
+        """Export one finished span"""
+
+    def export_batch(self, spans: List[dict]):
+        for span in spans:
+            self.export(span)
+
+    def shutdown(self):
+        pass
+
+
+class JsonlFileExporter(SpanExporter):
+    """Appends spans to a file, one JSON object per line"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: dict):
+        self.export_batch([span])
+
+    def export_batch(self, spans: List[dict]):
+        lines = b"".join(orjson.dumps(span) + b"\n" for span in spans)
+        with self._lock, open(self.path, "ab") as f:
+            f.write(lines)
+
+
+class BatchSpanExporter(SpanExporter):
+    """Queues spans and writes them in batches from a background thread
+
+    `export` never blocks the caller; when the queue is full the span is
+    dropped and counted.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 512,
+        flush_interval: float = 1.0,
+    ):
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(max_queue_size)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._worker, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def export(self, span: dict):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop the worker after writing out the queued spans"""
+        self._stopped.set()
+        self._thread.join(timeout)
+        if self.dropped:
+            logger.warning(f"Dropped {self.dropped} spans, export queue was full")
+
+    def _worker(self):
+        while True:
+            stopping = self._stopped.wait(self.flush_interval)
+            self._drain()
+            if stopping:
+                return
+
+    def _drain(self):
+        while True:
+            batch = []
+            try:
+                while len(batch) < self.max_batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if not batch:
+                return
+            try:
+                self.exporter.export_batch(batch)
+            except Exception as e:
+                logger.error(f"Span export failed: {str(e)}")
+
+
+class _CollectingExporter(SpanExporter):
+    def __init__(self):
+        self.spans: List[dict] = []
+
+    def export(self, span: dict):
+        self.spans.append(span)
+
+
+# Process wide tracer, disabled until `configure` installs an exporter
+tracer = Tracer()
+
+
+def configure(exporter: Optional[SpanExporter]):
+    """Install (or with None, remove) the exporter of the global tracer"""
+    previous, tracer.exporter = tracer.exporter, exporter
+    if previous is not None:
+        previous.shutdown()
+
+
+def current_span_context() -> Optional[SpanContext]:
+    return _current.get()
+
+
+def format_traceparent(context: SpanContext) -> str:
+    """W3C traceparent header for a span context"""
+    return f"00-{context[0]}-{context[1]}-01"
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """Span context from a W3C traceparent header, None if malformed"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2]
+
+
+def submit_in_context(pool: Executor, fn: Callable, *args: Any) -> Future:
+    """Submit to a thread pool so the call sees the caller's trace context"""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def submit_to_process(pool: Executor, fn: Callable, *args: Any) -> Future:
+    """Submit to a process pool, carrying the trace context across
+
+    The worker runs `fn` under the caller's span and sends the spans it
+    created back with the result. The future resolves to a pair that
+    `process_result` unpacks, exporting the spans in this process.
+    """
+    context = _current.get() if tracer.enabled else None
+    traceparent = format_traceparent(context) if context else None
+    return pool.submit(_run_in_process, traceparent, fn, *args)
+
+
+def process_result(value: Tuple[Any, List[dict]]) -> Any:
+    """Export the spans of a `submit_to_process` call and return its result"""
+    result, spans = value
+    exporter = tracer.exporter
+    if exporter is not None:
+        for span in spans:
+            exporter.export(span)
+    return result
+
+
+def _run_in_process(traceparent: Optional[str], fn: Callable, *args: Any):
+    if traceparent is None:
+        return fn(*args), []
+
+    # Spans are collected and shipped back, the exporter stays in the parent
+    collector = _CollectingExporter()
+    previous, tracer.exporter = tracer.exporter, collector
+    try:
+        with tracer.span(
+            getattr(fn, "__name__", "task"), parent=parse_traceparent(traceparent)
+        ) as span:
+            span.set_attribute("process.pid", os.getpid())
+            result = fn(*args)
+    finally:
+        tracer.exporter = previous
+    return result, collector.spans
+
+
+class TraceContextFilter(logging.Filter):
+    """Adds the current trace and span ids to log records"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _current.get()
+        record.trace_id, record.span_id = context if context else ("-", "-")
+        return True
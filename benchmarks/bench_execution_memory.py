@@ -0,0 +1,106 @@
+"""Measure retained heap bytes per execution record
+
+Compares the pydantic `FlowExecutionStatus` the engine used to keep in memory
+with the compact `ExecutionRecord`, both holding the results of the default
+three task flow. Run with `python -m benchmarks.bench_execution_memory`.
+"""
+
+import logging
+import time
+import tracemalloc
+import uuid
+from datetime import UTC, datetime
+
+from app.models import FlowDefinition, FlowExecutionStatus
+from app.services.compiled_flow import CompiledFlow
+from app.services.execution_record import ExecutionRecord, TaskRecord
+from app.services.tasks import task1_fetch_data, task2_process_data, task3_store_data
+
+COUNT = 20000
+
+FLOW = FlowDefinition(
+    flow={
+        "id": "flow123",
+        "name": "Data processing flow",
+        "start_task": "task1",
+        "tasks": [
+            {"name": "task1", "description": "Fetch data"},
+            {"name": "task2", "description": "Process data"},
+            {"name": "task3", "description": "Store data"},
+        ],
+        "conditions": [],
+    }
+).flow
+
+TASKS = [
+    ("task1", task1_fetch_data),
+    ("task2", task2_process_data),
+    ("task3", task3_store_data),
+]
+
+
+def run_tasks() -> list:
+    context = {}
+    results = []
+    for name, func in TASKS:
+        result = func(context)
+        context[name] = result.model_dump()
+        results.append((name, result))
+    return results
+
+
+def build_pydantic() -> FlowExecutionStatus:
+    execution = FlowExecutionStatus(
+        execution_id=str(uuid.uuid4()),
+        flow_id=FLOW.id,
+        status="running",
+        current_task=FLOW.start_task,
+        started_at=datetime.now(UTC).isoformat(),
+    )
+    for name, result in run_tasks():
+        execution.task_results[name] = result
+        execution.completed_tasks.append(name)
+    execution.status = "completed"
+    execution.current_task = None
+    execution.ended_at = datetime.now(UTC).isoformat()
+    execution.message = "Flow completed. Executed 3 tasks."
+    return execution
+
+
+def build_compact(flow: CompiledFlow) -> ExecutionRecord:
+    execution = ExecutionRecord(str(uuid.uuid4()), flow, time.time())
+    for name, result in run_tasks():
+        execution.results.append(
+            TaskRecord(
+                flow.task_index[name], result.status, result.data, result.message
+            )
+        )
+    execution.status = "completed"
+    execution.ended_at = time.time()
+    execution.message = "Flow completed. Executed 3 tasks."
+    return execution
+
+
+def measure(build) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    retained = [build() for _ in range(COUNT)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(retained) == COUNT
+    return (after - before) / COUNT
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    flow = CompiledFlow(FLOW)
+    pydantic_bytes = measure(build_pydantic)
+    compact_bytes = measure(lambda: build_compact(flow))
+    print(f"executions:           {COUNT}")
+    print(f"FlowExecutionStatus:  {pydantic_bytes:8.0f} bytes/execution")
+    print(f"ExecutionRecord:      {compact_bytes:8.0f} bytes/execution")
+    print(f"reduction:            {1 - compact_bytes / pydantic_bytes:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Measure end-to-end throughput of the SQLite and CSV reference tasks
+
+Runs a two task flow that fetches every row of a source and bulk inserts it
+into a SQLite table through the engine, and a one task flow streaming the rows
+straight into the table, and reports rows per second. Run with
+`python -m benchmarks.bench_io_tasks`.
+"""
+
+import csv
+import logging
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from app.models import FlowDefinition
+from app.services.flow_engine import FlowEngine
+from app.services.io_tasks import (
+    csv_fetch,
+    csv_rows,
+    sqlite_fetch,
+    sqlite_rows,
+    sqlite_store,
+)
+from app.services.resources import ResourceManager, sqlite_pool
+from app.services.task_registry import TaskRegistry
+
+ROWS = 200_000
+COLUMNS = ("id", "name", "amount")
+
+FLOW = FlowDefinition(
+    flow={
+        "id": "copy",
+        "name": "Copy rows",
+        "start_task": "fetch",
+        "tasks": [
+            {"name": "fetch", "description": "Fetch rows"},
+            {"name": "store", "description": "Store rows"},
+        ],
+        "conditions": [
+            {
+                "name": "fetched",
+                "description": "Store fetched rows",
+                "source_task": "fetch",
+                "target_task_success": "store",
+                "target_task_failure": "end",
+            }
+        ],
+    }
+)
+
+COPY_FLOW = FlowDefinition(
+    flow={
+        "id": "copy",
+        "name": "Copy rows",
+        "start_task": "copy",
+        "tasks": [{"name": "copy", "description": "Stream rows"}],
+        "conditions": [],
+    }
+)
+
+
+def rows():
+    return ((i, f"name-{i}", i * 0.5) for i in range(ROWS))
+
+
+def prepare(root: Path) -> Path:
+    database = root / "bench.db"
+    conn = sqlite3.connect(database)
+    conn.execute("CREATE TABLE source (id INTEGER, name TEXT, amount REAL)")
+    conn.execute("CREATE TABLE target (id INTEGER, name TEXT, amount REAL)")
+    conn.executemany("INSERT INTO source VALUES (?, ?, ?)", rows())
+    conn.commit()
+    conn.close()
+    with open(root / "source.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows())
+    return database
+
+
+def measure(database: Path, fetch=None, source=None) -> float:
+    """Rows per second of a fetch and store flow, or of a streamed copy"""
+    resources = ResourceManager()
+    resources.register(sqlite_pool("sqlite", str(database)))
+    registry = TaskRegistry()
+    if source is None:
+        registry.register("fetch", fetch)
+        registry.register("store", sqlite_store("target", source="fetch"))
+    else:
+        registry.register("copy", sqlite_store("target", source=source))
+    engine = FlowEngine(registry, resources=resources)
+    engine.register_flow(FLOW if source is None else COPY_FLOW)
+
+    started = time.perf_counter()
+    execution = engine.get_execution(engine.execute_flow("copy"))
+    seconds = time.perf_counter() - started
+    assert execution.status == "completed", execution.message
+    engine.shutdown()
+    resources.close()
+    return ROWS / seconds
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        database = prepare(root)
+        sqlite_rate = measure(database, sqlite_fetch("SELECT * FROM source"))
+        csv_rate = measure(database, csv_fetch(str(root / "source.csv")))
+        sqlite_stream = measure(database, source=sqlite_rows("SELECT * FROM source"))
+        csv_stream = measure(database, source=csv_rows(str(root / "source.csv")))
+    print(f"rows:                 {ROWS}")
+    print(f"SQLite -> SQLite:     {sqlite_rate:10.0f} rows/s")
+    print(f"CSV -> SQLite:        {csv_rate:10.0f} rows/s")
+    print(f"SQLite => SQLite:     {sqlite_stream:10.0f} rows/s (streamed)")
+    print(f"CSV => SQLite:        {csv_stream:10.0f} rows/s (streamed)")
+
+
+if __name__ == "__main__":
+    main()
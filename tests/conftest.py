@@ -12,7 +12,9 @@ from fastapi.testclient import TestClient
 
 from app.api.dependencies import flow_engine, task_registry
 from app.main import app
-from app.models import FlowDefinition
+from app.models import FlowDefinition, TaskResult, TaskStatus
+from app.services.flow_engine import FlowEngine
+from app.services.task_registry import TaskRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +64,7 @@ def load_default_flow():
 
     # Cleanup after all tests complete
     flow_engine.flow_definitions.clear()
-    flow_engine.executions.clear()
+    flow_engine.clear_executions()
 
 
 @pytest.fixture
@@ -106,6 +108,46 @@ def sample_flow_definition():
     }
 
 
+@pytest.fixture
+def execute(client):
+    """Run a registered flow through the API and return the execution id"""
+
+    def run(flow_id: str = "flow123") -> str:
+        response = client.post(f"/api/v1/flows/{flow_id}/execute")
+        assert response.status_code == 200
+        return response.json()["execution_id"]
+
+    return run
+
+
+def _success(ctx):
+    return TaskResult(status=TaskStatus.SUCCESS)
+
+
+@pytest.fixture
+def make_engine(sample_flow_definition):
+    """Build private engines running the sample flow with stub tasks
+
+    task1..task3 run `default` unless `tasks` overrides them by name, and
+    `tasks` may register more. The flow is read when the engine is built, so
+    tests can edit `sample_flow_definition` first; `flow=None` registers
+    none. Other keyword arguments go to FlowEngine.
+    """
+
+    def make(tasks=None, default=_success, flow=sample_flow_definition, **kwargs):
+        registry = TaskRegistry()
+        for name in ("task1", "task2", "task3"):
+            registry.register(name, default)
+        for name, func in (tasks or {}).items():
+            registry.register(name, func)
+        engine = FlowEngine(registry, **kwargs)
+        if flow is not None:
+            engine.register_flow(FlowDefinition(**flow))
+        return engine
+
+    return make
+
+
 @pytest.fixture
 def invalid_flow_definition():
     """Invalid flow definition for testing error handling"""
@@ -125,4 +167,4 @@ def reset_executions():
     """Reset execution state between tests (but keep flow definitions)"""
     yield
     # Only clear executions, not flow definitions
-    flow_engine.executions.clear()
+    flow_engine.clear_executions()
@@ -0,0 +1,158 @@
+"""Time-ordered execution ID and archive segment tests"""
+
+import time
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import flow_engine
+from app.models import TaskResult, TaskStatus
+from app.services.archive import ExecutionArchive
+from app.services.compaction import ArchiveCompactor
+from app.services.execution_ids import execution_id_time, new_execution_id
+
+
+def _with_data(ctx):
+    return TaskResult(status=TaskStatus.SUCCESS, data=[1, 2])
+
+
+def test_execution_ids_sort_by_time():
+    """Test IDs are UUIDv7, strictly increasing and carry their timestamp"""
+    ids = [new_execution_id() for _ in range(5000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert uuid.UUID(ids[0]).version == 7
+
+    now = time.time()
+    assert execution_id_time(new_execution_id(now)) == pytest.approx(now, abs=0.01)
+    assert execution_id_time(str(uuid.uuid4())) is None
+    assert execution_id_time("not-an-id") is None
+
+
+def test_compaction_moves_finished_executions(tmp_path, make_engine):
+    """Test finished executions move to a segment and stay readable"""
+    engine = make_engine(default=_with_data, archive=ExecutionArchive(tmp_path))
+    ids = [engine.execute_flow("test_flow_001") for _ in range(10)]
+    expected = engine.get_execution(ids[3]).to_dict()
+
+    assert engine.archive_executions(0) == 10
+    assert len(engine.executions) == 0
+    assert engine.list_executions()[0] == []
+
+    (segment,) = engine.archive.segments
+    assert (segment.min_id, segment.max_id) == (ids[0], ids[-1])
+    assert engine.get_archived([ids[3]]) == {ids[3]: expected}
+
+    # Reopening the directory loads the segment indexes
+    reopened = ExecutionArchive(tmp_path)
+    assert len(reopened) == 10
+    assert reopened.get(ids[3]) == expected
+    assert reopened.get(new_execution_id()) is None
+
+
+def test_compaction_respects_age_and_running(tmp_path, make_engine):
+    """Test recent executions stay live"""
+    engine = make_engine(default=_with_data, archive=ExecutionArchive(tmp_path))
+    engine.execute_flow("test_flow_001")
+
+    assert engine.archive_executions(3600) == 0
+    assert len(engine.executions) == 1
+
+
+def test_archive_lookups_across_segments(tmp_path, make_engine):
+    """Test batched lookups and time range scans span several segments"""
+    engine = make_engine(default=_with_data, archive=ExecutionArchive(tmp_path))
+    first = [engine.execute_flow("test_flow_001") for _ in range(3)]
+    engine.archive_executions(0)
+    middle = time.time()
+    second = [engine.execute_flow("test_flow_001") for _ in range(3)]
+    engine.archive_executions(0)
+    live = engine.execute_flow("test_flow_001")
+
+    assert len(engine.archive.segments) == 2
+    executions, missing = engine.get_executions([second[1], live, first[0], "x"])
+    assert [
+        e["execution_id"] if isinstance(e, dict) else e.execution_id for e in executions
+    ] == [second[1], live, first[0]]
+    assert missing == ["x"]
+
+    since = datetime.fromtimestamp(middle, UTC)
+    assert [e["execution_id"] for e in engine.list_archived(since=since)] == second
+    assert [e["execution_id"] for e in engine.list_archived(until=since)] == first
+
+
+def test_retention_deletes_whole_segments(tmp_path, make_engine):
+    """Test retention drops segments, not individual executions"""
+    engine = make_engine(default=_with_data, archive=ExecutionArchive(tmp_path))
+    old = engine.execute_flow("test_flow_001")
+    compactor = ArchiveCompactor(engine, min_age=0, retention=3600)
+    assert compactor.run_once() == 1
+
+    assert engine.drop_archived(0) == 1
+    assert engine.archive.segments == []
+    assert list(tmp_path.iterdir()) == []
+    assert engine.get_archived([old]) == {}
+
+
+def test_archive_requires_configuration(make_engine):
+    """Test compaction fails clearly without an archive"""
+    engine = make_engine(flow=None)
+    with pytest.raises(ValueError):
+        engine.archive_executions(0)
+    assert engine.get_archived(["x"]) == {}
+
+
+def test_archived_execution_endpoints(tmp_path, client: TestClient):
+    """Test the status, lookup and archive list endpoints read the archive"""
+    execution_id = client.post("/api/v1/flows/flow123/execute").json()["execution_id"]
+    live = client.get(f"/api/v1/flows/execution/{execution_id}").json()
+
+    previous = flow_engine.archive
+    flow_engine.archive = ExecutionArchive(tmp_path)
+    try:
+        flow_engine.archive_executions(0)
+
+        response = client.get(f"/api/v1/flows/execution/{execution_id}")
+        assert response.status_code == 200
+        assert response.json() == live
+
+        response = client.get(
+            f"/api/v1/flows/execution/{execution_id}",
+            params={"fields": "status,task_results", "include_data": False},
+        )
+        assert response.json()["status"] == "completed"
+        assert "data" not in response.json()["task_results"]["task1"]
+
+        lookup = client.post(
+            "/api/v1/flows/executions:lookup",
+            json={"execution_ids": [execution_id], "fields": ["flow_id"]},
+        ).json()
+        assert lookup["executions"] == [{"flow_id": "flow123"}]
+
+        archived = client.get(
+            "/api/v1/flows/executions/archived", params={"flow_id": "flow123"}
+        ).json()
+        assert execution_id in [e["execution_id"] for e in archived["executions"]]
+    finally:
+        flow_engine.archive = previous
+
+
+def test_idempotent_replay_of_archived_execution(tmp_path, client: TestClient):
+    """Test a repeated key still answers once its execution was archived"""
+    headers = {"Idempotency-Key": "archived-replay"}
+    first = client.post("/api/v1/flows/flow123/execute", headers=headers).json()
+
+    previous = flow_engine.archive
+    flow_engine.archive = ExecutionArchive(tmp_path)
+    try:
+        flow_engine.archive_executions(0)
+
+        response = client.post("/api/v1/flows/flow123/execute", headers=headers)
+        assert response.status_code == 200
+        replay = response.json()
+        assert replay["execution_id"] == first["execution_id"]
+        assert replay["status"] == first["status"]
+    finally:
+        flow_engine.archive = previous
@@ -0,0 +1,93 @@
+"""Blob store tests"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import flow_engine
+from app.models import FlowDefinition, TaskResult, TaskStatus
+from app.services.blob_store import BlobRef, BlobStore
+from app.services.flow_engine import FlowEngine
+from app.services.task_registry import TaskRegistry
+
+
+def test_small_payloads_stay_inline(tmp_path):
+    """Test payloads under the threshold are not spilled"""
+    store = BlobStore(tmp_path, threshold=64)
+
+    data = {"records": [1, 2, 3]}
+    assert store.maybe_spill(data) is data
+    assert store.maybe_spill(b"x" * 64) == b"x" * 64
+    assert not any(tmp_path.iterdir())
+
+
+def test_large_payloads_are_spilled(tmp_path):
+    """Test large payloads become references with lazy views"""
+    store = BlobStore(tmp_path, threshold=64)
+
+    raw = store.maybe_spill(b"x" * 1000)
+    assert isinstance(raw, BlobRef)
+    assert raw.size == 1000
+    assert raw.view().readonly
+    assert bytes(raw.load()) == b"x" * 1000
+
+    structured = store.maybe_spill({"records": list(range(100))})
+    assert isinstance(structured, BlobRef)
+    assert structured.load() == {"records": list(range(100))}
+
+    assert store.get(structured.blob_id).size == structured.size
+    store.delete(structured)
+    with pytest.raises(ValueError, match="not found"):
+        store.get(structured.blob_id)
+
+
+def test_engine_spills_task_payloads(tmp_path, sample_flow_definition):
+    """Test downstream tasks read spilled data and status holds only a reference"""
+    registry = TaskRegistry()
+    registry.register(
+        "task1",
+        lambda ctx: TaskResult(
+            status=TaskStatus.SUCCESS, data={"records": list(range(1000))}
+        ),
+    )
+    registry.register(
+        "task2",
+        lambda ctx: TaskResult(
+            status=TaskStatus.SUCCESS,
+            data={"total": sum(ctx["task1"]["data"]["records"])},
+        ),
+    )
+    registry.register("task3", lambda ctx: TaskResult(status=TaskStatus.SUCCESS))
+
+    engine = FlowEngine(registry, BlobStore(tmp_path, threshold=256))
+    engine.register_flow(FlowDefinition(**sample_flow_definition))
+    execution_id = engine.execute_flow("test_flow_001")
+
+    status = engine.get_execution_status(execution_id)
+    assert status.status == "completed"
+    assert status.task_results["task2"].data == {"total": sum(range(1000))}
+    assert status.task_results["task1"].data["media_type"] == "application/json"
+
+    blob_id = status.task_results["task1"].data["blob_id"]
+    assert engine.get_blob(blob_id).size > 256
+
+    engine.clear_executions()
+    assert not any(tmp_path.iterdir())
+
+
+def test_blob_endpoint(client: TestClient, tmp_path, monkeypatch):
+    """Test spilled payloads are referenced in status and downloadable"""
+    monkeypatch.setattr(flow_engine, "blob_store", BlobStore(tmp_path, threshold=16))
+
+    exec_response = client.post("/api/v1/flows/flow123/execute")
+    execution_id = exec_response.json()["execution_id"]
+
+    status = client.get(f"/api/v1/flows/execution/{execution_id}").json()
+    ref = status["task_results"]["task1"]["data"]
+    assert set(ref) == {"blob_id", "size", "media_type"}
+    assert status["task_results"]["task2"]["status"] == "success"
+
+    response = client.get(f"/api/v1/flows/blobs/{ref['blob_id']}")
+    assert response.status_code == 200
+    assert response.json() == {"records": [1, 2, 3, 4, 5], "source": "database"}
+
+    assert client.get("/api/v1/flows/blobs/../etc").status_code == 404
@@ -0,0 +1,105 @@
+"""Execution cancellation tests"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import TaskResult, TaskStatus
+from app.services.flow_engine import FlowEngine
+
+
+def _success(ctx):
+    return TaskResult(status=TaskStatus.SUCCESS)
+
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine()
+
+
+def _running_execution_id(engine: FlowEngine) -> str:
+    while not engine._cancel_tokens:
+        time.sleep(0.001)
+    return next(iter(engine._cancel_tokens))
+
+
+def test_cancel_between_steps(engine):
+    """Test the engine stops before the next task once cancelled"""
+
+    def cancel_self(ctx):
+        engine.cancel_execution(_running_execution_id(engine))
+        return _success(ctx)
+
+    engine.task_registry.register("task1", cancel_self)
+    execution_id = engine.execute_flow("test_flow_001")
+
+    status = engine.get_execution_status(execution_id)
+    assert status.status == "cancelled"
+    assert status.completed_tasks == ["task1"]
+    assert status.message == "Flow cancelled at task task2"
+    assert engine._cancel_tokens == {}
+    assert engine.get_flow_stats("test_flow_001")["status_counts"] == {"cancelled": 1}
+
+
+def test_cancel_interrupts_async_task(engine):
+    """Test an awaiting async task is interrupted by cancellation"""
+
+    async def slow_task(ctx):
+        await asyncio.sleep(30)
+        return _success(ctx)
+
+    engine.task_registry.register("task2", slow_task)
+    canceller = threading.Thread(
+        target=lambda: engine.cancel_execution(_running_execution_id(engine))
+    )
+    canceller.start()
+
+    started = time.perf_counter()
+    execution_id = engine.execute_flow("test_flow_001")
+    canceller.join()
+
+    assert time.perf_counter() - started < 5
+    status = engine.get_execution_status(execution_id)
+    assert status.status == "cancelled"
+    assert status.completed_tasks == ["task1"]
+
+
+def test_cancel_abandons_pending_future(engine):
+    """Test waiting on a task future stops when cancelled"""
+    future = Future()
+    engine.task_registry.register("task1", lambda ctx: future)
+    canceller = threading.Thread(
+        target=lambda: engine.cancel_execution(_running_execution_id(engine))
+    )
+    canceller.start()
+
+    execution_id = engine.execute_flow("test_flow_001")
+    canceller.join()
+
+    assert future.cancelled()
+    assert engine.get_execution_status(execution_id).status == "cancelled"
+
+
+def test_future_task_result_is_used(engine):
+    """Test a task returning a completed future behaves like a sync task"""
+    future = Future()
+    future.set_result(_success({}))
+    engine.task_registry.register("task3", lambda ctx: future)
+
+    execution_id = engine.execute_flow("test_flow_001")
+    assert engine.get_execution_status(execution_id).status == "completed"
+
+
+def test_cancel_endpoint_errors(client: TestClient):
+    """Test cancelling finished and unknown executions"""
+    execution_id = client.post("/api/v1/flows/flow123/execute").json()["execution_id"]
+
+    response = client.post(f"/api/v1/flows/execution/{execution_id}/cancel")
+    assert response.status_code == 409
+
+    response = client.post("/api/v1/flows/execution/unknown/cancel")
+    assert response.status_code == 404
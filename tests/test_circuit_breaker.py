@@ -0,0 +1,129 @@
+"""Circuit breaker tests"""
+
+import copy
+import time
+
+from fastapi.testclient import TestClient
+
+from app.models import CircuitBreakerConfig, FlowDefinition, TaskResult, TaskStatus
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def _config(**overrides) -> CircuitBreakerConfig:
+    values = {"window_size": 4, "min_calls": 4, "open_seconds": 0.05}
+    values.update(overrides)
+    return CircuitBreakerConfig(**values)
+
+
+def test_breaker_opens_on_error_rate():
+    """Test the breaker opens once the error rate reaches the threshold"""
+    breaker = CircuitBreaker("task", _config(error_rate_threshold=0.5))
+
+    for success in (True, True, False):
+        breaker.record(success, 0.0)
+    assert breaker.state == CLOSED
+
+    breaker.record(False, 0.0)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_counts_slow_calls_as_errors():
+    """Test calls above the latency threshold count as errors"""
+    breaker = CircuitBreaker(
+        "task", _config(error_rate_threshold=1, latency_threshold_seconds=0.1)
+    )
+    for _ in range(4):
+        breaker.record(True, 0.5)
+    assert breaker.state == OPEN
+
+
+def test_breaker_half_open_probe():
+    """Test a single probe after the cool-down closes or reopens the breaker"""
+    breaker = CircuitBreaker("task", _config(error_rate_threshold=1))
+    for _ in range(4):
+        breaker.record(False, 0.0)
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record(False, 0.0)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(True, 0.0)
+    assert breaker.state == CLOSED
+
+
+def test_open_breaker_fails_fast_through_failure_path(
+    make_engine, sample_flow_definition
+):
+    """Test an open breaker skips the task and routes via the failure target"""
+    sample_flow_definition["flow"]["tasks"][2]["circuit_breaker"] = {
+        "error_rate_threshold": 1,
+        "window_size": 2,
+        "min_calls": 2,
+        "open_seconds": 60,
+    }
+    calls = []
+
+    def failing_store(ctx):
+        calls.append(1)
+        raise RuntimeError("store unavailable")
+
+    engine = make_engine({"task3": failing_store})
+
+    for _ in range(2):
+        engine.execute_flow("test_flow_001")
+    assert engine.circuit_breaker_states() == {"task3": OPEN}
+
+    execution_id = engine.execute_flow("test_flow_001")
+    status = engine.get_execution_status(execution_id)
+
+    assert len(calls) == 2
+    assert status.status == "completed_with_failures"
+    assert "Circuit breaker open" in status.task_results["task3"].message
+    stats = engine.get_flow_stats("test_flow_001")
+    assert stats["circuit_breakers"]["task3"]["state"] == OPEN
+    # The shed call counts against the task's success rate
+    task3 = stats["tasks"]["task3"]
+    assert (task3["executions"], task3["rejected"]) == (3, 1)
+    assert task3["success_rate"] == 0
+    assert stats["tasks"]["task1"]["rejected"] == 0
+
+
+def test_breaker_removed_with_its_config(make_engine, sample_flow_definition):
+    """Test re-registering without a breaker config stops the fast-fails"""
+    sample_flow_definition["flow"]["tasks"][0]["circuit_breaker"] = {
+        "error_rate_threshold": 1,
+        "window_size": 1,
+        "min_calls": 1,
+        "open_seconds": 60,
+    }
+    engine = make_engine({"task1": lambda ctx: TaskResult(status=TaskStatus.FAILURE)})
+    engine.execute_flow("test_flow_001")
+    assert engine.circuit_breaker_states() == {"task1": OPEN}
+
+    # Another flow declaring the same task keeps the breaker alive
+    other = copy.deepcopy(sample_flow_definition)
+    other["flow"]["id"] = "other_flow"
+    engine.register_flow(FlowDefinition(**other))
+    del sample_flow_definition["flow"]["tasks"][0]["circuit_breaker"]
+    engine.register_flow(FlowDefinition(**sample_flow_definition))
+    assert engine.circuit_breaker_states() == {"task1": OPEN}
+
+    del other["flow"]["tasks"][0]["circuit_breaker"]
+    engine.register_flow(FlowDefinition(**other))
+    assert engine.circuit_breaker_states() == {}
+    # The task runs again instead of failing fast
+    status = engine.get_execution_status(engine.execute_flow("test_flow_001"))
+    assert "Circuit breaker" not in (status.task_results["task1"].message or "")
+
+
+def test_health_reports_breakers(client: TestClient):
+    """Test the health endpoint lists circuit breaker states"""
+    response = client.get("/health")
+    assert response.json()["circuit_breakers"] == {}
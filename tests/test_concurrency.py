@@ -0,0 +1,84 @@
+"""Concurrent engine access tests"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.models import FlowDefinition, TaskResult, TaskStatus
+from app.services.execution_store import ExecutionStore
+from app.services.flow_engine import FlowEngine
+from app.services.task_registry import TaskRegistry
+
+THREADS = 16
+EXECUTIONS_PER_THREAD = 100
+
+
+def test_execution_store_rejects_bad_shard_count():
+    """Test shard counts must be powers of two"""
+    with pytest.raises(ValueError, match="power of two"):
+        ExecutionStore(shards=12)
+
+
+def test_engine_stress(sample_flow_definition):
+    """Hammer one engine from many threads while reading and re-registering"""
+    registry = TaskRegistry()
+    for name in ("task1", "task2", "task3"):
+        registry.register(
+            name, lambda ctx: TaskResult(status=TaskStatus.SUCCESS, data=len(ctx))
+        )
+
+    engine = FlowEngine(registry)
+    flow_def = FlowDefinition(**sample_flow_definition)
+    engine.register_flow(flow_def)
+
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        try:
+            while not stop.is_set():
+                engine.list_flows()
+                engine.get_flow_stats("test_flow_001")
+                executions, _ = engine.list_executions(status="completed", limit=20)
+                for execution in executions:
+                    engine.get_execution(execution.execution_id).to_dict()
+                engine.register_flow(flow_def)
+        except Exception as e:  # pragma: no cover - surfaced below
+            errors.append(e)
+
+    def writer(_):
+        return [
+            engine.execute_flow("test_flow_001") for _ in range(EXECUTIONS_PER_THREAD)
+        ]
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        batches = list(pool.map(writer, range(THREADS)))
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+
+    total = THREADS * EXECUTIONS_PER_THREAD
+    execution_ids = {eid for batch in batches for eid in batch}
+    assert len(execution_ids) == total
+    assert len(engine.executions) == total
+
+    stats = engine.get_flow_stats("test_flow_001")
+    assert stats["status_counts"] == {"completed": total}
+    assert stats["tasks"]["task3"]["executions"] == total
+
+    listed = set()
+    cursor = None
+    while True:
+        page, cursor = engine.list_executions(
+            flow_id="test_flow_001", status="completed", cursor=cursor, limit=500
+        )
+        listed.update(execution.execution_id for execution in page)
+        if cursor is None:
+            break
+    assert listed == execution_ids
@@ -0,0 +1,92 @@
+"""ETag and conditional GET tests"""
+
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import flow_engine
+from app.api.responses import RenderCache, etag_matches, make_etag, render_cache
+
+
+def test_execution_etag_returns_304(client: TestClient, execute):
+    """Test an unchanged execution is answered with 304"""
+    execution_id = execute()
+    url = f"/api/v1/flows/execution/{execution_id}"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = client.get(url, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert second.content == b""
+
+
+def test_execution_etag_changes_with_revision(client: TestClient, execute):
+    """Test a changed execution gets a new ETag and a full body"""
+    execution_id = execute()
+    url = f"/api/v1/flows/execution/{execution_id}"
+    etag = client.get(url).headers["etag"]
+
+    flow_engine.get_execution(execution_id).revision += 1
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["execution_id"] == execution_id
+
+
+def test_finished_execution_bytes_are_cached(client: TestClient, execute):
+    """Test a finished execution is serialized once per projection and revision"""
+    execution_id = execute()
+    url = f"/api/v1/flows/execution/{execution_id}"
+    execution = flow_engine.get_execution(execution_id)
+    key = (execution_id, execution.revision, frozenset({"status"}), True)
+
+    first = client.get(url, params={"fields": "status"})
+    assert render_cache.get(key) == first.content
+    size = render_cache.size
+
+    second = client.get(url, params={"fields": "status"})
+    assert second.content == first.content
+    assert render_cache.size == size
+
+
+def test_render_cache_is_size_bounded():
+    """Test the least recently used bodies are evicted past the byte budget"""
+    cache = RenderCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.put("c", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234" and cache.get("c") == b"1234"
+    assert cache.size == 8
+    cache.put("huge", b"x" * 11)
+    assert cache.get("huge") is None and len(cache) == 2
+
+
+def test_catalogue_etag(client: TestClient, sample_flow_definition):
+    """Test the flow list ETag changes only when a flow is registered"""
+    first = client.get("/api/v1/flows")
+    etag = first.headers["etag"]
+
+    assert (
+        client.get("/api/v1/flows", headers={"If-None-Match": etag}).status_code == 304
+    )
+
+    client.post("/api/v1/flows/register", json=sample_flow_definition)
+    response = client.get("/api/v1/flows", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_etag_matching():
+    """Test If-None-Match lists, wildcards and weak comparison"""
+    etag = make_etag(3)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(make_etag(4), etag)
+    assert not etag_matches(None, etag)
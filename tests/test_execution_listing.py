@@ -0,0 +1,107 @@
+"""Execution listing tests"""
+
+from datetime import UTC, datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.services.execution_index import ExecutionIndex
+
+
+def _started(offset: int) -> float:
+    return (datetime(2024, 1, 1, tzinfo=UTC) + timedelta(seconds=offset)).timestamp()
+
+
+def test_execution_index_pages_newest_first():
+    """Test cursor pagination walks the index newest first without gaps"""
+    index = ExecutionIndex()
+    for i in range(7):
+        index.add(f"exec{i}", "flow", "running", _started(i))
+
+    first, cursor = index.query(limit=3)
+    assert first == ["exec6", "exec5", "exec4"]
+
+    # New inserts do not shift the following pages
+    index.add("exec7", "flow", "running", _started(7))
+
+    second, cursor = index.query(cursor=cursor, limit=3)
+    third, cursor = index.query(cursor=cursor, limit=3)
+    assert second == ["exec3", "exec2", "exec1"]
+    assert third == ["exec0"]
+    assert cursor is None
+
+
+def test_execution_index_filters():
+    """Test filtering by flow, status and start time"""
+    index = ExecutionIndex()
+    for i in range(6):
+        flow_id = "a" if i % 2 == 0 else "b"
+        index.add(f"exec{i}", flow_id, "running", _started(i))
+    index.update_status("exec0", "a", "failed")
+    index.update_status("exec4", "a", "failed")
+    index.update_status("exec3", "b", "failed")
+
+    assert index.query(flow_id="a")[0] == ["exec4", "exec2", "exec0"]
+    assert index.query(status="failed")[0] == ["exec4", "exec3", "exec0"]
+    assert index.query(flow_id="a", status="failed")[0] == ["exec4", "exec0"]
+    assert index.query(flow_id="a", status="running")[0] == ["exec2"]
+
+    since = datetime(2024, 1, 1, tzinfo=UTC) + timedelta(seconds=3)
+    assert index.query(status="failed", since=since)[0] == ["exec4", "exec3"]
+    assert index.query(since=since, limit=2) == (["exec5", "exec4"], 4)
+    assert index.query(since=since, cursor=4, limit=2) == (["exec3"], None)
+
+
+def test_execution_index_trims_removed_prefix():
+    """Test removing the oldest executions shrinks the columns, not cursors"""
+    index = ExecutionIndex()
+    for i in range(6):
+        index.add(f"exec{i}", "a" if i % 2 == 0 else "b", "running", _started(i))
+    first, cursor = index.query(limit=2)
+
+    index.remove(["exec1", "exec3"])
+    assert len(index._ids) == 6
+    index.remove(["exec0", "exec2"])
+    assert index._ids == ["exec4", "exec5"]
+
+    assert index.query(cursor=cursor) == ([], None)
+    assert index.query(flow_id="a") == (["exec4"], None)
+    assert index.query(status="running", flow_id="b") == (["exec5"], None)
+    since = datetime(2024, 1, 1, tzinfo=UTC)
+    assert index.query(since=since)[0] == ["exec5", "exec4"]
+
+    index.add("exec6", "a", "running", _started(6))
+    assert index.query(limit=2) == (["exec6", "exec5"], 5)
+    assert index.query(cursor=5) == (["exec4"], None)
+
+
+def test_list_executions_endpoint(client: TestClient):
+    """Test listing executions of a flow through the API"""
+    execution_ids = [
+        client.post("/api/v1/flows/flow123/execute").json()["execution_id"]
+        for _ in range(3)
+    ]
+
+    response = client.get(
+        "/api/v1/flows/executions",
+        params={"flow_id": "flow123", "status": "completed", "limit": 2},
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["count"] == 2
+    assert [e["execution_id"] for e in data["executions"]] == execution_ids[:0:-1]
+    assert data["next_cursor"] is not None
+
+    response = client.get(
+        "/api/v1/flows/executions",
+        params={"flow_id": "flow123", "cursor": data["next_cursor"]},
+    )
+    data = response.json()
+    assert [e["execution_id"] for e in data["executions"]] == execution_ids[:1]
+    assert data["next_cursor"] is None
+
+
+def test_list_executions_invalid_cursor(client: TestClient):
+    """Test that a malformed cursor is rejected"""
+    response = client.get("/api/v1/flows/executions", params={"cursor": "abc"})
+    assert response.status_code == 400
@@ -0,0 +1,81 @@
+"""Bulk execution status lookup tests"""
+
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import flow_engine
+from app.services.execution_store import ExecutionStore
+
+
+def test_lookup_returns_statuses_in_order(client: TestClient, execute):
+    """Test found executions come back in request order"""
+    ids = [execute() for _ in range(3)][::-1]
+
+    response = client.post(
+        "/api/v1/flows/executions:lookup", json={"execution_ids": ids}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert data["missing"] == []
+    assert [e["execution_id"] for e in data["executions"]] == ids
+    assert data["executions"][0]["status"] == "completed"
+    assert (
+        data["executions"][0] == client.get(f"/api/v1/flows/execution/{ids[0]}").json()
+    )
+
+
+def test_lookup_reports_missing_ids(client: TestClient, execute):
+    """Test unknown IDs are partial results, not an error"""
+    execution_id = execute()
+
+    response = client.post(
+        "/api/v1/flows/executions:lookup",
+        json={"execution_ids": ["nope", execution_id, execution_id]},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["missing"] == ["nope"]
+    assert [e["execution_id"] for e in data["executions"]] == [execution_id]
+
+
+def test_lookup_field_projection(client: TestClient, execute):
+    """Test fields and include_data shape every returned execution"""
+    execution_id = execute()
+
+    response = client.post(
+        "/api/v1/flows/executions:lookup",
+        json={"execution_ids": [execution_id], "fields": ["execution_id", "status"]},
+    )
+    assert response.json()["executions"] == [
+        {"execution_id": execution_id, "status": "completed"}
+    ]
+
+    response = client.post(
+        "/api/v1/flows/executions:lookup",
+        json={"execution_ids": [execution_id], "include_data": False},
+    )
+    results = response.json()["executions"][0]["task_results"]
+    assert all("data" not in result for result in results.values())
+
+
+def test_lookup_validation(client: TestClient):
+    """Test unknown fields and empty or oversized batches are rejected"""
+    url = "/api/v1/flows/executions:lookup"
+    response = client.post(url, json={"execution_ids": ["a"], "fields": ["bogus"]})
+    assert response.status_code == 400
+    assert client.post(url, json={"execution_ids": []}).status_code == 422
+    too_many = {"execution_ids": [str(i) for i in range(1001)]}
+    assert client.post(url, json=too_many).status_code == 422
+
+
+def test_store_get_many_skips_unknown_ids(client: TestClient, execute):
+    """Test the batched store read returns only known records"""
+    store = ExecutionStore(shards=4)
+    ids = [execute() for _ in range(5)]
+    for execution_id in ids:
+        store.add(flow_engine.get_execution(execution_id))
+
+    found = store.get_many(ids + ["unknown"])
+    assert sorted(found) == sorted(ids)
@@ -0,0 +1,46 @@
+"""Compiled flow and execution record tests"""
+
+from app.models import FlowDefinition, TaskResult, TaskStatus
+from app.services.compiled_flow import END, CompiledFlow
+from app.services.execution_record import ExecutionRecord, TaskRecord
+
+
+def test_compiled_flow_routes(sample_flow_definition):
+    """Test conditions are compiled to index based routes"""
+    flow = CompiledFlow(FlowDefinition(**sample_flow_definition).flow)
+
+    task1, task2, task3 = (
+        flow.task_index[name] for name in ("task1", "task2", "task3")
+    )
+    success = TaskResult(status=TaskStatus.SUCCESS)
+    failure = TaskResult(status=TaskStatus.FAILURE)
+    assert flow.start == task1
+    assert flow.next_task(task1, success, {}) == task2
+    assert flow.next_task(task1, failure, {}) == END
+    assert flow.next_task(task2, success, {}) == task3
+    assert flow.next_task(task3, success, {}) is None
+
+
+def test_execution_record_matches_api_model(sample_flow_definition):
+    """Test the record renders the same JSON as the pydantic model"""
+    flow = CompiledFlow(FlowDefinition(**sample_flow_definition).flow)
+    record = ExecutionRecord("exec-1", flow, 1700000000.0)
+    record.results.append(
+        TaskRecord(flow.task_index["task1"], TaskStatus.SUCCESS, {"n": 1}, "ok")
+    )
+    record.results.append(
+        TaskRecord(flow.task_index["task2"], TaskStatus.FAILURE, None, "boom")
+    )
+    record.status = "completed_with_failures"
+    record.current_task = END
+    record.ended_at = 1700000001.5
+
+    model = record.to_model()
+    assert record.to_dict() == model.model_dump(mode="json")
+    assert model.completed_tasks == ["task1", "task2"]
+    assert model.ended_at == "2023-11-14T22:13:21.500000+00:00"
+    assert record.failed_tasks() == ["task2"]
+    assert record.to_dict(["status", "current_task"]) == {
+        "status": "completed_with_failures",
+        "current_task": None,
+    }
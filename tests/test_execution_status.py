@@ -90,3 +90,43 @@ def test_execution_status_has_timestamps(client: TestClient):
     assert data["ended_at"] is not None
     assert isinstance(data["started_at"], str)
     assert isinstance(data["ended_at"], str)
+
+
+def test_execution_status_field_projection(client: TestClient):
+    """Test that fields= limits the returned status fields"""
+    exec_response = client.post("/api/v1/flows/flow123/execute")
+    execution_id = exec_response.json()["execution_id"]
+
+    response = client.get(
+        f"/api/v1/flows/execution/{execution_id}",
+        params={"fields": "status,current_task"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"status": "completed", "current_task": None}
+
+
+def test_execution_status_unknown_field(client: TestClient):
+    """Test that projecting an unknown field is rejected"""
+    exec_response = client.post("/api/v1/flows/flow123/execute")
+    execution_id = exec_response.json()["execution_id"]
+
+    response = client.get(
+        f"/api/v1/flows/execution/{execution_id}", params={"fields": "bogus"}
+    )
+    assert response.status_code == 400
+    assert "bogus" in response.json()["detail"]
+
+
+def test_execution_status_without_data(client: TestClient):
+    """Test that include_data=false strips task payloads"""
+    exec_response = client.post("/api/v1/flows/flow123/execute")
+    execution_id = exec_response.json()["execution_id"]
+
+    response = client.get(
+        f"/api/v1/flows/execution/{execution_id}", params={"include_data": "false"}
+    )
+    assert response.status_code == 200
+
+    task_results = response.json()["task_results"]
+    assert task_results["task1"]["status"] == "success"
+    assert "data" not in task_results["task1"]
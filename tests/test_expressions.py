@@ -0,0 +1,88 @@
+"""Condition expression tests"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import TaskResult, TaskStatus
+from app.services.expressions import compile_expression
+
+
+def test_expression_over_result_and_context():
+    """Test expressions read the result, its shorthands and the context"""
+    result = TaskResult(status=TaskStatus.SUCCESS, data={"records": [1, 2, 3]})
+    context = {"task1": {"status": TaskStatus.SUCCESS, "data": {"count": 7}}}
+
+    assert compile_expression("len(data.records) > 2")(result, context)
+    assert compile_expression("status == 'success' and not message")(result, context)
+    assert compile_expression("context.task1.data.count % 2 == 1")(result, context)
+    assert compile_expression("result.data['records'][0] in (1, 5)")(result, context)
+    assert not compile_expression("context.missing.data is not None")(result, context)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "__import__('os')",
+        "open('secrets')",
+        "result.__class__",
+        "(lambda: 1)()",
+        "[x for x in data]",
+        "data.records.append(1)",
+        "status ==",
+        'len("a" * 300000000) > 0',
+        "len([0] * 300000000) > 0",
+        "len(300000000 * (1, 2)) > 0",
+        "'" + "a" * 2000 + "' == message",
+    ],
+)
+def test_unsafe_expressions_rejected(source):
+    """Test anything outside the whitelist fails to compile"""
+    with pytest.raises(ValueError):
+        compile_expression(source)
+
+
+def test_repeating_data_is_bounded():
+    """Test multiplying numbers works but repeating a sequence is capped"""
+    result = TaskResult(status=TaskStatus.SUCCESS, data={"n": 3, "text": "ab"})
+
+    assert compile_expression("data.n * 2 == 6")(result, {})
+    assert compile_expression("len(data.text * data.n) == 6")(result, {})
+    with pytest.raises(ValueError, match="too long"):
+        compile_expression("len(data.text * 300000000) > 0")(result, {})
+
+
+def test_expression_routes_execution(make_engine, sample_flow_definition):
+    """Test a data-aware condition picks the branch at runtime"""
+    sample_flow_definition["flow"]["conditions"][0].update(
+        expression="len(data.records) > 1000",
+        target_task_success="task3",
+        target_task_failure="task2",
+    )
+    records = {"records": list(range(10))}
+
+    engine = make_engine(
+        {"task1": lambda ctx: TaskResult(status=TaskStatus.SUCCESS, data=records)}
+    )
+
+    small = engine.execute_flow("test_flow_001")
+    assert engine.get_execution_status(small).completed_tasks == [
+        "task1",
+        "task2",
+        "task3",
+    ]
+
+    records["records"] = list(range(2000))
+    bulk = engine.execute_flow("test_flow_001")
+    assert engine.get_execution_status(bulk).completed_tasks == ["task1", "task3"]
+
+
+def test_register_rejects_invalid_expression(
+    client: TestClient, sample_flow_definition
+):
+    """Test an invalid expression is reported at registration"""
+    sample_flow_definition["flow"]["id"] = "bad_expression_flow"
+    sample_flow_definition["flow"]["conditions"][0]["expression"] = "os.system('x')"
+
+    response = client.post("/api/v1/flows/register", json=sample_flow_definition)
+    assert response.status_code == 400
+    assert "condition_task1" in response.json()["detail"]
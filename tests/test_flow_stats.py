@@ -0,0 +1,57 @@
+"""Flow statistics tests"""
+
+import random
+
+from fastapi.testclient import TestClient
+
+from app.services.flow_stats import QuantileSketch
+
+
+def test_quantile_sketch_relative_accuracy():
+    """Test sketch quantiles stay within the configured relative error"""
+    rng = random.Random(42)
+    values = [rng.lognormvariate(0, 1) for _ in range(10000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    values.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * exact
+
+
+def test_quantile_sketch_bounded_buckets():
+    """Test sketch memory is capped regardless of the value range"""
+    sketch = QuantileSketch(max_buckets=64)
+    for exponent in range(-300, 300):
+        sketch.add(10.0**exponent)
+
+    assert len(sketch.buckets) <= 64
+    assert sketch.count == 600
+    assert abs(sketch.quantile(1.0) - sketch.max) <= 0.01 * sketch.max
+
+
+def test_flow_stats_endpoint(client: TestClient, sample_flow_definition):
+    """Test stats are accumulated across executions of a flow"""
+    sample_flow_definition["flow"]["id"] = "stats_flow"
+    client.post("/api/v1/flows/register", json=sample_flow_definition)
+
+    for _ in range(3):
+        client.post("/api/v1/flows/stats_flow/execute")
+
+    response = client.get("/api/v1/flows/stats_flow/stats")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["executions"] == 3
+    assert data["status_counts"] == {"completed": 3}
+    assert data["duration_seconds"]["p99"] >= data["duration_seconds"]["p50"]
+    assert data["tasks"]["task1"]["executions"] == 3
+    assert data["tasks"]["task1"]["success_rate"] == 1.0
+
+
+def test_flow_stats_unknown_flow(client: TestClient):
+    """Test stats for an unknown flow return 404"""
+    response = client.get("/api/v1/flows/missing_flow/stats")
+    assert response.status_code == 404
@@ -0,0 +1,68 @@
+"""Flow versioning tests"""
+
+import gc
+
+from fastapi.testclient import TestClient
+
+from app.models import FlowDefinition, TaskResult, TaskStatus
+from app.services.flow_engine import FlowEngine
+from app.services.task_registry import TaskRegistry
+
+
+def _success(ctx):
+    return TaskResult(status=TaskStatus.SUCCESS)
+
+
+def test_reregister_during_execution_pins_version(sample_flow_definition):
+    """Test a running execution keeps its version across a hot swap"""
+    registry = TaskRegistry()
+    engine = FlowEngine(registry)
+    engine.register_flow(FlowDefinition(**sample_flow_definition))
+
+    # v2 ends the flow right after task1
+    swapped = FlowDefinition(**sample_flow_definition)
+    swapped.flow.conditions[0].target_task_success = "end"
+
+    def swap_then_succeed(ctx):
+        assert engine.register_flow(swapped) == 2
+        return _success(ctx)
+
+    registry.register("task1", swap_then_succeed)
+    registry.register("task2", _success)
+    registry.register("task3", _success)
+
+    first = engine.execute_flow("test_flow_001")
+    status = engine.get_execution_status(first)
+    assert status.flow_version == 1
+    assert status.completed_tasks == ["task1", "task2", "task3"]
+
+    registry.register("task1", _success)
+    second = engine.execute_flow("test_flow_001")
+    status = engine.get_execution_status(second)
+    assert status.flow_version == 2
+    assert status.completed_tasks == ["task1"]
+
+
+def test_superseded_versions_are_released(make_engine, sample_flow_definition):
+    """Test old plans are freed once no execution is running on them"""
+    engine = make_engine(default=_success)
+    execution_id = engine.execute_flow("test_flow_001")
+    engine.register_flow(FlowDefinition(**sample_flow_definition))
+    gc.collect()
+
+    assert engine.list_flow_versions("test_flow_001") == [2]
+    # Finished executions still render against their own version
+    status = engine.get_execution_status(execution_id)
+    assert status.flow_version == 1
+    assert status.completed_tasks == ["task1", "task2", "task3"]
+
+
+def test_register_returns_version(client: TestClient, sample_flow_definition):
+    """Test re-registering through the API bumps the version"""
+    sample_flow_definition["flow"]["id"] = "versioned_flow"
+
+    first = client.post("/api/v1/flows/register", json=sample_flow_definition)
+    second = client.post("/api/v1/flows/register", json=sample_flow_definition)
+
+    assert first.json()["version"] == 1
+    assert second.json()["version"] == 2
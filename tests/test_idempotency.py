@@ -0,0 +1,114 @@
+"""Idempotency key and single-flight tests"""
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import FlowDefinition, TaskResult, TaskStatus
+from app.services.idempotency import IdempotencyTable
+
+
+def test_repeated_key_returns_first_execution(make_engine):
+    """Test a repeated key does not run the flow again"""
+    calls = []
+    engine = make_engine(
+        {"task1": lambda ctx: calls.append(1) or TaskResult(status=TaskStatus.SUCCESS)}
+    )
+
+    first = engine.execute_flow("test_flow_001", "key-1")
+    assert engine.execute_flow("test_flow_001", "key-1") == first
+    assert engine.execute_flow("test_flow_001", "key-2") != first
+    assert engine.execute_flow("test_flow_001") != first
+    assert len(calls) == 3
+
+
+def test_concurrent_duplicates_share_one_execution(make_engine):
+    """Test in-flight duplicates wait for and share the first execution"""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def blocking(ctx):
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return TaskResult(status=TaskStatus.SUCCESS)
+
+    engine = make_engine({"task1": blocking})
+    results = []
+
+    def execute():
+        results.append(engine.execute_flow("test_flow_001", "same"))
+
+    threads = [threading.Thread(target=execute) for _ in range(4)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert len(set(results)) == 1
+    assert engine.get_execution(results[0]).status == "completed"
+
+
+def test_failed_call_releases_key(make_engine, sample_flow_definition):
+    """Test a key whose first call failed can be retried"""
+    engine = make_engine()
+
+    with pytest.raises(ValueError):
+        engine.execute_flow("not_registered", "key")
+    sample_flow_definition["flow"]["id"] = "not_registered"
+    engine.register_flow(FlowDefinition(**sample_flow_definition))
+
+    execution_id = engine.execute_flow("not_registered", "key")
+    assert engine.get_execution(execution_id).flow_id == "not_registered"
+
+
+def test_table_expires_and_evicts_keys():
+    """Test keys expire after the TTL and the oldest go first when full"""
+    table = IdempotencyTable(ttl=0.01)
+    entry, owner = table.claim("a")
+    assert owner
+    assert table.claim("a") == (entry, False)
+    table.complete(entry, "exec-a")
+    time.sleep(0.02)
+    assert table.claim("a")[1]
+
+    table = IdempotencyTable(max_keys=2)
+    for key in ("a", "b", "c"):
+        table.complete(table.claim(key)[0], key)
+    assert len(table) == 2
+    assert table.claim("c")[1] is False
+
+
+def test_table_keeps_running_entries():
+    """Test an unfinished entry survives expiry and eviction"""
+    table = IdempotencyTable(ttl=0.01, max_keys=2)
+    running, _ = table.claim("running")
+    time.sleep(0.02)
+    assert table.claim("running") == (running, False)
+
+    table = IdempotencyTable(max_keys=2)
+    running, _ = table.claim("running")
+    table.complete(table.claim("done")[0], "exec-done")
+    table.claim("new")
+    assert table.claim("running") == (running, False)
+    assert table.claim("done")[1] is True
+    assert table.claim("a")[1]
+
+
+def test_idempotency_key_header(client: TestClient):
+    """Test the execute endpoint honors the Idempotency-Key header"""
+    headers = {"Idempotency-Key": "order-42"}
+    first = client.post("/api/v1/flows/flow123/execute", headers=headers)
+    second = client.post("/api/v1/flows/flow123/execute", headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["execution_id"] == second.json()["execution_id"]
@@ -0,0 +1,247 @@
+"""SQLite and CSV reference task tests"""
+
+import csv
+import sqlite3
+import tracemalloc
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import FlowDefinition, TaskStatus
+from app.services.flow_engine import FlowEngine
+from app.services.io_tasks import (
+    csv_fetch,
+    csv_rows,
+    sqlite_fetch,
+    sqlite_rows,
+    sqlite_store,
+)
+from app.services.resources import RESOURCES_KEY, ResourceManager, sqlite_pool
+from app.services.task_registry import TaskRegistry
+
+ROWS = [(i, f"name-{i}") for i in range(25)]
+
+
+@pytest.fixture
+def resources(tmp_path):
+    database = tmp_path / "test.db"
+    conn = sqlite3.connect(database)
+    conn.execute("CREATE TABLE source (id INTEGER, name TEXT)")
+    conn.execute("CREATE TABLE target (id INTEGER, name TEXT)")
+    conn.executemany("INSERT INTO source VALUES (?, ?)", ROWS)
+    conn.commit()
+    conn.close()
+
+    manager = ResourceManager()
+    manager.register(sqlite_pool("sqlite", str(database)))
+    yield manager
+    manager.close()
+
+
+def _target(resources) -> list:
+    with resources.lease("sqlite") as conn:
+        return conn.execute("SELECT id, name FROM target ORDER BY id").fetchall()
+
+
+class _CountingCursor:
+    def __init__(self, cursor, sizes: list):
+        self._cursor = cursor
+        self.description = cursor.description
+        self.sizes = sizes
+
+    def fetchmany(self, size: int) -> list:
+        self.sizes.append(size)
+        return self._cursor.fetchmany(size)
+
+    def close(self):
+        self._cursor.close()
+
+
+def test_sqlite_fetch_returns_every_row(resources):
+    """Test every row is fetched whatever the batch size"""
+    fetch = sqlite_fetch(
+        "SELECT id, name FROM source WHERE id < ?", (10,), batch_size=3
+    )
+    result = fetch({RESOURCES_KEY: resources})
+
+    assert result.status == TaskStatus.SUCCESS
+    assert result.data["columns"] == ["id", "name"]
+    assert result.data["records"] == [list(row) for row in ROWS[:10]]
+
+
+def test_sqlite_rows_steps_the_cursor_in_batches(resources):
+    """Test the cursor is read `batch_size` rows at a time, not all at once"""
+    sizes = []
+
+    @contextmanager
+    def lease(name):
+        with resources.lease(name) as conn:
+            execute = conn.execute
+            yield SimpleNamespace(
+                execute=lambda *args: _CountingCursor(execute(*args), sizes)
+            )
+
+    source = sqlite_rows(
+        "SELECT id, name FROM source WHERE id < ?", (10,), batch_size=3
+    )
+    with source(lease) as (columns, rows):
+        first = next(rows)
+        assert sizes == [3]
+        assert [first, *rows] == ROWS[:10]
+    assert sizes == [3] * 5
+
+
+def test_csv_fetch(tmp_path):
+    """Test CSV rows are read with the header as column names"""
+    path = tmp_path / "rows.csv"
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows([("id", "name"), *ROWS])
+
+    result = csv_fetch(str(path))({})
+    assert result.data["columns"] == ["id", "name"]
+    assert result.data["records"][3] == ["3", "name-3"]
+    assert len(result.data["records"]) == len(ROWS)
+
+    assert csv_fetch(str(tmp_path / "missing.csv"))({}).status == TaskStatus.FAILURE
+
+
+def test_sqlite_store_commits_in_chunks(resources):
+    """Test records are inserted chunk by chunk and counted"""
+    context = {
+        RESOURCES_KEY: resources,
+        "task1": {"data": {"columns": ["id", "name"], "records": ROWS}},
+    }
+    result = sqlite_store("target", chunk_size=10)(context)
+
+    assert result.status == TaskStatus.SUCCESS
+    assert result.data == {"stored_count": 25, "table": "target", "chunks": 3}
+    assert _target(resources) == ROWS
+
+
+def test_sqlite_store_accepts_dict_records(resources):
+    """Test records given as dicts are stored by key"""
+    records = [{"name": name, "id": i} for i, name in ROWS[:2]]
+    context = {RESOURCES_KEY: resources, "task1": {"data": {"records": records}}}
+
+    assert sqlite_store("target")(context).data["stored_count"] == 2
+    assert _target(resources) == ROWS[:2]
+
+
+def test_sqlite_store_dict_records_follow_columns(resources):
+    """Test a columns override picks and orders the values of dict records"""
+    records = [{"extra": 0, "name": name, "id": i} for i, name in ROWS[:2]]
+    context = {RESOURCES_KEY: resources, "task1": {"data": {"records": records}}}
+
+    result = sqlite_store("target", columns=["name", "id"])(context)
+    assert result.data["stored_count"] == 2
+    assert _target(resources) == ROWS[:2]
+
+
+def test_sqlite_store_empty_source(resources):
+    """Test an empty source stores nothing and succeeds"""
+    context = {RESOURCES_KEY: resources, "task1": {"data": {"records": []}}}
+    result = sqlite_store("target")(context)
+
+    assert result.status == TaskStatus.SUCCESS
+    assert result.data == {"stored_count": 0, "table": "target", "chunks": 0}
+    empty = sqlite_rows("SELECT id, name FROM source WHERE id < 0")
+    assert sqlite_store("target", empty)(context).data["stored_count"] == 0
+
+
+def test_sqlite_store_streams_row_sources(resources, tmp_path):
+    """Test rows stream from a query on the same pool or a CSV file"""
+    context = {RESOURCES_KEY: resources}
+    source = sqlite_rows("SELECT id, name FROM source", batch_size=4)
+    result = sqlite_store("target", source, chunk_size=10)(context)
+
+    assert result.data == {"stored_count": 25, "table": "target", "chunks": 3}
+    assert _target(resources) == ROWS
+    # The query read through the connection that wrote
+    assert resources.stats()["sqlite"]["size"] == 1
+
+    path = tmp_path / "rows.csv"
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows([("id", "name"), *ROWS])
+    result = sqlite_store("target", csv_rows(str(path)))(context)
+    assert result.data["stored_count"] == 25
+
+
+def test_streamed_copy_memory_is_bounded(resources):
+    """Test a streamed copy holds batches, not the whole result, in memory"""
+    with resources.lease("sqlite") as conn, conn:
+        conn.executemany(
+            "INSERT INTO source VALUES (?, ?)",
+            ((i, f"name-{i:032}") for i in range(25, 50_000)),
+        )
+    context = {RESOURCES_KEY: resources}
+
+    def peak(task) -> int:
+        tracemalloc.start()
+        try:
+            assert task(context).status == TaskStatus.SUCCESS
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    fetched = peak(sqlite_fetch("SELECT id, name FROM source", batch_size=100))
+    streamed = peak(
+        sqlite_store(
+            "target",
+            sqlite_rows("SELECT id, name FROM source", batch_size=100),
+            chunk_size=100,
+        )
+    )
+    assert streamed < 1024 * 1024 < fetched
+    assert streamed * 20 < fetched
+
+
+def test_sqlite_store_failures(resources):
+    """Test missing input, bad identifiers and SQL errors fail the task"""
+    assert sqlite_store("target")({RESOURCES_KEY: resources}).status == (
+        TaskStatus.FAILURE
+    )
+    context = {
+        RESOURCES_KEY: resources,
+        "task1": {"data": {"columns": ["id", "name"], "records": ROWS}},
+    }
+    result = sqlite_store('target"; DROP TABLE source; --')(context)
+    assert result.status == TaskStatus.FAILURE
+    assert "Invalid SQL identifier" in result.message
+    assert sqlite_store("missing_table")(context).status == TaskStatus.FAILURE
+
+
+def test_fetch_and_store_flow(resources):
+    """Test the tasks plug into a flow through the context contract"""
+    registry = TaskRegistry()
+    registry.register("fetch", sqlite_fetch("SELECT id, name FROM source"))
+    registry.register("store", sqlite_store("target", source="fetch", chunk_size=7))
+    engine = FlowEngine(registry, resources=resources)
+    engine.register_flow(
+        FlowDefinition(
+            flow={
+                "id": "copy",
+                "name": "Copy rows",
+                "start_task": "fetch",
+                "tasks": [
+                    {"name": "fetch", "description": "Fetch rows"},
+                    {"name": "store", "description": "Store rows"},
+                ],
+                "conditions": [
+                    {
+                        "name": "fetched",
+                        "description": "Store fetched rows",
+                        "source_task": "fetch",
+                        "target_task_success": "store",
+                        "target_task_failure": "end",
+                    }
+                ],
+            }
+        )
+    )
+
+    execution = engine.get_execution(engine.execute_flow("copy"))
+    assert execution.status == "completed"
+    assert _target(resources) == ROWS
+    # One pooled connection served both tasks
+    assert resources.stats()["sqlite"]["size"] == 1
@@ -0,0 +1,224 @@
+"""Map task tests"""
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import FlowDefinition, Task, TaskResult, TaskStatus
+from app.services.blob_store import BlobRef, BlobStore
+from app.services.cancellation import process_cancelled
+from app.services.flow_engine import FlowEngine
+from app.services.task_registry import TaskRegistry
+
+
+def _fetch(ctx):
+    return TaskResult(status=TaskStatus.SUCCESS, data={"records": list(range(10))})
+
+
+def _spin_until_cancelled(ctx):
+    # Runs in a process pool worker; reports how it stopped through files
+    marker = Path(ctx["fetch"]["data"]["marker"])
+    (marker / "started").touch()
+    deadline = time.monotonic() + 10
+    while not process_cancelled() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    (marker / "stopped").write_text("cancelled" if process_cancelled() else "timed out")
+    return TaskResult(status=TaskStatus.SUCCESS)
+
+
+def _engine(map_config: dict, source: str = "fetch") -> FlowEngine:
+    registry = TaskRegistry()
+    registry.register(source, _fetch)
+    registry.register("process", "app.services.tasks:task2_process_data")
+    engine = FlowEngine(registry)
+    engine.register_flow(
+        FlowDefinition(
+            flow={
+                "id": "map_flow",
+                "name": "Map flow",
+                "start_task": source,
+                "tasks": [
+                    {"name": source, "description": "Fetch"},
+                    {
+                        "name": "task2",
+                        "description": "Process in chunks",
+                        "map": {
+                            "task": "process",
+                            "items": f"{source}.data.records",
+                            **map_config,
+                        },
+                    },
+                ],
+                "conditions": [
+                    {
+                        "name": "fetched",
+                        "description": "Map after fetching",
+                        "source_task": source,
+                        "target_task_success": "task2",
+                        "target_task_failure": "end",
+                    }
+                ],
+            }
+        )
+    )
+    return engine
+
+
+def _map_result(engine: FlowEngine) -> TaskResult:
+    status = engine.get_execution_status(engine.execute_flow("map_flow"))
+    return status.task_results["task2"]
+
+
+def test_map_gathers_chunks_in_order():
+    """Test chunk outputs come back in list order"""
+    engine = _engine({"chunk_size": 3})
+    # task2 reads task1.data.records, point it at the fetch output instead
+    engine.task_registry.register(
+        "process",
+        lambda ctx: TaskResult(
+            status=TaskStatus.SUCCESS,
+            data=[x * 2 for x in ctx["fetch"]["data"]["records"]],
+        ),
+    )
+
+    result = _map_result(engine)
+    assert result.status == TaskStatus.SUCCESS
+    assert result.data == {"results": [[0, 2, 4], [6, 8, 10], [12, 14, 16], [18]]}
+
+
+def test_map_limits_concurrency():
+    """Test no more than `concurrency` chunks run at once"""
+    engine = _engine({"chunk_size": 1, "concurrency": 2})
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def slow(ctx):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+        return TaskResult(status=TaskStatus.SUCCESS)
+
+    engine.task_registry.register("process", slow)
+
+    assert _map_result(engine).status == TaskStatus.SUCCESS
+    assert max(peak) == 2
+
+
+def test_map_chunk_failure_fails_step():
+    """Test a failing chunk fails the map step"""
+    engine = _engine({"chunk_size": 4})
+    engine.task_registry.register(
+        "process",
+        lambda ctx: TaskResult(status=TaskStatus.FAILURE, message="bad chunk"),
+    )
+
+    result = _map_result(engine)
+    assert result.status == TaskStatus.FAILURE
+    assert "bad chunk" in result.message
+
+
+def test_map_missing_items_fails_step():
+    """Test a map over a missing context path fails cleanly"""
+    engine = _engine({"items": "fetch.data.rows"})
+
+    result = _map_result(engine)
+    assert result.status == TaskStatus.FAILURE
+    assert "fetch.data.rows" in result.message
+
+
+def test_map_on_process_pool():
+    """Test the unchanged task2 runs per chunk on a process pool"""
+    # task2_process_data reads task1.data.records
+    engine = _engine({"chunk_size": 4, "executor": "process"}, source="task1")
+
+    try:
+        result = _map_result(engine)
+    finally:
+        engine.shutdown()
+    assert result.status == TaskStatus.SUCCESS
+    assert result.data == {
+        "results": [
+            {"processed_records": [0, 2, 4, 6]},
+            {"processed_records": [8, 10, 12, 14]},
+            {"processed_records": [16, 18]},
+        ]
+    }
+
+
+def test_cancel_reaches_running_process_chunk(tmp_path):
+    """Test a chunk already running on a real process pool sees cancellation"""
+    engine = _engine({"chunk_size": 1, "executor": "process"})
+    engine.task_registry.register(
+        "fetch",
+        lambda ctx: TaskResult(
+            status=TaskStatus.SUCCESS,
+            data={"records": [1], "marker": str(tmp_path)},
+        ),
+    )
+    engine.task_registry.register("process", _spin_until_cancelled)
+    execution_ids = []
+    runner = threading.Thread(
+        target=lambda: execution_ids.append(engine.execute_flow("map_flow"))
+    )
+
+    try:
+        runner.start()
+        deadline = time.monotonic() + 10
+        while not (tmp_path / "started").exists():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        engine.cancel_execution(next(iter(engine._cancel_tokens)))
+        runner.join()
+
+        status = engine.get_execution_status(execution_ids[0])
+        assert status.status == "cancelled"
+        while not (tmp_path / "stopped").exists():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert (tmp_path / "stopped").read_text() == "cancelled"
+    finally:
+        engine.shutdown()
+
+
+def test_spilled_map_source_is_decoded_once(tmp_path, monkeypatch):
+    """Test chunks are cut from one decode of a list spilled to the blob store"""
+    engine = _engine({"chunk_size": 100})
+    engine.blob_store = BlobStore(tmp_path, threshold=4096)
+    engine.task_registry.register(
+        "fetch",
+        lambda ctx: TaskResult(
+            status=TaskStatus.SUCCESS, data={"records": list(range(10_000))}
+        ),
+    )
+    engine.task_registry.register(
+        "process",
+        lambda ctx: TaskResult(
+            status=TaskStatus.SUCCESS, data=sum(ctx["fetch"]["data"]["records"])
+        ),
+    )
+    loads = []
+    load = BlobRef.load
+    monkeypatch.setattr(BlobRef, "load", lambda ref: loads.append(1) or load(ref))
+
+    result = _map_result(engine)
+    assert result.status == TaskStatus.SUCCESS
+    assert len(result.data["results"]) == 100
+    assert sum(result.data["results"]) == sum(range(10_000))
+    assert len(loads) == 1
+
+
+def test_map_config_validation():
+    """Test map settings are validated"""
+    with pytest.raises(ValidationError):
+        Task(
+            name="t",
+            description="t",
+            map={"task": "x", "items": "a.b", "chunk_size": 0},
+        )
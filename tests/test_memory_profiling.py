@@ -0,0 +1,93 @@
+"""Task memory sampling tests"""
+
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import TaskResult, TaskStatus
+from app.services.memory_profiler import MemoryProfiler
+
+MIB = 1024 * 1024
+_kept = []
+
+
+def _allocate_and_free(ctx):
+    scratch = bytearray(4 * MIB)
+    del scratch
+    return TaskResult(status=TaskStatus.SUCCESS)
+
+
+def _allocate_and_keep(ctx):
+    _kept.append(bytearray(MIB))
+    return TaskResult(status=TaskStatus.SUCCESS)
+
+
+def _small(ctx):
+    return TaskResult(status=TaskStatus.SUCCESS)
+
+
+@pytest.fixture
+def profiled_engine(make_engine):
+    """Engine sampling every task call"""
+    yield make_engine(
+        {"task1": _allocate_and_free, "task2": _allocate_and_keep},
+        memory_profiler=MemoryProfiler(sample_rate=1.0),
+    )
+    _kept.clear()
+
+
+def test_execution_records_task_memory(profiled_engine):
+    """Test sampled peak and retained bytes land on the execution"""
+    execution_id = profiled_engine.execute_flow("test_flow_001")
+    memory = profiled_engine.get_execution_status(execution_id).task_memory
+
+    assert set(memory) == {"task1", "task2", "task3"}
+    assert memory["task1"].peak_bytes >= 4 * MIB
+    assert memory["task1"].retained_bytes < MIB
+    assert memory["task2"].retained_bytes >= MIB
+
+
+def test_tracing_stops_between_sampled_calls(profiled_engine):
+    """Test tracemalloc only runs while a sampled task call does"""
+    tracing = []
+    profiled_engine.task_registry.register(
+        "task3", lambda ctx: tracing.append(tracemalloc.is_tracing()) or _small(ctx)
+    )
+    assert not tracemalloc.is_tracing()
+
+    execution_id = profiled_engine.execute_flow("test_flow_001")
+
+    assert tracing == [True]
+    assert not tracemalloc.is_tracing()
+    memory = profiled_engine.get_execution_status(execution_id).task_memory
+    assert memory["task1"].peak_bytes >= 4 * MIB
+
+
+def test_top_memory_orders_by_peak(profiled_engine):
+    """Test the largest allocating task is reported first"""
+    for _ in range(3):
+        profiled_engine.execute_flow("test_flow_001")
+
+    top = profiled_engine.get_memory_top("test_flow_001", limit=2)
+    assert top["profiling"] is True
+    assert [entry["task"] for entry in top["tasks"]] == ["task1", "task2"]
+    assert top["tasks"][0]["samples"] == 3
+
+
+def test_zero_sample_rate_records_nothing(make_engine):
+    """Test an unsampled execution carries no memory data"""
+    engine = make_engine(memory_profiler=MemoryProfiler(sample_rate=0.0))
+
+    execution_id = engine.execute_flow("test_flow_001")
+    assert engine.get_execution_status(execution_id).task_memory is None
+    assert engine.get_memory_top("test_flow_001")["tasks"] == []
+
+
+def test_memory_endpoint(client: TestClient):
+    """Test the debug endpoint reports profiling state per flow"""
+    response = client.get("/api/v1/debug/memory/flow123")
+    assert response.status_code == 200
+    assert response.json()["flow_id"] == "flow123"
+
+    assert client.get("/api/v1/debug/memory/missing").status_code == 404
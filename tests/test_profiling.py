@@ -0,0 +1,139 @@
+"""On-demand execution profiling tests"""
+
+import marshal
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models import TaskResult, TaskStatus
+from app.services.execution_profiler import ActiveProfile, ExecutionProfiler
+
+TOKEN = "s3cret"
+
+
+def _busy_wait(ctx):
+    deadline = time.perf_counter() + 0.03
+    while time.perf_counter() < deadline:
+        pass
+    return TaskResult(status=TaskStatus.SUCCESS)
+
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine(default=_busy_wait, execution_profiler=ExecutionProfiler(0.001))
+
+
+@pytest.fixture
+def debug_token(monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", TOKEN)
+    return {"X-Debug-Token": TOKEN}
+
+
+def test_profiler_is_off_until_requested(engine):
+    """Test executions run unprofiled while no profile is requested"""
+    engine.execute_flow("test_flow_001")
+    assert engine.execution_profiler.armed == {}
+    with pytest.raises(ValueError, match="No profile"):
+        engine.get_profile("test_flow_001")
+
+
+def test_profiles_only_the_requested_executions(engine):
+    """Test the next N executions are profiled and later ones are not"""
+    session = engine.start_profile("test_flow_001", executions=2)
+    for _ in range(3):
+        engine.execute_flow("test_flow_001")
+
+    assert session.done and session.profiled == 2
+    assert engine.execution_profiler.armed == {}
+    functions = {f["function"] for f in session.top_functions(limit=100)}
+    assert any("_busy_wait" in function for function in functions)
+    assert "_busy_wait" in session.pstats_text()
+    assert marshal.loads(session.pstats_dump())
+
+
+def test_collapsed_stacks_start_inside_the_execution(engine):
+    """Test samples are root-first collapsed stacks below the engine entry"""
+    session = engine.start_profile("test_flow_001", executions=1)
+    engine.execute_flow("test_flow_001")
+
+    lines = session.collapsed().splitlines()
+    assert lines and session.samples > 0
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert stack.startswith("_run_flow (flow_engine.py:")
+    assert any("_busy_wait (test_profiling.py:" in line for line in lines)
+
+
+def test_samples_skip_the_profiler_starting(engine, monkeypatch):
+    """Test samples taken while profiling starts stay out of the stacks"""
+    start = ActiveProfile.start
+
+    def slow_start(self):
+        start(self)
+        _busy_wait(None)
+
+    monkeypatch.setattr(ActiveProfile, "start", slow_start)
+    session = engine.start_profile("test_flow_001", executions=1)
+    engine.execute_flow("test_flow_001")
+
+    assert session.samples > 0
+    assert "slow_start" not in session.collapsed()
+
+
+def test_profile_of_unknown_flow_is_rejected(engine):
+    """Test profiling requires a registered flow"""
+    with pytest.raises(ValueError, match="not found"):
+        engine.start_profile("missing", executions=1)
+
+
+def test_profile_endpoints_require_token(client: TestClient, monkeypatch):
+    """Test profiling is refused without the configured token"""
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", None)
+    assert client.post("/api/v1/debug/profile/flow123").status_code == 403
+
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", TOKEN)
+    response = client.get(
+        "/api/v1/debug/profile/flow123", headers={"X-Debug-Token": "wrong"}
+    )
+    assert response.status_code == 403
+
+
+def test_profile_endpoints(client: TestClient, debug_token):
+    """Test arming, reading and discarding a profile over the API"""
+    response = client.post(
+        "/api/v1/debug/profile/flow123",
+        params={"executions": 1},
+        headers=debug_token,
+    )
+    assert response.status_code == 202
+    assert response.json()["requested"] == 1
+
+    client.post("/api/v1/flows/flow123/execute")
+
+    profile = client.get("/api/v1/debug/profile/flow123", headers=debug_token).json()
+    assert profile["done"] and profile["profiled"] == 1
+    assert profile["functions"]
+
+    collapsed = client.get(
+        "/api/v1/debug/profile/flow123",
+        params={"format": "collapsed"},
+        headers=debug_token,
+    )
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    dump = client.get(
+        "/api/v1/debug/profile/flow123",
+        params={"format": "pstats"},
+        headers=debug_token,
+    )
+    assert isinstance(marshal.loads(dump.content), dict)
+
+    url = "/api/v1/debug/profile/flow123"
+    assert client.delete(url, headers=debug_token).status_code == 204
+    assert client.get(url, headers=debug_token).status_code == 404
+    assert (
+        client.post("/api/v1/debug/profile/missing", headers=debug_token).status_code
+        == 404
+    )
@@ -0,0 +1,97 @@
+"""Readiness probe tests"""
+
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import readiness_probe
+from app.models import CircuitBreakerConfig
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.flow_engine import FlowEngine
+from app.services.readiness import LoopLagMonitor, ReadinessProbe
+from app.services.task_registry import TaskRegistry
+
+
+def _probe(**limits) -> ReadinessProbe:
+    return ReadinessProbe(FlowEngine(TaskRegistry()), LoopLagMonitor(), **limits)
+
+
+def test_idle_instance_is_ready():
+    """Test an idle engine passes every check"""
+    ready, checks = _probe().check(0, 40, 0)
+    assert ready
+    assert checks["in_flight"]["running_executions"] == 0
+
+
+def test_saturated_slots_fail_before_exhaustion():
+    """Test readiness fails once utilization passes the limit"""
+    probe = _probe(max_utilization=0.9)
+    assert probe.check(36, 40, 0)[0]
+
+    ready, checks = probe.check(37, 40, 0)
+    assert not ready
+    assert not checks["in_flight"]["ok"]
+
+
+def test_queue_depth_fails_readiness():
+    """Test requests waiting for a worker slot fail readiness"""
+    ready, checks = _probe(max_queue_depth=2).check(40, 40, 3)
+    assert not ready
+    assert checks["queue_depth"]["value"] == 3
+
+
+def test_loop_lag_fails_readiness():
+    """Test a lagging event loop fails readiness"""
+    probe = _probe(max_loop_lag=0.1)
+    probe.lag_monitor.lag = 0.5
+    ready, checks = probe.check(0, 40, 0)
+    assert not ready
+    assert not checks["event_loop_lag_seconds"]["ok"]
+
+
+def test_open_breakers_only_fail_with_a_limit():
+    """Test open breakers are reported, and fail readiness when limited"""
+    probe = _probe()
+    breaker = CircuitBreaker("flaky", CircuitBreakerConfig(window_size=1, min_calls=1))
+    breaker.record(False, 0.0)
+    probe.engine.circuit_breakers["flaky"] = breaker
+
+    ready, checks = probe.check(0, 40, 0)
+    assert ready
+    assert checks["open_circuit_breakers"]["value"] == 1
+
+    probe.max_open_breakers = 0
+    assert not probe.check(0, 40, 0)[0]
+
+
+def test_loop_lag_monitor_measures_blocking():
+    """Test blocking the loop shows up as lag"""
+
+    async def blocked() -> float:
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0)
+        time.sleep(0.1)
+        await asyncio.sleep(0.001)
+        await monitor.stop()
+        return monitor.lag
+
+    assert asyncio.run(blocked()) >= 0.05
+
+
+def test_ready_endpoint(client: TestClient):
+    """Test /ready answers 200 when healthy and 503 when saturated"""
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+    limit = readiness_probe.max_executions
+    readiness_probe.max_executions = -1
+    try:
+        response = client.get("/ready")
+    finally:
+        readiness_probe.max_executions = limit
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
+    assert not response.json()["checks"]["stored_executions"]["ok"]
@@ -0,0 +1,137 @@
+"""Resource pool and resource injection tests"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import FlowDefinition, TaskResult, TaskStatus
+from app.services.flow_engine import FlowEngine
+from app.services.resources import ResourceManager, ResourcePool, sqlite_pool
+from app.services.task_registry import TaskRegistry
+
+
+class Connection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_resources():
+    """Test released resources are handed out again instead of recreated"""
+    created = []
+    pool = ResourcePool("conn", lambda: created.append(Connection()) or created[-1])
+
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        assert second is first
+    assert len(created) == 1
+    assert pool.stats()["acquired"] == 2
+
+
+def test_pool_is_bounded_and_times_out():
+    """Test borrowers beyond max_size wait and give up after the timeout"""
+    pool = ResourcePool("conn", Connection, max_size=1)
+    held = pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)
+    assert pool.stats()["timeouts"] == 1
+
+    def release_later():
+        pool.release(held)
+
+    timer = threading.Timer(0.05, release_later)
+    timer.start()
+    assert pool.acquire(timeout=5) is held
+    timer.join()
+
+
+def test_failed_lease_discards_resource():
+    """Test a resource whose block raised is closed, not reused"""
+    pool = ResourcePool("conn", Connection)
+
+    with pytest.raises(RuntimeError):
+        with pool.lease() as broken:
+            raise RuntimeError("connection reset")
+
+    assert broken.closed
+    with pool.lease() as fresh:
+        assert fresh is not broken
+    assert pool.stats()["discarded"] == 1
+
+
+def test_close_shuts_idle_and_returned_resources():
+    """Test closing the pool closes idle resources now and borrowed ones later"""
+    pool = ResourcePool("conn", Connection)
+    idle = pool.acquire()
+    borrowed = pool.acquire()
+    pool.release(idle)
+
+    pool.close()
+    assert idle.closed and not borrowed.closed
+    pool.release(borrowed)
+    assert borrowed.closed
+    assert pool.stats()["size"] == 0
+    with pytest.raises(ValueError):
+        pool.acquire()
+
+
+def test_sqlite_pool_health_and_stats(tmp_path):
+    """Test the SQLite stand-in passes health checks and reports metrics"""
+    manager = ResourceManager()
+    manager.register(sqlite_pool("sqlite", str(tmp_path / "test.db"), max_size=2))
+
+    assert manager.health() == {"sqlite": True}
+    stats = manager.stats()["sqlite"]
+    assert (stats["max_size"], stats["size"], stats["in_use"]) == (2, 1, 0)
+
+    broken = ResourceManager()
+    broken.register(ResourcePool("db", Connection, check=lambda conn: 1 / 0))
+    assert broken.health() == {"db": False}
+    manager.close()
+    assert manager.names() == []
+
+
+def test_tasks_borrow_resources_by_name(tmp_path, make_engine):
+    """Test tasks share pooled SQLite connections through the context"""
+    manager = ResourceManager()
+    manager.register(sqlite_pool("sqlite", str(tmp_path / "test.db")))
+    with manager.lease("sqlite") as conn:
+        conn.execute("CREATE TABLE records (value INTEGER)")
+        conn.executemany("INSERT INTO records VALUES (?)", [(1,), (2,), (3,)])
+        conn.commit()
+
+    def count(ctx):
+        with ctx["resources"].lease("sqlite") as conn:
+            total = conn.execute("SELECT sum(value) FROM records").fetchone()[0]
+        return TaskResult(status=TaskStatus.SUCCESS, data={"total": total})
+
+    engine = make_engine(default=count, resources=manager)
+
+    for _ in range(3):
+        execution = engine.get_execution(engine.execute_flow("test_flow_001"))
+        assert execution.to_dict()["task_results"]["task3"]["data"] == {"total": 6}
+    # Nine task calls, one connection
+    assert manager.stats()["sqlite"]["size"] == 1
+    assert manager.stats()["sqlite"]["acquired"] == 10
+
+
+def test_resources_task_name_is_reserved(sample_flow_definition):
+    """Test a task can't shadow the resource manager in the context"""
+    sample_flow_definition["flow"]["tasks"][0]["name"] = "resources"
+    sample_flow_definition["flow"]["start_task"] = "resources"
+    engine = FlowEngine(TaskRegistry())
+    with pytest.raises(ValueError, match="reserved"):
+        engine.register_flow(FlowDefinition(**sample_flow_definition))
+
+
+def test_health_and_debug_report_resources(client: TestClient):
+    """Test /health and the debug endpoint expose the resource pools"""
+    assert "resources" in client.get("/health").json()
+    response = client.get("/api/v1/debug/resources")
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
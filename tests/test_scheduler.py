@@ -0,0 +1,228 @@
+"""Scheduler, timing wheel and cron tests"""
+
+import random
+import threading
+from datetime import UTC, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import ScheduleDefinition, TaskResult, TaskStatus
+from app.services.cron import CronExpression
+from app.services.flow_engine import FlowEngine
+from app.services.scheduler import Scheduler, TimingWheel
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _timestamp(*args) -> float:
+    return datetime(*args, tzinfo=UTC).timestamp()
+
+
+def _scheduler(engine: FlowEngine):
+    clock = FakeClock()
+    return Scheduler(engine, tick_seconds=0.1, clock=clock), clock
+
+
+def _drain(scheduler: Scheduler):
+    scheduler.pool.shutdown(wait=True)
+
+
+def test_timing_wheel_fires_on_due_tick():
+    """Test timers fire exactly on their tick across every level"""
+    wheel = TimingWheel(slots=8, levels=3)
+    due = sorted(random.Random(7).sample(range(1, 2000), 300))
+    for tick in due:
+        wheel.add(tick, tick)
+    assert len(wheel) == 300
+
+    fired = []
+    while wheel.tick < 2000:
+        for item in wheel.advance():
+            assert item == wheel.tick
+            fired.append(item)
+    assert fired == due
+    assert len(wheel) == 0
+
+
+def test_timing_wheel_past_ticks_fire_next():
+    """Test a timer added for a past tick fires on the next advance"""
+    wheel = TimingWheel(slots=4, levels=2)
+    for _ in range(5):
+        wheel.advance()
+    wheel.add(2, "late")
+    assert wheel.advance() == ["late"]
+
+
+def test_cron_next_after():
+    """Test cron fields, steps, ranges and day matching"""
+    start = _timestamp(2024, 1, 1, 10, 7)
+    assert CronExpression("*/15 * * * *").next_after(start) == _timestamp(
+        2024, 1, 1, 10, 15
+    )
+    assert CronExpression("0 9-17 * * 1-5").next_after(start) == _timestamp(
+        2024, 1, 1, 11, 0
+    )
+    # 2024-01-06 is a Saturday, the next weekday run is Monday
+    saturday = _timestamp(2024, 1, 6, 12, 0)
+    assert CronExpression("30 8 * * 1-5").next_after(saturday) == _timestamp(
+        2024, 1, 8, 8, 30
+    )
+    # Both day fields restricted: either may match
+    assert CronExpression("0 0 13 * 5").next_after(start) == _timestamp(
+        2024, 1, 5, 0, 0
+    )
+    assert CronExpression("@yearly").next_after(start) == _timestamp(2025, 1, 1)
+    assert CronExpression("0 0 29 2 *").next_after(start) == _timestamp(2024, 2, 29)
+
+
+@pytest.mark.parametrize("expression", ["* * *", "60 * * * *", "*/0 * * * *", "a"])
+def test_invalid_cron_rejected(expression):
+    """Test malformed cron expressions raise ValueError"""
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_interval_schedule_runs_flow(make_engine):
+    """Test an interval schedule fires once per interval"""
+    scheduler, clock = _scheduler(make_engine())
+    schedule = scheduler.add(
+        ScheduleDefinition(
+            flow_id="test_flow_001", interval_seconds=10, overlap_policy="allow"
+        )
+    )
+
+    clock.now += 9.9
+    assert scheduler.run_pending() == 0
+    clock.now += 0.15
+    for _ in range(3):
+        scheduler.run_pending()
+        clock.now += 10
+    _drain(scheduler)
+
+    assert schedule.runs == 3
+    assert schedule.misfires == 0
+    execution = scheduler.engine.get_execution(schedule.last_execution_id)
+    assert execution.status == "completed"
+
+
+def test_unknown_flow_rejected(make_engine):
+    """Test schedules can only be attached to registered flows"""
+    scheduler, _ = _scheduler(make_engine())
+    with pytest.raises(ValueError):
+        scheduler.add(ScheduleDefinition(flow_id="missing", interval_seconds=1))
+
+
+def test_misfire_policies(make_engine):
+    """Test a late schedule runs once or is skipped, never replayed"""
+    scheduler, clock = _scheduler(make_engine())
+    run_once = scheduler.add(
+        ScheduleDefinition(flow_id="test_flow_001", interval_seconds=10)
+    )
+    skip = scheduler.add(
+        ScheduleDefinition(
+            flow_id="test_flow_001", interval_seconds=10, misfire_policy="skip"
+        )
+    )
+    start = run_once.next_run
+
+    clock.now += 95
+    scheduler.run_pending()
+    _drain(scheduler)
+
+    assert (run_once.runs, run_once.misfires) == (1, 1)
+    assert (skip.runs, skip.misfires) == (0, 1)
+    # The next run stays aligned with the original interval
+    assert run_once.next_run == start + 90
+
+
+def test_overlap_policies(make_engine):
+    """Test a run is skipped while the previous one is still going"""
+    release = threading.Event()
+
+    def blocking(ctx):
+        release.wait(5)
+        return TaskResult(status=TaskStatus.SUCCESS)
+
+    scheduler, clock = _scheduler(make_engine({"task1": blocking}))
+    skip = scheduler.add(
+        ScheduleDefinition(flow_id="test_flow_001", interval_seconds=1)
+    )
+    allow = scheduler.add(
+        ScheduleDefinition(
+            flow_id="test_flow_001", interval_seconds=1, overlap_policy="allow"
+        )
+    )
+
+    for _ in range(3):
+        clock.now += 1
+        scheduler.run_pending()
+    release.set()
+    _drain(scheduler)
+
+    assert (skip.runs, skip.skipped_overlaps) == (1, 2)
+    assert (allow.runs, allow.skipped_overlaps) == (3, 0)
+
+
+def test_removed_schedule_stops_firing(make_engine):
+    """Test removing a schedule drops its pending timer"""
+    scheduler, clock = _scheduler(make_engine())
+    schedule = scheduler.add(
+        ScheduleDefinition(flow_id="test_flow_001", interval_seconds=1)
+    )
+    assert scheduler.remove(schedule.id)
+    assert not scheduler.remove(schedule.id)
+
+    clock.now += 5
+    scheduler.run_pending()
+    _drain(scheduler)
+    assert schedule.runs == 0
+
+
+def test_many_schedules(make_engine):
+    """Test tens of thousands of schedules are inserted and fire on time"""
+    scheduler, clock = _scheduler(make_engine())
+    scheduler.pool.submit = lambda fn, schedule: schedule
+    for i in range(20_000):
+        scheduler.add(
+            ScheduleDefinition(flow_id="test_flow_001", interval_seconds=1 + i % 600)
+        )
+
+    clock.now += 60.05
+    # Each schedule fires once, missed runs are not replayed
+    assert scheduler.run_pending() == sum(1 + i % 600 <= 60 for i in range(20_000))
+    assert len(scheduler.wheel) == 20_000
+
+
+def test_schedule_endpoints(client: TestClient):
+    """Test schedules are created, listed and removed over the API"""
+    response = client.post(
+        "/api/v1/schedules", json={"flow_id": "flow123", "cron": "0 * * * *"}
+    )
+    assert response.status_code == 201
+    schedule = response.json()
+    assert schedule["next_run_at"].endswith(":00:00+00:00")
+
+    listed = client.get("/api/v1/schedules", params={"flow_id": "flow123"}).json()
+    assert schedule["schedule_id"] in [s["schedule_id"] for s in listed]
+
+    path = f"/api/v1/schedules/{schedule['schedule_id']}"
+    assert client.get(path).json()["definition"]["cron"] == "0 * * * *"
+    assert client.delete(path).status_code == 204
+    assert client.get(path).status_code == 404
+
+
+def test_schedule_endpoint_validation(client: TestClient):
+    """Test bad schedules are rejected"""
+    both = {"flow_id": "flow123", "cron": "* * * * *", "interval_seconds": 5}
+    assert client.post("/api/v1/schedules", json=both).status_code == 422
+    bad_cron = {"flow_id": "flow123", "cron": "61 * * * *"}
+    assert client.post("/api/v1/schedules", json=bad_cron).status_code == 400
+    unknown = {"flow_id": "missing", "interval_seconds": 5}
+    assert client.post("/api/v1/schedules", json=unknown).status_code == 400
@@ -0,0 +1,189 @@
+"""Sub-flow tests"""
+
+import pytest
+
+from app.models import FlowDefinition, TaskResult, TaskStatus
+from app.services.compiled_flow import CALL, ENTER, EXIT
+
+
+def _success(ctx):
+    return TaskResult(status=TaskStatus.SUCCESS, data=len(ctx))
+
+
+def _failure(ctx):
+    return TaskResult(status=TaskStatus.FAILURE, message="boom")
+
+
+def _flow(flow_id, tasks, conditions=(), **extra):
+    return FlowDefinition(
+        flow={
+            "id": flow_id,
+            "name": flow_id,
+            "start_task": tasks[0]["name"],
+            "tasks": tasks,
+            "conditions": [
+                {
+                    "name": f"{source}_to_{success}",
+                    "description": "Route",
+                    "source_task": source,
+                    "target_task_success": success,
+                    "target_task_failure": failure,
+                }
+                for source, success, failure in conditions
+            ],
+            **extra,
+        }
+    )
+
+
+def _task(name, flow=None):
+    return {"name": name, "description": name, "flow": flow}
+
+
+def _register_child(engine, **extra):
+    engine.register_flow(
+        _flow(
+            "child",
+            [_task("inner1"), _task("inner2")],
+            [("inner1", "inner2", "end")],
+            **extra,
+        )
+    )
+
+
+def _register_parent(engine):
+    engine.register_flow(
+        _flow(
+            "parent",
+            [_task("first"), _task("sub", flow="child"), _task("last")],
+            [("first", "sub", "end"), ("sub", "last", "end")],
+        )
+    )
+
+
+def test_registered_subflow_is_inlined(make_engine):
+    """Test a known sub-flow is spliced into the parent plan"""
+    engine = make_engine(
+        dict(first=_success, inner1=_success, inner2=_success, last=_success), flow=None
+    )
+    _register_child(engine)
+    _register_parent(engine)
+
+    plan = engine.compiled_flows["parent"]
+    sub = plan.task_index["sub"]
+    assert plan.kinds[sub] == ENTER
+    assert EXIT in plan.kinds
+    assert not plan.subflows
+
+    status = engine.get_execution_status(engine.execute_flow("parent"))
+    assert status.status == "completed"
+    assert status.completed_tasks == ["first", "inner1", "inner2", "sub", "last"]
+    # The sub-flow task yields the last inner result
+    assert status.task_results["sub"].status == TaskStatus.SUCCESS
+    assert status.task_results["sub"].data == status.task_results["inner2"].data
+
+
+def test_inlined_subflow_failure_routes_parent(make_engine):
+    """Test an inner failure fails the sub-flow task"""
+    engine = make_engine(
+        dict(first=_success, inner1=_failure, inner2=_success, last=_success), flow=None
+    )
+    _register_child(engine)
+    _register_parent(engine)
+
+    status = engine.get_execution_status(engine.execute_flow("parent"))
+    assert status.completed_tasks == ["first", "inner1", "sub"]
+    assert status.task_results["sub"].status == TaskStatus.FAILURE
+    assert status.status == "completed_with_failures"
+
+
+def test_subflow_registered_later_is_inlined(make_engine):
+    """Test registering a sub-flow republishes the parents waiting for it"""
+    engine = make_engine(
+        dict(first=_success, inner1=_success, inner2=_success, last=_success), flow=None
+    )
+    _register_parent(engine)
+    plan = engine.compiled_flows["parent"]
+    assert plan.kinds[plan.task_index["sub"]] == CALL
+
+    _register_child(engine)
+    plan = engine.compiled_flows["parent"]
+    assert plan.version == 2
+    assert plan.kinds[plan.task_index["sub"]] == ENTER
+
+    status = engine.get_execution_status(engine.execute_flow("parent"))
+    assert status.completed_tasks == ["first", "inner1", "inner2", "sub", "last"]
+
+
+def test_republished_subflow_reaches_its_parents(make_engine):
+    """Test parents and grandparents run the latest version of a sub-flow"""
+    engine = make_engine(
+        dict(
+            first=_success, inner1=_success, inner2=_success, x=_success, last=_success
+        ),
+        flow=None,
+    )
+    _register_child(engine)
+    _register_parent(engine)
+    engine.register_flow(_flow("grandparent", [_task("outer", flow="parent")]))
+    running = engine.compiled_flows["parent"]
+
+    engine.register_flow(_flow("child", [_task("x")]))
+
+    assert engine.compiled_flows["parent"].version == running.version + 1
+    status = engine.get_execution_status(engine.execute_flow("parent"))
+    assert status.completed_tasks == ["first", "x", "sub", "last"]
+    status = engine.get_execution_status(engine.execute_flow("grandparent"))
+    assert status.completed_tasks == ["first", "x", "sub", "last", "outer"]
+    # Plans compiled before keep the steps they were built with
+    assert "x" not in running.task_index
+
+
+def test_subflow_with_deadline_runs_as_child_execution(make_engine):
+    """Test a sub-flow with its own deadline runs as a linked child execution"""
+    engine = make_engine(
+        dict(first=_success, inner1=_success, inner2=_success, last=_success), flow=None
+    )
+    _register_child(engine, deadline_seconds=5)
+    _register_parent(engine)
+
+    plan = engine.compiled_flows["parent"]
+    assert plan.kinds[plan.task_index["sub"]] == CALL
+
+    parent_id = engine.execute_flow("parent")
+    status = engine.get_execution_status(parent_id)
+    assert status.status == "completed"
+    assert status.completed_tasks == ["first", "sub", "last"]
+
+    child_id = status.task_results["sub"].data["execution_id"]
+    child = engine.get_execution_status(child_id)
+    assert child.flow_id == "child"
+    assert child.parent_execution_id == parent_id
+    assert child.completed_tasks == ["inner1", "inner2"]
+
+
+def test_recursive_subflow_hits_depth_limit(make_engine):
+    """Test a self-referencing flow fails instead of recursing forever"""
+    engine = make_engine(flow=None)
+    engine.register_flow(_flow("loop", [_task("again", flow="loop")]))
+
+    status = engine.get_execution_status(engine.execute_flow("loop"))
+    assert status.status == "completed_with_failures"
+    assert status.task_results["again"].status == TaskStatus.FAILURE
+
+
+@pytest.mark.parametrize(
+    "setting",
+    [
+        {"timeout_seconds": 1},
+        {"retries": 2},
+        {"hedge_percentile": 95},
+        {"circuit_breaker": {}},
+        {"map": {"task": "inner1", "items": "first.data"}},
+    ],
+)
+def test_subflow_task_rejects_task_policies(make_engine, setting):
+    """Test settings a sub-flow step would silently ignore are rejected"""
+    engine = make_engine(dict(inner1=_success), flow=None)
+    with pytest.raises(ValueError, match="can't set"):
+        engine.register_flow(_flow("parent", [{**_task("sub", "child"), **setting}]))
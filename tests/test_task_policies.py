@@ -0,0 +1,111 @@
+"""Task timeout, retry, hedging and deadline tests"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import Task, TaskResult, TaskStatus
+from app.services.cancellation import CancellationToken
+from app.services.task_runner import TaskPolicy, run_task_with_policy
+
+
+def _success(ctx):
+    return TaskResult(status=TaskStatus.SUCCESS)
+
+
+def test_task_timeout_routes_to_failure(make_engine, sample_flow_definition):
+    """Test a task that overruns its timeout fails through its condition"""
+    sample_flow_definition["flow"]["tasks"][0]["timeout_seconds"] = 0.05
+    engine = make_engine()
+    release = threading.Event()
+    engine.task_registry.register("task1", lambda ctx: release.wait(5) and None)
+
+    try:
+        execution_id = engine.execute_flow("test_flow_001")
+    finally:
+        release.set()
+
+    status = engine.get_execution_status(execution_id)
+    assert status.status == "completed_with_failures"
+    assert status.completed_tasks == ["task1"]
+    assert "timed out after 0.05s" in status.task_results["task1"].message
+
+
+def test_task_retries_until_success(make_engine, sample_flow_definition):
+    """Test failed attempts are retried up to the declared count"""
+    sample_flow_definition["flow"]["tasks"][1].update(
+        retries=2, retry_backoff_seconds=0
+    )
+    engine = make_engine()
+    calls = itertools.count(1)
+
+    def flaky(ctx):
+        if next(calls) < 3:
+            raise RuntimeError("flaky dependency")
+        return _success(ctx)
+
+    engine.task_registry.register("task2", flaky)
+    execution_id = engine.execute_flow("test_flow_001")
+
+    assert engine.get_execution_status(execution_id).status == "completed"
+    assert next(calls) == 4
+
+
+def test_flow_deadline_fails_execution(make_engine, sample_flow_definition):
+    """Test the flow deadline bounds every task and fails the execution"""
+    sample_flow_definition["flow"]["deadline_seconds"] = 0.1
+    engine = make_engine()
+    release = threading.Event()
+    engine.task_registry.register("task2", lambda ctx: release.wait(5) and None)
+
+    started = time.perf_counter()
+    try:
+        execution_id = engine.execute_flow("test_flow_001")
+    finally:
+        release.set()
+
+    assert time.perf_counter() - started < 2
+    status = engine.get_execution_status(execution_id)
+    assert status.status == "failed"
+    assert "deadline exceeded" in status.message
+
+
+def test_hedged_attempt_wins():
+    """Test a duplicate attempt started after the hedge delay can win"""
+    release = threading.Event()
+    calls = itertools.count()
+
+    def slow_first(ctx):
+        if next(calls) == 0:
+            release.wait(5)
+            return TaskResult(status=TaskStatus.SUCCESS, data="first")
+        return TaskResult(status=TaskStatus.SUCCESS, data="hedge")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        try:
+            result = run_task_with_policy(
+                slow_first,
+                {},
+                CancellationToken(),
+                pool,
+                TaskPolicy(timeout=5, hedge_percentile=95),
+                hedge_delay=0.05,
+            )
+        finally:
+            release.set()
+
+    assert result.data == "hedge"
+
+
+def test_task_policy_validation():
+    """Test task policy fields are validated"""
+    with pytest.raises(ValidationError):
+        Task(name="t", description="d", timeout_seconds=0)
+    with pytest.raises(ValidationError):
+        Task(name="t", description="d", retries=-1)
+
+    assert TaskPolicy.from_task(Task(name="t", description="d")) is None
@@ -1,9 +1,17 @@
 """Task registry tests"""
 
+import builtins
+import sys
+import threading
+import time
+from importlib.metadata import EntryPoint
+
 import pytest
+from fastapi.testclient import TestClient
 
 from app.models import TaskResult, TaskStatus
 from app.services.task_registry import TaskRegistry
+from app.services.tasks import task_always_fails
 
 
 def test_task_registry_register():
@@ -55,3 +63,88 @@ def test_task_registry_list_tasks():
     assert len(tasks) == 2
     assert "task1" in tasks
     assert "task2" in tasks
+
+
+def test_task_registry_lazy_dotted_path(tmp_path, monkeypatch):
+    """Test tasks registered by dotted path are imported on first use"""
+    (tmp_path / "lazy_tasks_module.py").write_text(
+        "from app.models import TaskResult, TaskStatus\n"
+        "def run(context):\n"
+        "    return TaskResult(status=TaskStatus.SUCCESS, data='lazy')\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = TaskRegistry()
+    registry.register("lazy", "lazy_tasks_module:run")
+
+    assert registry.exists("lazy")
+    assert "lazy" in registry.list_tasks()
+    assert "lazy_tasks_module" not in sys.modules
+
+    assert registry.get("lazy")({}).data == "lazy"
+    assert [e["module"] for e in registry.import_report()] == ["lazy_tasks_module"]
+    monkeypatch.delitem(sys.modules, "lazy_tasks_module")
+
+
+def test_task_registry_entry_point():
+    """Test tasks registered from an entry point resolve on first use"""
+    registry = TaskRegistry()
+    entry_point = EntryPoint(
+        name="fails",
+        value="app.services.tasks:task_always_fails",
+        group="flow_manager.tasks",
+    )
+    registry.register("fails", entry_point)
+
+    assert registry.get("fails")({}).status == TaskStatus.FAILURE
+
+
+def test_task_registry_prewarm():
+    """Test prewarming resolves lazy tasks and reports bad paths"""
+    registry = TaskRegistry()
+    registry.register("good", "app.services.tasks.task_always_fails")
+    registry.register("bad", "app.services.tasks:missing_task")
+
+    registry.prewarm(background=True).join()
+
+    assert registry.get("good") is task_always_fails
+    with pytest.raises(ValueError, match="Failed to load task 'bad'"):
+        registry.get("bad")
+
+
+def test_slow_import_does_not_block_other_tasks(tmp_path, monkeypatch):
+    """Test a task importing a slow module doesn't hold up other tasks"""
+    started, release = threading.Event(), threading.Event()
+    monkeypatch.setattr(builtins, "_slow_import_gate", (started, release), False)
+    (tmp_path / "slow_tasks_module.py").write_text(
+        "started, release = _slow_import_gate\n"
+        "started.set()\n"
+        "release.wait(5)\n"
+        "def run(context):\n"
+        "    return 'slow'\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    registry = TaskRegistry()
+    registry.register("slow", "slow_tasks_module:run")
+    registry.register("fast", "app.services.tasks:task_always_fails")
+
+    loader = threading.Thread(target=registry.get, args=("slow",))
+    loader.start()
+    try:
+        assert started.wait(5)
+        # Resolves while the slow import is still waiting for release
+        began = time.monotonic()
+        assert registry.get("fast") is task_always_fails
+        assert time.monotonic() - began < 2
+    finally:
+        release.set()
+        loader.join()
+    assert registry.get("slow")({}) == "slow"
+    monkeypatch.delitem(sys.modules, "slow_tasks_module")
+
+
+def test_import_report_endpoint(client: TestClient):
+    """Test the import report is available without prewarming"""
+    response = client.get("/api/v1/debug/imports")
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
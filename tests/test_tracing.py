@@ -0,0 +1,173 @@
+"""Trace span tests"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import TaskResult, TaskStatus
+from app.services import tracing
+from app.services.tracing import tracer
+
+
+class ListExporter(tracing.SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span: dict):
+        self.spans.append(span)
+
+    def named(self, prefix: str) -> list:
+        return [span for span in self.spans if span["name"].startswith(prefix)]
+
+
+@pytest.fixture
+def spans():
+    """Collect spans of the global tracer for one test"""
+    exporter = ListExporter()
+    tracing.configure(exporter)
+    yield exporter
+    tracing.configure(None)
+
+
+def _success(ctx):
+    return TaskResult(status=TaskStatus.SUCCESS, data={"records": [1, 2, 3]})
+
+
+def test_execution_task_and_condition_spans(spans, make_engine):
+    """Test spans nest execution > task and execution > condition"""
+    engine = make_engine(default=_success)
+    execution_id = engine.execute_flow("test_flow_001")
+
+    (root,) = spans.named("flow.execute")
+    assert root["attributes"]["execution.id"] == execution_id
+    assert root["attributes"]["execution.status"] == "completed"
+
+    tasks = spans.named("task ")
+    conditions = spans.named("condition")
+    assert [span["name"] for span in tasks] == [
+        "task task1",
+        "task task2",
+        "task task3",
+    ]
+    assert len(conditions) == 3
+    for span in tasks + conditions:
+        assert span["trace_id"] == root["trace_id"]
+        assert span["parent_span_id"] == root["span_id"]
+        assert span["attributes"]["execution.id"] == execution_id
+    assert conditions[0]["attributes"]["condition.next_task"] == "task2"
+
+
+def test_failed_task_span_has_error_status(spans, make_engine):
+    """Test a failing task marks its span as an error"""
+    engine = make_engine(
+        {"task1": lambda ctx: TaskResult(status=TaskStatus.FAILURE, message="nope")}
+    )
+    engine.execute_flow("test_flow_001")
+
+    (span,) = spans.named("task task1")
+    assert span["status"] == {"code": tracing.STATUS_ERROR, "message": "nope"}
+
+
+def test_context_propagates_into_task_pool(spans, make_engine, sample_flow_definition):
+    """Test spans opened by a pooled task attempt link to the task span"""
+    sample_flow_definition["flow"]["tasks"][0]["timeout_seconds"] = 5
+
+    def traced(ctx):
+        with tracer.span("inner"):
+            return _success(ctx)
+
+    engine = make_engine({"task1": traced})
+    engine.execute_flow("test_flow_001")
+
+    (inner,) = spans.named("inner")
+    (task,) = spans.named("task task1")
+    assert inner["parent_span_id"] == task["span_id"]
+
+
+def test_context_propagates_into_process_pool(
+    spans, make_engine, sample_flow_definition
+):
+    """Test process pool chunks are traced under the map task span"""
+    sample_flow_definition["flow"]["tasks"][1]["map"] = {
+        "task": "process",
+        "items": "task1.data.records",
+        "executor": "process",
+    }
+    engine = make_engine(
+        {"process": "app.services.tasks:task2_process_data"}, default=_success
+    )
+    try:
+        engine.execute_flow("test_flow_001")
+    finally:
+        engine.shutdown()
+
+    (chunk,) = spans.named("task2_process_data")
+    (task,) = spans.named("task task2")
+    assert chunk["parent_span_id"] == task["span_id"]
+    assert chunk["trace_id"] == task["trace_id"]
+
+
+def test_http_request_span_continues_traceparent(spans, client: TestClient):
+    """Test the request span is the parent of the execution span"""
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = client.post(
+        "/api/v1/flows/flow123/execute",
+        headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+    )
+    assert response.status_code == 200
+
+    (server,) = spans.named("POST")
+    (root,) = spans.named("flow.execute")
+    assert server["name"] == "POST /api/v1/flows/{flow_id}/execute"
+    assert server["trace_id"] == trace_id
+    assert server["parent_span_id"] == "00f067aa0ba902b7"
+    assert server["attributes"]["http.status_code"] == 200
+    assert root["parent_span_id"] == server["span_id"]
+    assert response.headers["traceparent"].split("-")[1] == trace_id
+
+
+def test_batch_exporter_writes_jsonl(tmp_path):
+    """Test queued spans are flushed to the file on shutdown"""
+    path = tmp_path / "traces.jsonl"
+    exporter = tracing.BatchSpanExporter(
+        tracing.JsonlFileExporter(str(path)), flush_interval=60
+    )
+    local = tracing.Tracer(exporter)
+    with local.span("outer"):
+        with local.span("inner", {"k": 1}):
+            pass
+    exporter.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [span["name"] for span in lines] == ["inner", "outer"]
+    assert lines[0]["parent_span_id"] == lines[1]["span_id"]
+    assert lines[0]["attributes"] == {"k": 1}
+
+
+def test_batch_exporter_wraps_any_exporter():
+    """Test batches reach exporters that only implement `export`"""
+    with pytest.raises(TypeError):
+        tracing.SpanExporter()
+
+    target = ListExporter()
+    exporter = tracing.BatchSpanExporter(target, flush_interval=60)
+    local = tracing.Tracer(exporter)
+    for name in ("a", "b"):
+        with local.span(name):
+            pass
+    exporter.shutdown()
+    assert [span["name"] for span in target.spans] == ["a", "b"]
+
+
+def test_disabled_tracer_is_noop():
+    """Test spans cost nothing and record nothing without an exporter"""
+    assert tracing.Tracer().span("x") is tracing.NOOP_SPAN
+
+
+def test_traceparent_parsing():
+    """Test W3C traceparent headers round trip and reject garbage"""
+    context = ("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7")
+    assert tracing.parse_traceparent(tracing.format_traceparent(context)) == context
+    assert tracing.parse_traceparent("garbage") is None
+    assert tracing.parse_traceparent(None) is None